@@ -1,3 +1 @@
-rm -rf public && mkdir public 
-python3 src/main.py
-cd public && python3 -m http.server 8888 --bind 127.0.0.1
+python3 src/main.py serve --port 8888 --bind 127.0.0.1
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Mapping, Optional
+
+from build_manifest import hash_file
+from htmlnode import HTMLNode
+
+ASSETS_VERSION = 1
+HASH_LENGTH = 8
+URL_ATTRIBUTES = ("href", "src")
+URL_ATTRIBUTE_PATTERN = re.compile(r"""(\b(?:href|src)\s*=\s*)(["'])(.*?)\2""")
+URL_SUFFIX_PATTERN = re.compile(r"[?#]")
+
+
+def fingerprinted_path(relative_path: str, digest: str) -> str:
+    """
+    Inserts a content hash into a file name, before its extension.
+
+    Args:
+        relative_path (str): The asset's path relative to `static/`.
+        digest (str): The hex digest of the asset's contents.
+
+    Returns:
+        str: The fingerprinted path, e.g. `images/tom.png` -> `images/tom.1a2b3c4d.png`.
+    """
+    directory, file_name = os.path.split(relative_path)
+    stem, extension = os.path.splitext(file_name)
+    return os.path.join(directory, f"{stem}.{digest[:HASH_LENGTH]}{extension}")
+
+
+def asset_url(relative_path: str) -> str:
+    """
+    Returns the site-absolute URL of a file in `public/`.
+
+    Args:
+        relative_path (str): The path relative to `public/`.
+
+    Returns:
+        str: The URL, e.g. `images/tom.png` -> `/images/tom.png`.
+    """
+    return "/" + "/".join(relative_path.split(os.sep))
+
+
+class AssetManifest:
+    """
+    Maps the URLs of static assets to the URLs of their fingerprinted copies, so assets can be
+    served with far-future `Cache-Control: immutable` headers: a changed asset gets a new URL.
+
+    Content hashes are kept together with each asset's size and mtime and stored on disk, so an
+    unchanged asset is never hashed again.
+
+    Attributes:
+        path (Optional[str]): Location of the manifest JSON file. None keeps it in memory.
+        urls (Dict[str, str]): Fingerprinted URL by original URL, for the assets synced in
+            this build.
+        hashes (Dict[str, Dict]): Content hash, size and mtime by asset path relative to `static/`.
+    """
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initializes an AssetManifest and loads any existing manifest from `path`.
+
+        Args:
+            path (Optional[str]): Location of the manifest JSON file.
+        """
+        self.path = path
+        self.urls: Dict[str, str] = {}
+        self.hashes: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self) -> None:
+        """
+        Loads the stored hashes. A missing, unreadable or outdated manifest is treated as empty,
+        which rehashes every asset.
+        """
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == ASSETS_VERSION:
+            self.hashes = data.get("hashes", {})
+
+    def save(self) -> None:
+        """
+        Writes the URL map and the hashes of this build's assets to disk atomically.
+        """
+        if self.path is None:
+            return
+        seen = {os.path.join(*url.lstrip("/").split("/")) for url in self.urls}
+        hashes = {key: entry for key, entry in self.hashes.items() if key in seen}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": ASSETS_VERSION, "urls": self.urls, "hashes": hashes}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def fingerprint(self, source: str, relative_path: str, st: os.stat_result) -> str:
+        """
+        Returns the fingerprinted path of an asset and records its URL mapping. Safe to call
+        from several threads for different assets.
+
+        Args:
+            source (str): Path to the asset file.
+            relative_path (str): The asset's path relative to `static/`.
+            st (os.stat_result): The result of `os.stat(source)`.
+
+        Returns:
+            str: The fingerprinted path relative to `public/`.
+        """
+        entry = self.hashes.get(relative_path)
+        if entry is None or entry["size"] != st.st_size or entry["mtime"] != st.st_mtime_ns:
+            entry = {"size": st.st_size, "mtime": st.st_mtime_ns, "hash": hash_file(source)}
+            self.hashes[relative_path] = entry
+        fingerprinted = fingerprinted_path(relative_path, entry["hash"])
+        self.urls[asset_url(relative_path)] = asset_url(fingerprinted)
+        return fingerprinted
+
+    def digest(self) -> str:
+        """
+        Returns a hash of the URL map; see `urls_digest`.
+
+        Returns:
+            str: The hex digest.
+        """
+        return urls_digest(self.urls)
+
+
+def urls_digest(urls: Mapping[str, str]) -> str:
+    """
+    Hashes an asset URL map. The hash changes whenever any asset URL does, so it can stand in
+    for the map as a dependency of the pages rewritten with it.
+
+    Args:
+        urls (Mapping[str, str]): Fingerprinted URL by original URL.
+
+    Returns:
+        str: The hex digest.
+    """
+    return hashlib.sha256(json.dumps(dict(urls), sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def rewrite_url(url: str, urls: Mapping[str, str]) -> str:
+    """
+    Maps an asset URL to its fingerprinted URL, keeping any query string or fragment.
+
+    Args:
+        url (str): The URL as written.
+        urls (Mapping[str, str]): Fingerprinted URL by original URL.
+
+    Returns:
+        str: The fingerprinted URL, or `url` unchanged if it is not a fingerprinted asset.
+    """
+    match = URL_SUFFIX_PATTERN.search(url)
+    path, suffix = (url[:match.start()], url[match.start():]) if match else (url, "")
+    fingerprinted = urls.get(path)
+    return fingerprinted + suffix if fingerprinted is not None else url
+
+
+def rewrite_html_urls(html: str, urls: Mapping[str, str]) -> str:
+    """
+    Rewrites the `href` and `src` attributes of HTML source (e.g. a template) that refer to
+    fingerprinted assets.
+
+    Args:
+        html (str): The HTML source.
+        urls (Mapping[str, str]): Fingerprinted URL by original URL.
+
+    Returns:
+        str: The rewritten HTML.
+    """
+    if not urls:
+        return html
+    return URL_ATTRIBUTE_PATTERN.sub(lambda match: match.group(1) + match.group(2) + rewrite_url(match.group(3), urls) + match.group(2), html)
+
+
+def rewrite_node_urls(node: HTMLNode, urls: Mapping[str, str]) -> None:
+    """
+    Rewrites the `href` and `src` props of a node tree that refer to fingerprinted assets.
+
+    A node whose props change gets a new props dict: props may be shared (e.g. the
+    `EMPTY_PROPS` sentinel), so they are never modified in place.
+
+    Args:
+        node (HTMLNode): The root of the tree.
+        urls (Mapping[str, str]): Fingerprinted URL by original URL.
+    """
+    if not urls:
+        return
+    stack: List[HTMLNode] = [node]
+    while stack:
+        node = stack.pop()
+        props = node.props
+        if props:
+            for attribute in URL_ATTRIBUTES:
+                url = props.get(attribute)
+                if url is not None:
+                    rewritten = rewrite_url(url, urls)
+                    if rewritten != url:
+                        props = {**props, attribute: rewritten}
+            if props is not node.props:
+                node.props = props
+        stack.extend(node.children)
@@ -0,0 +1,378 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from blocktype import BlockType, markdown_to_html_node, scan_blocks
+from flat_ast import markdown_to_flat_tree
+from generate_page import generate_page
+from template import TemplateLoader
+from utility import text_to_textnodes
+import main as site
+
+RESULTS_VERSION = 1
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.10
+# Written into every generated corpus: only directories holding it are ever overwritten.
+CORPUS_MARKER = ".benchmark-corpus"
+
+TEMPLATE = """<!doctype html>
+<html>
+<head><title>{{ Title }}</title><link href="/index.css" rel="stylesheet"></head>
+<body><article>{{ Content }}</article></body>
+</html>
+"""
+
+WORDS = (
+    "the quick brown fox jumps over lazy dog static site generator markdown block inline "
+    "parser render template page content build cache token node tree html paragraph list "
+    "quote heading code image link bold italic fast slow memory disk write read stream"
+).split()
+
+
+class CorpusSpec(NamedTuple):
+    """
+    Parameters of a synthetic corpus. The same spec always generates the same files.
+
+    Attributes:
+        seed (int): Seed of the random generator.
+        short_pages (int): Number of short blog-post-like pages.
+        huge_pages (int): Number of very large pages mixing every block type.
+        huge_page_bytes (int): Approximate size of each huge page.
+        inline_pages (int): Number of pages made of inline-heavy paragraphs.
+        list_pages (int): Number of pages made of long and deeply indented lists.
+        code_pages (int): Number of pages holding large code blocks.
+    """
+    seed: int = 0
+    short_pages: int = 200
+    huge_pages: int = 3
+    huge_page_bytes: int = 512 * 1024
+    inline_pages: int = 20
+    list_pages: int = 20
+    code_pages: int = 10
+
+    def scaled(self, scale: float) -> "CorpusSpec":
+        """
+        Returns the spec with every page count and size multiplied by `scale` (at least one page of each kind).
+        """
+        return self._replace(**{field: max(1, int(getattr(self, field) * scale)) for field in self._fields if field != "seed"})
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _inline_text(rng: random.Random, words: int, density: float) -> str:
+    parts = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        if rng.random() < density:
+            kind = rng.randrange(5)
+            if kind == 0:
+                word = f"**{word}**"
+            elif kind == 1:
+                word = f"_{word}_"
+            elif kind == 2:
+                word = f"`{word}`"
+            elif kind == 3:
+                word = f"[{word}](https://example.com/{word})"
+            else:
+                word = f"![{word}](/images/{word}.png)"
+        parts.append(word)
+    return " ".join(parts)
+
+
+def _list_block(rng: random.Random, items: int, depth: int, ordered: bool) -> str:
+    lines = []
+    for i in range(items):
+        indent = "  " * (i % depth) if depth > 1 else ""
+        marker = f"{i + 1}." if ordered else "-"
+        lines.append(f"{indent}{marker} {_inline_text(rng, rng.randint(3, 10), 0.2)}")
+    return "\n".join(lines)
+
+
+def _code_block(rng: random.Random, lines: int) -> str:
+    body = "\n".join(f"    {_sentence(rng, rng.randint(2, 8))} **not bold** _not italic_" for _ in range(lines))
+    return f"```\n{body}\n```"
+
+
+def _mixed_block(rng: random.Random) -> str:
+    kind = rng.randrange(6)
+    if kind == 0:
+        return f"{'#' * rng.randint(2, 6)} {_inline_text(rng, rng.randint(2, 6), 0.2)}"
+    if kind == 1:
+        return "\n".join(f"> {_inline_text(rng, rng.randint(5, 15), 0.2)}" for _ in range(rng.randint(1, 4)))
+    if kind == 2:
+        return _list_block(rng, rng.randint(3, 12), 1, rng.random() < 0.5)
+    if kind == 3:
+        return _code_block(rng, rng.randint(3, 30))
+    return _inline_text(rng, rng.randint(30, 120), 0.15)
+
+
+def _page(title: str, blocks: List[str]) -> str:
+    return f"# {title}\n\n" + "\n\n".join(blocks) + "\n"
+
+
+def generate_corpus(root: str, spec: CorpusSpec = CorpusSpec()) -> List[str]:
+    """
+    Writes a deterministic synthetic site (content/, static/ and template.html) below `root`.
+
+    The corpus mixes many short pages, a few huge pages, pages of inline-heavy paragraphs,
+    pages of long and deeply indented lists and pages of large code blocks, so each stage of
+    the pipeline gets a workload it is sensitive to.
+
+    Args:
+        root (str): The project directory to generate. It must be empty, missing, or hold a
+            corpus generated before, which is replaced.
+        spec (CorpusSpec): What to generate.
+
+    Returns:
+        List[str]: The paths of the generated Markdown pages, sorted.
+
+    Raises:
+        ValueError: If `root` holds anything but an earlier corpus, e.g. a real site.
+    """
+    marker = os.path.join(root, CORPUS_MARKER)
+    if os.path.isdir(root) and os.listdir(root) and not os.path.exists(marker):
+        raise ValueError(f"{root} is not empty and holds no generated corpus; refusing to overwrite it")
+    os.makedirs(root, exist_ok=True)
+    with open(marker, "w") as f:
+        f.write("Generated by benchmark.py; content/, static/, public/ and .cache/ here are replaced on every run.\n")
+    rng = random.Random(spec.seed)
+    content = os.path.join(root, "content")
+    static = os.path.join(root, "static")
+    shutil.rmtree(content, ignore_errors=True)
+    shutil.rmtree(static, ignore_errors=True)
+    os.makedirs(os.path.join(static, "images"))
+    with open(os.path.join(static, "index.css"), "w") as f:
+        f.write("body { font-family: sans-serif; }\n")
+    for word in WORDS[:8]:
+        with open(os.path.join(static, "images", f"{word}.png"), "wb") as f:
+            f.write(rng.randbytes(4096))
+    with open(os.path.join(root, "template.html"), "w") as f:
+        f.write(TEMPLATE)
+
+    pages: Dict[str, str] = {}
+    for i in range(spec.short_pages):
+        blocks = [_inline_text(rng, rng.randint(40, 80), 0.1) for _ in range(rng.randint(3, 6))]
+        pages[os.path.join("blog", f"post-{i:05d}", "index.md")] = _page(f"Post {i}", blocks)
+    for i in range(spec.huge_pages):
+        blocks: List[str] = []
+        size = 0
+        while size < spec.huge_page_bytes:
+            blocks.append(_mixed_block(rng))
+            size += len(blocks[-1]) + 2
+        pages[os.path.join("huge", f"page-{i:03d}.md")] = _page(f"Huge {i}", blocks)
+    for i in range(spec.inline_pages):
+        blocks = [_inline_text(rng, rng.randint(100, 200), 0.6) for _ in range(20)]
+        pages[os.path.join("inline", f"page-{i:03d}.md")] = _page(f"Inline {i}", blocks)
+    for i in range(spec.list_pages):
+        blocks = [_list_block(rng, rng.randint(20, 60), rng.choice((1, 4, 8)), rng.random() < 0.5) for _ in range(10)]
+        pages[os.path.join("lists", f"page-{i:03d}.md")] = _page(f"Lists {i}", blocks)
+    for i in range(spec.code_pages):
+        blocks = [_code_block(rng, rng.randint(200, 1000)) for _ in range(3)]
+        pages[os.path.join("code", f"page-{i:03d}.md")] = _page(f"Code {i}", blocks)
+
+    paths = []
+    for relative, markdown in pages.items():
+        path = os.path.join(content, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(markdown)
+        paths.append(path)
+    paths.sort()
+    return paths
+
+
+def measure(run: Callable[[], None], repeat: int = DEFAULT_REPEAT, setup: Optional[Callable[[], None]] = None) -> float:
+    """
+    Runs `run` `repeat` times and returns the fastest wall time in seconds.
+
+    Args:
+        run (Callable[[], None]): The code to time.
+        repeat (int): Number of runs.
+        setup (Optional[Callable[[], None]]): Called before each run, outside the timing.
+
+    Returns:
+        float: The best time in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _result(seconds: float, size: int, pages: Optional[int] = None) -> Dict[str, float]:
+    result = {"seconds": round(seconds, 6), "bytes": size, "mb_per_s": round(size / 1e6 / seconds, 3) if seconds else 0.0}
+    if pages is not None:
+        result["pages"] = pages
+        result["pages_per_s"] = round(pages / seconds, 3) if seconds else 0.0
+    return result
+
+
+def run_benchmarks(root: str, spec: CorpusSpec = CorpusSpec(), repeat: int = DEFAULT_REPEAT) -> Dict:
+    """
+    Generates the corpus in `root` and times each stage of the pipeline on it.
+
+    - `text_to_textnodes`: inline parsing of every paragraph, heading, quote and list item.
+    - `markdown_to_html_node`: block and inline parsing of every page.
+    - `to_html`: serialization of every parsed page.
+    - `markdown_to_flat_tree` and `flat_to_html`: the same two stages with the array-backed
+      `FlatTree` instead of node objects.
+    - `generate_page`: reading, rendering and writing every page, one call per page.
+    - `main`: a full, cold build through the command line entry point.
+
+    Args:
+        root (str): The project directory the corpus is generated in.
+        spec (CorpusSpec): The corpus to generate.
+        repeat (int): Runs per benchmark; the fastest is reported.
+
+    Returns:
+        Dict: The JSON-serializable results.
+    """
+    paths = generate_corpus(root, spec)
+    markdowns = []
+    for path in paths:
+        with open(path) as f:
+            markdowns.append(f.read())
+    markdown_bytes = sum(len(markdown.encode("utf-8")) for markdown in markdowns)
+
+    inline_texts = []
+    for markdown in markdowns:
+        for block in scan_blocks(markdown.split("\n")):
+            if block.block_type != BlockType.CODE:
+                inline_texts.extend(block.items or (block.content,))
+    inline_bytes = sum(len(text.encode("utf-8")) for text in inline_texts)
+
+    nodes = [markdown_to_html_node(markdown) for markdown in markdowns]
+    html_bytes = sum(len(node.to_html().encode("utf-8")) for node in nodes)
+    flat_trees = [markdown_to_flat_tree(markdown) for markdown in markdowns]
+
+    content = os.path.join(root, "content")
+    public = os.path.join(root, "public")
+    template_path = os.path.join(root, "template.html")
+    destinations = [os.path.join(public, os.path.splitext(os.path.relpath(path, content))[0] + ".html") for path in paths]
+
+    def clean() -> None:
+        shutil.rmtree(public, ignore_errors=True)
+        shutil.rmtree(os.path.join(root, ".cache"), ignore_errors=True)
+
+    def generate_all() -> None:
+        loader = TemplateLoader(template_path, content)
+        for path, dest in zip(paths, destinations):
+            generate_page(path, template_path, dest, loader=loader)
+
+    benchmarks = {
+        "text_to_textnodes": _result(measure(lambda: [text_to_textnodes(text) for text in inline_texts], repeat), inline_bytes),
+        "markdown_to_html_node": _result(measure(lambda: [markdown_to_html_node(markdown) for markdown in markdowns], repeat), markdown_bytes, len(paths)),
+        "to_html": _result(measure(lambda: [node.to_html() for node in nodes], repeat), html_bytes, len(paths)),
+        "markdown_to_flat_tree": _result(measure(lambda: [markdown_to_flat_tree(markdown) for markdown in markdowns], repeat), markdown_bytes, len(paths)),
+        "flat_to_html": _result(measure(lambda: [tree.to_html() for tree in flat_trees], repeat), html_bytes, len(paths)),
+        "generate_page": _result(measure(generate_all, repeat, clean), markdown_bytes, len(paths)),
+        "main": _result(measure(lambda: site.main(["--root", root, "--no-cache"]), repeat, clean), markdown_bytes, len(paths)),
+    }
+    clean()
+    return {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "corpus": spec._asdict(),
+        "benchmarks": benchmarks,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Compares two benchmark results and lists the benchmarks that got slower by more than
+    `threshold` (a fraction, e.g. 0.10 for 10%).
+
+    Args:
+        baseline (Dict): Results of the reference run.
+        current (Dict): Results of the run being checked.
+        threshold (float): Allowed slowdown.
+
+    Returns:
+        List[str]: One description per regression. Empty if nothing regressed.
+
+    Raises:
+        ValueError: If the two runs used different corpora and cannot be compared.
+    """
+    if baseline.get("corpus") != current.get("corpus"):
+        raise ValueError("benchmark results were measured on different corpora")
+    regressions = []
+    for name, result in current["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None or not before["seconds"]:
+            continue
+        ratio = result["seconds"] / before["seconds"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {before['seconds'] * 1000:.1f} ms -> {result['seconds'] * 1000:.1f} ms ({(ratio - 1) * 100:+.1f}%)")
+    return regressions
+
+
+def format_results(results: Dict, baseline: Optional[Dict] = None) -> str:
+    """
+    Formats benchmark results as a text table, with the change against `baseline` if given.
+    """
+    lines = [f"{'benchmark':<24} {'ms':>10} {'MB/s':>10} {'pages/s':>10}" + (f" {'change':>9}" if baseline else "")]
+    for name, result in results["benchmarks"].items():
+        pages_per_s = f"{result['pages_per_s']:.1f}" if "pages_per_s" in result else "-"
+        line = f"{name:<24} {result['seconds'] * 1000:>10.1f} {result['mb_per_s']:>10.2f} {pages_per_s:>10}"
+        before = baseline["benchmarks"].get(name) if baseline else None
+        if before and before["seconds"]:
+            line += f" {(result['seconds'] / before['seconds'] - 1) * 100:>+8.1f}%"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the site generator on a synthetic corpus.")
+    parser.add_argument("--output", "-o", help="write the results as JSON to this path")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against results saved with --output and fail on regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help=f"allowed slowdown against the baseline, as a fraction (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help=f"runs per benchmark, the fastest is kept (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply the corpus size (default: 1.0)")
+    parser.add_argument("--seed", type=int, default=0, help="corpus seed (default: 0)")
+    parser.add_argument("--corpus-dir", help="generate the corpus here and keep it; must be empty or hold an earlier corpus (default: a temporary directory)")
+    args = parser.parse_args(argv)
+
+    spec = CorpusSpec(seed=args.seed).scaled(args.scale)
+    if args.corpus_dir:
+        try:
+            results = run_benchmarks(args.corpus_dir, spec, args.repeat)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        with tempfile.TemporaryDirectory() as root:
+            results = run_benchmarks(root, spec, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print(format_results(results, baseline))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+
+    if baseline is not None:
+        regressions = compare(baseline, results, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
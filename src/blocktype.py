@@ -1,11 +1,18 @@
 from enum import Enum
+import itertools
 import re
-from typing import List
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
 
+from document_metadata import DocumentMetadata
 from htmlnode import HTMLNode
 from parentnode import ParentNode
 from leafnode import LeafNode
-from utility import markdown_to_blocks, text_to_textnodes, text_to_children
+from utility import text_to_children
+
+# One shared string per heading tag rather than a new "h<level>" string per heading node.
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+# A line that can title a document even when it does not start a heading block, e.g. `#Title`.
+TITLE_LINE_PATTERN = re.compile(r"#([^#].+)")
 
 class BlockType(Enum):
     """
@@ -46,34 +53,256 @@ def block_to_block_type(markdown: str) -> BlockType:
           Numbers must start at 1 and increment by 1 for each line.
         - If none of the above conditions are met, the block is a paragraph.
     """
-    header_match = re.findall("(^[#]{1,6} )", markdown)
-    if header_match:
-        return BlockType.HEADING
-
-    code_match = re.findall("(^`{3}[\s\S]*`{3}$)", markdown)
-    if code_match:
-        return BlockType.CODE
-
-    parts = markdown.split('\n')
-    quote_match = (len([part for part in parts if part.startswith('>')])) == len(parts)
-    if quote_match:
-        return BlockType.QUOTE
-
-    unordered_list_match = (len([part for part in parts if part.startswith('- ')])) == len(parts)
-    if unordered_list_match:
-        return BlockType.UNORDERED_LIST
-    
-    ordered_list_match = True
-    for i, part in enumerate(parts):
-        if not part.startswith(f"{i + 1}. "):
-            ordered_list_match = False
+    return classify_block(markdown.split('\n')).block_type
+
+
+class Block(NamedTuple):
+    """
+    A classified markdown block with its payload already extracted for the HTML builders.
+
+    Attributes:
+        block_type (BlockType): The type of the block.
+        content (str): Heading text (without the hashes), paragraph text, quote text
+            (without the '>' markers) or code block body. Empty for lists.
+        items (Tuple[str, ...]): The text of each list item (without its marker). Empty for
+            other block types.
+        level (int): The heading level (1-6). Zero for other block types.
+    """
+    block_type: BlockType
+    content: str
+    items: Tuple[str, ...] = ()
+    level: int = 0
+
+
+def classify_block(lines: List[str]) -> Block:
+    """
+    Determines the type of a markdown block from the prefixes of its lines and extracts its
+    payload. See `block_to_block_type` for the classification rules.
+
+    Args:
+        lines (List[str]): The lines of a single block with leading/trailing whitespace removed.
+
+    Returns:
+        Block: The classified block.
+    """
+    first = lines[0]
+    num_hashes = len(first) - len(first.lstrip("#"))
+    if 1 <= num_hashes <= 6 and first[num_hashes:num_hashes + 1] == " ":
+        return Block(BlockType.HEADING, "\n".join(lines)[num_hashes + 1:], level=num_hashes)
+
+    text = "\n".join(lines)
+    if len(text) >= 6 and text.startswith("```") and text.endswith("```"):
+        return Block(BlockType.CODE, text[3:-3].lstrip())
+
+    is_quote = is_unordered = is_ordered = True
+    for i, line in enumerate(lines):
+        is_quote = is_quote and line.startswith(">")
+        is_unordered = is_unordered and line.startswith("- ")
+        is_ordered = is_ordered and line.startswith(f"{i + 1}. ")
+        if not (is_quote or is_unordered or is_ordered):
             break
-    if ordered_list_match:
-        return BlockType.ORDERED_LIST
 
-    return BlockType.PARAGRAPH
+    if is_quote:
+        return Block(BlockType.QUOTE, "\n".join([line[1:].strip() for line in lines]))
+    if is_unordered:
+        return Block(BlockType.UNORDERED_LIST, "", tuple([line[2:] for line in lines if len(line) > 2]))
+    if is_ordered:
+        items = []
+        for i, line in enumerate(lines):
+            item = line[len(str(i + 1)) + 2:]
+            if item:
+                items.append(item)
+        return Block(BlockType.ORDERED_LIST, "", tuple(items))
+    return Block(BlockType.PARAGRAPH, text)
+
+
+def split_blocks(lines: Iterable[str]) -> Iterator[List[str]]:
+    """
+    Reads markdown line by line and yields the lines of each block as soon as it ends.
+
+    Blocks are separated by empty lines. Whitespace-only lines at the start or end of a block
+    are dropped and the block's first and last lines are stripped, exactly as
+    `markdown_to_blocks` does, so both produce the same blocks.
+
+    Args:
+        lines (Iterable[str]): The lines of the document without their trailing newlines.
+
+    Yields:
+        List[str]: The lines of each non-empty block in document order.
+    """
+    block_lines: List[str] = []
+    for line in itertools.chain(lines, [""]):
+        if line:
+            if block_lines or line.strip():
+                block_lines.append(line)
+            continue
+        if not block_lines:
+            continue
+        while not block_lines[-1].strip():
+            block_lines.pop()
+        block_lines[0] = block_lines[0].lstrip()
+        block_lines[-1] = block_lines[-1].rstrip()
+        yield block_lines
+        block_lines = []
+
+
+def scan_blocks(lines: Iterable[str]) -> Iterator[Block]:
+    """
+    Reads markdown line by line and yields each block, classified, as soon as it ends.
+
+    Args:
+        lines (Iterable[str]): The lines of the document without their trailing newlines.
+
+    Yields:
+        Block: Each non-empty block in document order. See `split_blocks`.
+    """
+    for block_lines in split_blocks(lines):
+        yield classify_block(block_lines)
+
+
+def read_lines(f: TextIO) -> Iterator[str]:
+    """
+    Yields the lines of an open file without their trailing newlines, reading through the
+    file's buffer so only one line is held at a time.
+
+    Args:
+        f (TextIO): The open file.
+
+    Yields:
+        str: Each line, from the current position to the end of the file.
+    """
+    for line in iter(f.readline, ""):
+        yield line[:-1] if line.endswith("\n") else line
+
+
+def find_title(lines: Iterable[str]) -> Optional[str]:
+    """
+    Finds a document's title: the first line of its first level-1 heading block, or else the
+    first line that starts with a single `#` (see `TITLE_LINE_PATTERN`). This is the one title
+    rule shared by the page renderer and the site index.
+
+    Lines are consumed only up to the end of the title's block, so a file can be read lazily.
+
+    Args:
+        lines (Iterable[str]): The lines of the document without their trailing newlines.
+
+    Returns:
+        Optional[str]: The title, or None if the document has none.
+    """
+    fallback: Optional[str] = None
+
+    def watch(lines: Iterable[str]) -> Iterator[str]:
+        nonlocal fallback
+        for line in lines:
+            if fallback is None:
+                match = TITLE_LINE_PATTERN.match(line)
+                if match:
+                    fallback = match.group(1).strip()
+            yield line
+
+    for block in scan_blocks(watch(lines)):
+        if block.block_type == BlockType.HEADING and block.level == 1:
+            return block.content.split("\n", 1)[0].strip()
+    return fallback
+
+
+# The element each type of block other than a heading becomes.
+BLOCK_TAGS = {
+    BlockType.PARAGRAPH: "p",
+    BlockType.QUOTE: "blockquote",
+    BlockType.ORDERED_LIST: "ol",
+    BlockType.UNORDERED_LIST: "ul",
+    BlockType.CODE: "pre",
+}
+
+
+def block_tag(block: Block) -> str:
+    """
+    Returns the tag of the element a block becomes. Code blocks become a `<pre>` holding a
+    `<code>`, and list items `<li>` elements inside the list's element.
+
+    Args:
+        block (Block): The block.
+
+    Returns:
+        str: The tag, e.g. "h2", "p" or "pre".
+    """
+    if block.block_type == BlockType.HEADING:
+        return HEADING_TAGS[block.level - 1]
+    return BLOCK_TAGS[block.block_type]
+
+
+def block_to_html_node(block: Block, metadata: Optional[DocumentMetadata] = None) -> HTMLNode:
+    """
+    Builds the HTML node of a single classified block, parsing its inline markdown.
+
+    Args:
+        block (Block): The block.
+        metadata (Optional[DocumentMetadata]): If given, a heading is recorded in it.
+
+    Returns:
+        HTMLNode: The block's node, e.g. a `<p>` or a `<pre>` holding a `<code>`.
+    """
+    blockType = block.block_type
+    tag = block_tag(block)
+    if blockType == BlockType.HEADING:
+        leafNodes = text_to_children(block.content)
+        if metadata is not None:
+            metadata.add_heading(block.level, block.content, "".join([leaf.value or "" for leaf in leafNodes]).replace("\n", " "))
+        return ParentNode(tag=tag, children=leafNodes)
+
+    elif blockType in (BlockType.ORDERED_LIST, BlockType.UNORDERED_LIST):
+        li_nodes = [HTMLNode(tag="li", children=text_to_children(item)) for item in block.items]
+        return ParentNode(tag=tag, children=li_nodes)
+
+    elif blockType == BlockType.CODE:
+        code_node = HTMLNode(tag="code", value=block.content)
+        return ParentNode(tag=tag, children=[code_node])
+
+    return ParentNode(tag=tag, children=text_to_children(block.content))
+
+
+def blocks_to_html_node(blocks: Iterable[Block], metadata: Optional[DocumentMetadata] = None) -> HTMLNode:
+    """
+    Builds the HTML node tree of a document from its classified blocks, parsing the inline
+    markdown of each block. See `markdown_to_html_node`.
+
+    Args:
+        blocks (Iterable[Block]): The document's blocks in order.
+        metadata (Optional[DocumentMetadata]): If given, every heading is recorded in it as it
+            is built.
+
+    Returns:
+        HTMLNode: A root HTMLNode (div) containing one child per block.
+    """
+    return HTMLNode(tag="div", children=[block_to_html_node(block, metadata) for block in blocks])
+
+
+def write_blocks_html(blocks: Iterable[Block], out: TextIO, metadata: Optional[DocumentMetadata] = None, transform: Optional[Callable[[HTMLNode], None]] = None) -> None:
+    """
+    Serializes a document block by block: each block's node is built, written to `out` and
+    dropped before the next block is read from `blocks`.
+
+    The output is identical to `blocks_to_html_node(blocks).write_html(out)`, but only one
+    block's nodes are alive at a time, so with a lazy `blocks` iterable (e.g. `scan_blocks`
+    over the lines of an open file) memory does not grow with the size of the document.
+
+    Args:
+        blocks (Iterable[Block]): The document's blocks in order.
+        out (TextIO): Any object with a `write(str)` method.
+        metadata (Optional[DocumentMetadata]): If given, every heading is recorded in it.
+        transform (Optional[Callable[[HTMLNode], None]]): If given, called with each block's
+            node before it is written, e.g. to rewrite its URLs.
+    """
+    out.write("<div>")
+    for block in blocks:
+        node = block_to_html_node(block, metadata)
+        if transform is not None:
+            transform(node)
+        node.write_html(out)
+    out.write("</div>")
+
 
-    
 def markdown_to_html_node(markdown: str) -> HTMLNode:
     """
     Converts a given Markdown string into a tree of HTMLNode objects, 
@@ -92,8 +321,9 @@ def markdown_to_html_node(markdown: str) -> HTMLNode:
         the parsed HTML structure of the Markdown content.
 
     Workflow:
-        1. Split the Markdown into blocks (paragraphs, code, lists, etc.).
-        2. Determine the block type for each section.
+        1. Scan the Markdown line by line into blocks (paragraphs, code, lists, etc.),
+           classifying each block and extracting its payload as it ends (`scan_blocks`).
+        2. Build the HTML nodes for each block from its type and payload.
         3. For each block type:
             - **Heading**: Parse heading level and wrap content in `<h1>`-`<h6>`.
             - **Paragraph**: Wrap inline-formatted text in `<p>`.
@@ -114,63 +344,38 @@ def markdown_to_html_node(markdown: str) -> HTMLNode:
         html_output = html_node.to_html()
 
     Notes:
-        - Assumes blocks are pre-separated using double newlines.
+        - Assumes blocks are separated by empty lines.
         - Relies on `text_to_children()` for processing inline formatting.
         - Preserves code block formatting without parsing inline markdown.
     """
-    blocks = markdown_to_blocks(markdown)
-    list_of_block_types = list(map(lambda x: block_to_block_type(x), blocks))
-    newChildrenHTMLNodes: List[HTMLNode] = []
-    
-    for i, blockType in enumerate(list_of_block_types):
-        block_text = blocks[i]
-        block_text = block_text.strip()
-        if blockType == BlockType.HEADING:
-            num_hashes = len(re.findall(r"^[#]{1,6}", blocks[i])[0])
-            block_content = block_text[num_hashes + 1:]
-            leafNodes = text_to_children(block_content) 
-            newNode = ParentNode(tag=f"h{num_hashes}", children=leafNodes)
-            newChildrenHTMLNodes.append(newNode)
-
-        elif blockType == BlockType.PARAGRAPH:
-            block_content = block_text
-            leafNodes = text_to_children(block_content)
-            newNode = ParentNode(tag="p",children=leafNodes)
-            newChildrenHTMLNodes.append(newNode)
-            
-
-        elif blockType == BlockType.QUOTE:
-            block_content = "\n".join([line[1:].strip() for line in block_text.split("\n")])
-            leafNodes = text_to_children(block_content)
-            newNode = ParentNode(tag="blockquote", children=leafNodes)
-            newChildrenHTMLNodes.append(newNode)
-
-        elif blockType == BlockType.ORDERED_LIST:
-            list_items = re.findall(r"^\d+\. (.+)", block_text, re.MULTILINE)
-            allHTMLNodes = [text_to_children(item) for item in list_items]
-            li_nodes = [HTMLNode(tag="li", children=allHTMLNodes[i]) for i in range(len(allHTMLNodes))]
-            
-            newNode = ParentNode(tag="ol", children=li_nodes)
-            newChildrenHTMLNodes.append(newNode)
-
-        elif blockType == BlockType.UNORDERED_LIST:
-            list_items = re.findall(r"^[-] (.+)", block_text, re.MULTILINE)
-            allHTMLNodes = [text_to_children(item) for item in list_items]
-            li_nodes = [HTMLNode(tag="li", children=allHTMLNodes[i]) for i in range(len(allHTMLNodes))]
-            
-            newNode = ParentNode(tag="ul", children=li_nodes)
-            newChildrenHTMLNodes.append(newNode)
-
-        elif blockType == BlockType.CODE:
-            block_content = re.findall(r"^`{3}([\s\S]+)`{3}$", block_text)[0]
-            block_content = block_content.lstrip()
-            code_node = HTMLNode(tag="code", value=block_content)
-            newNode = ParentNode(tag="pre", children=[code_node])
-
-            newChildrenHTMLNodes.append(newNode)
-
-    finalHTMLNode = HTMLNode(tag="div", children=newChildrenHTMLNodes)
-    return finalHTMLNode
+    return blocks_to_html_node(scan_blocks(markdown.split("\n")))
+
+
+class ParsedDocument(NamedTuple):
+    """
+    The result of parsing a markdown document.
+
+    Attributes:
+        node (HTMLNode): The root of the document's HTML node tree.
+        metadata (DocumentMetadata): The title and heading outline found while parsing.
+    """
+    node: HTMLNode
+    metadata: DocumentMetadata
+
+
+def parse_markdown(markdown: str) -> ParsedDocument:
+    """
+    Converts a markdown string into its HTML node tree, like `markdown_to_html_node`, and
+    collects the document's metadata in the same pass.
+
+    Args:
+        markdown (str): The Markdown string input to be converted.
+
+    Returns:
+        ParsedDocument: The node tree and the metadata.
+    """
+    metadata = DocumentMetadata()
+    return ParsedDocument(blocks_to_html_node(scan_blocks(markdown.split("\n")), metadata), metadata)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,78 @@
+import json
+import logging
+import sys
+import time
+from typing import Any, Optional
+
+# Build events (page built, asset placed, ...) are logged here, never to the console. The
+# logger has no handler and does not propagate until `configure_logging` is given an event
+# stream, so `events_enabled` is False and call sites skip measuring and emitting entirely.
+EVENTS = logging.getLogger("ssg.events")
+EVENTS.propagate = False
+EVENTS.setLevel(logging.CRITICAL + 1)
+
+LOG_FORMAT = "%(message)s"
+VERBOSE_LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formats each event record as a single JSON object: the event name, a Unix timestamp and
+    the fields passed to `emit_event`.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps({"event": record.getMessage(), "time": round(record.created, 6), **getattr(record, "fields", {})})
+
+
+def configure_logging(verbosity: int = 0, events: Optional[str] = None) -> None:
+    """
+    Sets up console logging and, optionally, the JSON-lines event stream.
+
+    Console output goes to stderr. With `verbosity` 0 only warnings and errors are shown,
+    1 adds progress summaries (INFO) and 2 or more adds a line per page and file (DEBUG).
+
+    Args:
+        verbosity (int): How much console output to show.
+        events (Optional[str]): Path the JSON-lines event stream is appended to, or "-" for stdout.
+            No events are recorded when None.
+    """
+    level = logging.WARNING if verbosity <= 0 else logging.INFO if verbosity == 1 else logging.DEBUG
+    logging.basicConfig(level=level, format=VERBOSE_LOG_FORMAT if verbosity >= 2 else LOG_FORMAT, stream=sys.stderr, force=True)
+
+    for handler in list(EVENTS.handlers):
+        EVENTS.removeHandler(handler)
+        handler.close()
+    if events is None:
+        EVENTS.setLevel(logging.CRITICAL + 1)
+        return
+    handler: logging.Handler = logging.StreamHandler(sys.stdout) if events == "-" else logging.FileHandler(events, encoding="utf-8")
+    handler.setFormatter(JsonLinesFormatter())
+    EVENTS.addHandler(handler)
+    EVENTS.setLevel(logging.INFO)
+
+
+def events_enabled() -> bool:
+    """
+    Returns True if build events are being recorded. Check this before measuring anything
+    that is only needed for an event.
+    """
+    return EVENTS.isEnabledFor(logging.INFO)
+
+
+def emit_event(event: str, **fields: Any) -> None:
+    """
+    Records a build event, if events are enabled.
+
+    Args:
+        event (str): The event name, e.g. "page_built".
+        **fields (Any): JSON-serializable details of the event.
+    """
+    if EVENTS.isEnabledFor(logging.INFO):
+        EVENTS.info(event, extra={"fields": fields})
+
+
+def elapsed(start: float) -> float:
+    """
+    Returns the seconds since `start` (a `time.perf_counter()` reading), rounded for events.
+    """
+    return round(time.perf_counter() - start, 6)
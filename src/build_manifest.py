@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Set
+
+MANIFEST_VERSION = 1
+
+
+def hash_file(path: str) -> str:
+    """
+    Computes the SHA-256 content hash of a file, reading it in fixed-size chunks.
+
+    Args:
+        path (str): Path to the file to hash.
+
+    Returns:
+        str: The hex digest of the file's contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    A persistent record of the inputs that produced each output of the last build.
+
+    Every source file (markdown page, static asset) is stored under its path relative
+    to the project root together with its content hash, its output path and the hashes
+    of any extra inputs it depends on (e.g. the page template). A source is rebuilt only
+    when one of those has changed or its output has gone missing.
+
+    The size and mtime of each source are stored alongside its hash so unchanged files
+    are not re-read just to prove they are unchanged.
+
+    Attributes:
+        path (str): Location of the manifest JSON file on disk.
+        root (str): Project root that all stored paths are relative to.
+        entries (Dict[str, Dict]): Manifest entries keyed by relative source path.
+    """
+    def __init__(self, path: str, root: str):
+        """
+        Initializes a BuildManifest and loads any existing manifest from `path`.
+
+        Args:
+            path (str): Location of the manifest JSON file.
+            root (str): Project root that stored paths are made relative to.
+        """
+        self.path = path
+        self.root = root
+        self.entries: Dict[str, Dict] = {}
+        self._seen: Set[str] = set()
+        self._hashes: Dict[str, str] = {}
+        self.load()
+
+    def load(self) -> None:
+        """
+        Loads the manifest from disk. A missing, unreadable or outdated manifest is
+        treated as empty, which forces a full rebuild.
+        """
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.entries = data.get("entries", {})
+
+    def save(self) -> None:
+        """
+        Writes the manifest to disk atomically (write to a temporary file, then rename).
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "entries": self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(path, self.root)
+
+    def file_hash(self, path: str) -> str:
+        """
+        Returns the content hash of a file, hashing it at most once per build.
+
+        If the manifest already holds an entry for the file with the same size and
+        mtime, the stored hash is reused without reading the file.
+
+        Args:
+            path (str): Path to the file.
+
+        Returns:
+            str: The hex digest of the file's contents.
+        """
+        key = self._key(path)
+        if key in self._hashes:
+            return self._hashes[key]
+        st = os.stat(path)
+        entry = self.entries.get(key)
+        if entry and entry.get("hash") and entry.get("size") == st.st_size and entry.get("mtime") == st.st_mtime_ns:
+            digest = entry["hash"]
+        else:
+            digest = hash_file(path)
+        self._hashes[key] = digest
+        return digest
+
+    def invalidate(self, path: str) -> None:
+        """
+        Forgets the hash memoized for `path` by `file_hash`, so a file that changed during a
+        long-running process (e.g. the dev server) is hashed again.
+
+        Args:
+            path (str): Path to the changed file.
+        """
+        self._hashes.pop(self._key(path), None)
+
+    def is_fresh(self, source: str, output: str, deps: Optional[Dict[str, str]] = None) -> bool:
+        """
+        Checks whether `output` is up to date with respect to `source` and `deps`,
+        and marks `source` as part of the current build.
+
+        Args:
+            source (str): Path to the source file.
+            output (str): Path to the output file generated from `source`.
+            deps (Optional[Dict[str, str]]): Extra inputs (name -> hash) the output depends on.
+
+        Returns:
+            bool: True if the output exists and nothing it was built from has changed.
+        """
+        key = self._key(source)
+        self._seen.add(key)
+        entry = self.entries.get(key)
+        if entry is None or not os.path.exists(output):
+            return False
+        return (
+            entry.get("hash") == self.file_hash(source)
+            and entry.get("output") == self._key(output)
+            and entry.get("deps", {}) == (deps or {})
+        )
+
+    def record(self, source: str, output: str, deps: Optional[Dict[str, str]] = None) -> None:
+        """
+        Records that `output` was successfully built from `source` and `deps`.
+
+        Args:
+            source (str): Path to the source file.
+            output (str): Path to the generated output file.
+            deps (Optional[Dict[str, str]]): Extra inputs (name -> hash) the output depends on.
+        """
+        key = self._key(source)
+        self._seen.add(key)
+        st = os.stat(source)
+        self.entries[key] = {
+            "hash": self.file_hash(source),
+            "size": st.st_size,
+            "mtime": st.st_mtime_ns,
+            "output": self._key(output),
+            "deps": deps or {},
+        }
+
+    def track(self, source: str, output: str) -> Optional[str]:
+        """
+        Records that `output` was produced from `source` without hashing the source.
+
+        Used for outputs whose freshness is decided elsewhere (e.g. static assets compared by
+        size and mtime) but which still need their orphaned outputs cleaned up. If `source`
+        used to produce a different output (e.g. a fingerprinted asset whose content changed),
+        that output is orphaned and deleted.
+
+        Args:
+            source (str): Path to the source file.
+            output (str): Path to the output file.
+
+        Returns:
+            Optional[str]: The previous output, if one was deleted.
+        """
+        key = self._key(source)
+        self._seen.add(key)
+        entry = self.entries.get(key)
+        if entry is not None and entry.get("output") == self._key(output):
+            return None
+        previous = self._remove_entry(key) if entry is not None else None
+        self.entries[key] = {"output": self._key(output)}
+        return previous
+
+    def outputs(self) -> Set[str]:
+        """
+        Returns the paths of the outputs of every recorded source.
+
+        Returns:
+            Set[str]: The output paths.
+        """
+        return {os.path.join(self.root, entry["output"]) for entry in self.entries.values()}
+
+    def remove_orphans(self) -> List[str]:
+        """
+        Deletes the outputs of every source that was not seen during this build
+        (i.e. the source was removed or renamed) and drops their manifest entries.
+
+        Returns:
+            List[str]: The output paths that were deleted.
+        """
+        removed = []
+        for key in [key for key in self.entries if key not in self._seen]:
+            output = self._remove_entry(key)
+            if output is not None:
+                removed.append(output)
+        return removed
+
+    def remove(self, source: str) -> List[str]:
+        """
+        Deletes the outputs of a removed source, or of every source below a removed directory,
+        and drops their manifest entries.
+
+        Args:
+            source (str): Path to the removed source file or directory.
+
+        Returns:
+            List[str]: The output paths that were deleted.
+        """
+        prefix = self._key(source)
+        removed = []
+        for key in [key for key in self.entries if key == prefix or key.startswith(prefix + os.sep)]:
+            output = self._remove_entry(key)
+            if output is not None:
+                removed.append(output)
+        return removed
+
+    def _remove_entry(self, key: str) -> Optional[str]:
+        self._hashes.pop(key, None)
+        output = os.path.join(self.root, self.entries.pop(key)["output"])
+        if os.path.isfile(output):
+            os.remove(output)
+            return output
+        return None
@@ -1,9 +1,23 @@
+import logging
 import os
-from typing import Optional, List
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Iterator, NamedTuple, Optional, List, Tuple
 import pathlib
 import shutil
+import stat
+import time
 
-print(os.path.join(str(pathlib.Path(__file__).parent), "public"))
+from asset_pipeline import AssetManifest
+from build_log import elapsed, emit_event, events_enabled
+from build_manifest import BuildManifest, hash_file
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
 
 class FileTreeNode:
     """
@@ -29,105 +43,359 @@ class FileTreeNode:
 
 class Directory:
     """
-    Represents a directory and its contents as a tree structure. 
-    Provides methods to construct the file tree and copy files recursively.
+    Represents a directory to be copied elsewhere.
+
+    This is a thin compatibility wrapper around `walk_tree` and `sync_to_dest`: copying never
+    needs the whole tree in memory. `generate_file_structure` still builds the `FileTreeNode`
+    tree for callers that want to inspect it.
 
     Attributes:
         source_path (str): The absolute path to the root of the source directory.
-        root (FileTreeNode): Root node representing the source directory.
+        root (FileTreeNode): Root node representing the source directory. Its children are
+            populated by `generate_file_structure`.
     """
     def __init__(self, source_path: str):
         """
-        Initializes a Directory instance, creating the root FileTreeNode 
-        and capturing its immediate children.
+        Initializes a Directory instance.
 
         Args:
             source_path (str): The absolute path of the source directory.
         """
         self.source_path = source_path
-        children = [FileTreeNode(os.path.join(self.source_path, item)) for item in os.listdir(self.source_path)]
-
-        self.root = FileTreeNode(self.source_path, children=children)
-    
+        self.root = FileTreeNode(self.source_path)
 
     def generate_file_structure(self) -> None:
         """
-        Recursively traverses the directory structure starting from `self.source_path`
-        and builds the file tree representation in memory.
-
-        The method iterates through all subdirectories and files, creating 
-        `FileTreeNode` objects to represent them.
+        Traverses the directory structure starting from `self.source_path` and builds the
+        file tree representation in memory, creating `FileTreeNode` objects for all
+        subdirectories and files.
         """
-
-        def add_children(node: FileTreeNode) -> None:
-            """
-            Helper function to recursively add child nodes to a given directory node.
-
-            Args:
-                node (FileTreeNode): The directory node whose children should be populated.
-            """
-            node.children = [FileTreeNode(os.path.join(node.path,item)) for item in os.listdir(node.path)]
-            sub_directories = list(filter(lambda kiddie_node: not os.path.isfile(kiddie_node.path), node.children))
-            if not sub_directories:
-                # base case: if no children are directories we can terminate the recursion
-                return
-            for directory_node in sub_directories:
-                add_children(directory_node)
-            return
-        
-        add_children(self.root)
-        return
-
+        nodes = {"": self.root}
+        self.root.children = []
+        for entry in walk_tree(self.source_path):
+            node = FileTreeNode(os.path.join(self.source_path, entry.path))
+            nodes[os.path.dirname(entry.path)].children.append(node)
+            if entry.is_dir:
+                nodes[entry.path] = node
 
     def copy_to_dest(self, to_path: str):
         """
-        Recursively copies the directory structure and its files from `source_path` to `to_path`.
+        Copies the directory structure and its files from `source_path` to `to_path`.
 
-        The method ensures:
-        - Directories are created at `to_path` before copying files.
-        - Files retain their metadata using `shutil.copy2()`.
+        Directories are created before the files inside them are copied, and files keep
+        their mode and modification time.
 
         Args:
             to_path (str): The destination directory path where files will be copied.
         """
-        stack = [(self.root, self.root.path)]
+        sync_to_dest(self.source_path, to_path)
+
+
+class TreeEntry(NamedTuple):
+    """
+    An entry produced by `walk_tree`.
+
+    Attributes:
+        path (str): Path relative to the walked root.
+        is_dir (bool): Whether the entry is a directory.
+        stat (Optional[os.stat_result]): The entry's stat result. None for directories.
+    """
+    path: str
+    is_dir: bool
+    stat: Optional[os.stat_result]
+
+
+def walk_tree(root: str) -> Iterator[TreeEntry]:
+    """
+    Lazily walks a directory tree with `os.scandir`, depth first.
 
+    Entries are yielded as they are read, so consumers can act on them before the walk is
+    over, and only one open directory listing per level of depth is held at a time. Each
+    entry's cached type information is reused, so every entry is stat'ed exactly once.
+    A directory is always yielded before anything inside it.
+
+    Symlinked directories are followed, except into a directory that is already being walked
+    (a link to an ancestor), which would otherwise recurse forever. Symlinks whose target does
+    not exist are skipped with a warning.
+
+    Args:
+        root (str): The directory to walk.
+
+    Yields:
+        TreeEntry: Every directory and file below `root`.
+    """
+    root_stat = os.stat(root)
+    stack = [("", os.scandir(root), (root_stat.st_dev, root_stat.st_ino))]
+    ancestors = {stack[0][2]}
+    try:
         while stack:
-            curr, curr_path = stack.pop()
-            if os.path.isfile(curr_path):
-                # if a file we should copy to the new directory location
-                print(f"Copying file at {curr_path} to {curr_path.replace(self.source_path, to_path)}")
-                print()
-                shutil.copy2(src=curr_path, dst=curr_path.replace(self.source_path, to_path))
-            elif not os.path.isfile(curr_path) and os.path.exists(curr_path):
-                # not a file and exists -> is a directory so create it
-                print(f"Creating new directory {curr_path.replace(self.source_path, to_path)}")
-                print()
-                os.mkdir(curr_path.replace(self.source_path, to_path))
-
-            for child in curr.children:
-                stack.append((child,child.path))
-
-def copy_to_public():
-    """
-    Deletes the existing `public/` directory (if it exists), recreates it, and 
-    copies the entire `static/` directory structure into it.
-
-    This function:
+            relative_dir, entries, directory = stack[-1]
+            entry = next(entries, None)
+            if entry is None:
+                entries.close()
+                stack.pop()
+                ancestors.discard(directory)
+                continue
+            relative_path = os.path.join(relative_dir, entry.name)
+            try:
+                st = entry.stat()
+            except OSError as e:
+                # e.g. a symlink whose target is gone
+                logger.warning("Skipped %s: %s", os.path.join(root, relative_path), e)
+                continue
+            if entry.is_dir():
+                directory = (st.st_dev, st.st_ino)
+                if directory in ancestors:
+                    logger.warning("Skipped %s: it links back to a directory that contains it", os.path.join(root, relative_path))
+                    continue
+                yield TreeEntry(relative_path, True, None)
+                ancestors.add(directory)
+                stack.append((relative_path, os.scandir(entry.path), directory))
+            else:
+                yield TreeEntry(relative_path, False, st)
+    finally:
+        for _, entries, _ in stack:
+            entries.close()
+
+LINK_MODES = ("copy", "reflink", "hardlink")
+FICLONE = 0x40049409  # ioctl(2) request cloning a file's extents on Linux (btrfs, xfs, ...)
+
+DEFAULT_COPY_WORKERS = 8
+
+
+class SyncResult(NamedTuple):
+    """
+    Summary of a `sync_to_dest` run.
+
+    Attributes:
+        files (int): Number of files placed.
+        bytes (int): Total size of the files placed.
+        seconds (float): Wall time of the whole sync, including unchanged files.
+    """
+    files: int
+    bytes: int
+    seconds: float
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+
+def sync_to_dest(from_path: str, to_path: str, manifest: Optional[BuildManifest] = None, checksum: bool = False, link_mode: str = "copy", workers: int = DEFAULT_COPY_WORKERS, assets: Optional[AssetManifest] = None) -> SyncResult:
+    """
+    Incrementally syncs the directory tree at `from_path` into `to_path`.
+
+    Nothing is deleted up front and unchanged files are never rewritten: a file is placed
+    only when its destination is missing or differs in size or mtime (or in content, with
+    `checksum`). With a manifest, every synced file is tracked in it, so copies of files
+    removed from `from_path` are deleted by `BuildManifest.remove_orphans`.
+
+    The tree is streamed from `walk_tree`: each directory is created as soon as it is seen,
+    and each file is handed to a pool of `workers` threads that compare and place it while
+    the walk goes on. At most a few files per worker are queued at a time, so memory use
+    does not depend on the size of the tree. File copies spend their time in system calls
+    that release the GIL, so they overlap well.
+
+    With `assets`, every file is placed under a fingerprinted name (see `AssetManifest`),
+    hashed in the worker threads. When an asset's content changes, the copy under its old
+    name is deleted once the new one is in place.
+
+    Args:
+        from_path (str): The source directory.
+        to_path (str): The destination directory.
+        manifest (Optional[BuildManifest]): The build manifest tracking synced files.
+        checksum (bool): Compare file contents whenever the sizes match instead of trusting mtimes.
+        link_mode (str): How files are placed; see `place_file`.
+        workers (int): Number of copy threads. Defaults to 8.
+        assets (Optional[AssetManifest]): Fingerprints the synced files and collects their URLs.
+
+    Returns:
+        SyncResult: How many files and bytes were placed, and how long it took.
+    """
+    start = time.perf_counter()
+    os.makedirs(to_path, exist_ok=True)
+
+    record_events = events_enabled()
+
+    def sync_file(relative_path: str, src_stat: os.stat_result) -> Tuple[str, str, int]:
+        src = os.path.join(from_path, relative_path)
+        if assets is not None:
+            relative_path = assets.fingerprint(src, relative_path, src_stat)
+        dst = os.path.join(to_path, relative_path)
+        file_start = time.perf_counter() if record_events else 0.0
+        if files_match(src, src_stat, dst, checksum, link_mode == "hardlink"):
+            return src, dst, -1
+        method = place_file(src, dst, link_mode, src_stat)
+        logger.debug("Placed %s at %s (%s)", src, dst, method)
+        if record_events:
+            emit_event("asset_placed", source=src, output=dst, bytes=src_stat.st_size, method=method, seconds=elapsed(file_start))
+        return src, dst, src_stat.st_size
+
+    placed = placed_bytes = 0
+    pending: Deque[Future] = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        def collect(future: Future) -> None:
+            nonlocal placed, placed_bytes
+            src, dst, size = future.result()
+            if manifest is not None:
+                previous = manifest.track(src, dst)
+                if previous is not None:
+                    logger.info("Removed outdated asset %s", previous)
+            if size >= 0:
+                placed += 1
+                placed_bytes += size
+
+        for entry in walk_tree(from_path):
+            if entry.is_dir:
+                os.makedirs(os.path.join(to_path, entry.path), exist_ok=True)
+                continue
+            pending.append(executor.submit(sync_file, entry.path, entry.stat))
+            if len(pending) >= workers * 4:
+                collect(pending.popleft())
+        while pending:
+            collect(pending.popleft())
+    return SyncResult(placed, placed_bytes, time.perf_counter() - start)
+
+def files_match(src: str, src_stat: os.stat_result, dst: str, checksum: bool = False, hardlinked: bool = False) -> bool:
+    """
+    Checks whether `dst` is an up-to-date copy of `src`.
+
+    Args:
+        src (str): The source file.
+        src_stat (os.stat_result): The result of `os.stat(src)`.
+        dst (str): The destination file.
+        checksum (bool): Compare contents when the sizes match, instead of comparing mtimes.
+        hardlinked (bool): Whether `dst` is expected to be a hard link to `src`. If not, a
+            hard-linked `dst` never matches, so it gets replaced by a real copy.
+
+    Returns:
+        bool: True if `dst` exists and matches `src`.
+    """
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        return False
+    if dst_stat.st_size != src_stat.st_size:
+        return False
+    if (dst_stat.st_dev, dst_stat.st_ino) == (src_stat.st_dev, src_stat.st_ino):
+        return hardlinked
+    if checksum:
+        return hash_file(src) == hash_file(dst)
+    return dst_stat.st_mtime_ns == src_stat.st_mtime_ns
+
+def place_file(src: str, dst: str, link_mode: str = "copy", src_stat: Optional[os.stat_result] = None) -> str:
+    """
+    Places a copy of `src` at `dst`, replacing any existing file.
+
+    Link modes:
+        - "copy": copy the data with `shutil.copyfile` (which uses `os.sendfile` or other
+          in-kernel copies where available), then set the mode and times from `src_stat`.
+        - "reflink": clone the file copy-on-write where the filesystem supports it, so no data
+          is copied and later edits to either file stay separate.
+        - "hardlink": link `dst` to the same inode as `src`. No data is copied, but `dst` is
+          then the very same file: edits to one show up in the other.
+    Both link modes fall back to a plain copy when linking is not possible (e.g. `src` and
+    `dst` are on different filesystems).
+
+    Args:
+        src (str): The source file.
+        dst (str): The destination path. Its directory must exist.
+        link_mode (str): One of `LINK_MODES`.
+        src_stat (Optional[os.stat_result]): The result of `os.stat(src)`, if already known.
+
+    Returns:
+        str: The method actually used ("copy", "reflink" or "hardlink").
+    """
+    tmp_path = f"{dst}.{os.getpid()}.tmp"
+    if link_mode == "hardlink":
+        try:
+            os.link(src, tmp_path)
+            os.replace(tmp_path, dst)
+            return "hardlink"
+        except OSError:
+            if os.path.lexists(tmp_path):
+                os.remove(tmp_path)
+    elif link_mode == "reflink" and fcntl is not None:
+        try:
+            with open(src, "rb") as s, open(tmp_path, "wb") as d:
+                fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+            shutil.copystat(src, tmp_path)
+            os.replace(tmp_path, dst)
+            return "reflink"
+        except OSError:
+            if os.path.lexists(tmp_path):
+                os.remove(tmp_path)
+    if os.path.islink(dst) or (os.path.exists(dst) and os.stat(dst).st_nlink > 1):
+        # never write through a hard link back into the source tree
+        os.remove(dst)
+    if src_stat is None:
+        src_stat = os.stat(src)
+    shutil.copyfile(src, dst)
+    os.chmod(dst, stat.S_IMODE(src_stat.st_mode))
+    os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+    return "copy"
+
+def copy_asset(src: str, dst: str, manifest: BuildManifest, checksum: bool = False, link_mode: str = "copy") -> bool:
+    """
+    Places a single file at `dst` unless an up-to-date copy is already there
+    (see `files_match`), and tracks it in the manifest.
+
+    Args:
+        src (str): The source file.
+        dst (str): The destination path. Its directory must exist.
+        manifest (BuildManifest): The build manifest tracking synced files.
+        checksum (bool): Compare contents when the sizes match, instead of comparing mtimes.
+        link_mode (str): How the file is placed; see `place_file`.
+
+    Returns:
+        bool: True if the file was placed.
+    """
+    manifest.track(src, dst)
+    start = time.perf_counter()
+    src_stat = os.stat(src)
+    if files_match(src, src_stat, dst, checksum, link_mode == "hardlink"):
+        return False
+    method = place_file(src, dst, link_mode, src_stat)
+    logger.debug("Placed %s at %s (%s)", src, dst, method)
+    emit_event("asset_placed", source=src, output=dst, bytes=src_stat.st_size, method=method, seconds=elapsed(start))
+    return True
+
+def copy_to_public(manifest: Optional[BuildManifest] = None, checksum: bool = False, link_mode: str = "copy", project_directory: Optional[str] = None, assets: Optional[AssetManifest] = None):
+    """
+    Copies the entire `static/` directory structure into `public/`.
+
+    Without a manifest this:
     - Computes the project root path dynamically.
     - Removes the `public/` directory to ensure a fresh copy.
     - Uses the `Directory` class to recursively copy all files.
+
+    With a manifest, `public/` is kept and only new or changed assets are placed, and
+    copies of removed assets are deleted at the end of the build (see `sync_to_dest`).
+
+    Args:
+        manifest (Optional[BuildManifest]): Build manifest enabling incremental syncing.
+        checksum (bool): When syncing, compare file contents instead of trusting mtimes.
+        link_mode (str): When syncing, how files are placed; see `place_file`.
+        project_directory (Optional[str]): The project root holding `static/` and `public/`.
+            Defaults to the directory above `src/`.
+        assets (Optional[AssetManifest]): When syncing, fingerprints the assets; see
+            `sync_to_dest`.
     """
-    project_directory = str(pathlib.Path(__file__).parent.parent)
+    if project_directory is None:
+        project_directory = str(pathlib.Path(__file__).parent.parent)
     from_path = os.path.join(project_directory, "static")
     to_path = os.path.join(project_directory, "public")
 
-    print(f"Deleting {to_path} to prepare for copying")
-    print()
-    shutil.rmtree(to_path)
+    if manifest is not None:
+        result = sync_to_dest(from_path, to_path, manifest, checksum, link_mode, assets=assets)
+        logger.info("Synced static assets: %d files, %.1f MB in %.2fs (%.1f MB/s)", result.files, result.bytes / 1e6, result.seconds, result.bytes_per_second / 1e6)
+        emit_event("assets_synced", files=result.files, bytes=result.bytes, seconds=round(result.seconds, 6))
+        return
+
+    logger.info("Deleting %s to prepare for copying", to_path)
+    shutil.rmtree(to_path, ignore_errors=True)
 
     directory_tree = Directory(from_path)
-    directory_tree.generate_file_structure() # create file tree structure in memory
     directory_tree.copy_to_dest(to_path) # recreate src directory file structure in dst
 
-    print("Successfully completed src directory reconstruction")
+    logger.info("Copied %s to %s", from_path, to_path)
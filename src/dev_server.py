@@ -0,0 +1,420 @@
+import ctypes
+import ctypes.util
+import functools
+import http.server
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from build_manifest import BuildManifest
+from copy_to_public import copy_asset
+from generate_page import collect_pages, generate_page, page_destination, page_template
+from listings import ListingManifest, generate_listings
+from precompress import CompressionManifest, precompress_outputs
+from render_cache import RenderCache
+from site_index import SiteIndex
+from template import TEMPLATE_FILE_NAME, TemplateLoader
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) event flags
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """
+    Watches files and directory trees for changes using Linux inotify (through ctypes).
+
+    Directories are watched recursively, including directories created later. A single file
+    is watched through its parent directory so editors that save by renaming a new file over
+    the old one are still noticed.
+
+    Raises:
+        OSError: If inotify is not available on this platform.
+    """
+    def __init__(self, paths: List[str]):
+        """
+        Initializes an InotifyWatcher.
+
+        Args:
+            paths (List[str]): Files and directories to watch.
+        """
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._libc = libc
+        self._fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._roots = list(paths)
+        self._watches: Dict[int, str] = {}
+        self._tree_watches: Set[int] = set()
+        self._files: Set[str] = set()
+        for path in paths:
+            if os.path.isdir(path):
+                self._watch_tree(path)
+            else:
+                self._files.add(path)
+                self._add_watch(os.path.dirname(path))
+
+    def _add_watch(self, directory: str) -> int:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self._watches[wd] = directory
+        return wd
+
+    def _watch_tree(self, root: str) -> None:
+        for dir_path, _, _ in os.walk(root):
+            wd = self._add_watch(dir_path)
+            if wd >= 0:
+                self._tree_watches.add(wd)
+
+    def wait(self, timeout: Optional[float]) -> Set[str]:
+        """
+        Waits for changes.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait, or None to wait until something changes.
+
+        Returns:
+            Set[str]: Paths that were created, modified or removed. Empty if the timeout expired.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self._fd, 64 * 1024)
+        changed: Set[str] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                # events were dropped: report the roots so everything below them is rechecked
+                changed.update(self._roots)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._watches[wd]
+                self._tree_watches.discard(wd)
+                continue
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            if wd not in self._tree_watches:
+                if path in self._files:
+                    changed.add(path)
+                continue
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._watch_tree(path)
+            changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        """Releases the inotify file descriptor."""
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """
+    Watches files and directory trees for changes by comparing their size and mtime at a
+    fixed interval. Used where inotify is not available.
+    """
+    def __init__(self, paths: List[str], interval: float = 0.1):
+        """
+        Initializes a PollingWatcher.
+
+        Args:
+            paths (List[str]): Files and directories to watch.
+            interval (float): Seconds between scans. Defaults to 0.1.
+        """
+        self.paths = list(paths)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        stack = list(self.paths)
+        while stack:
+            path = stack.pop()
+            try:
+                if os.path.isdir(path):
+                    with os.scandir(path) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            else:
+                                st = entry.stat()
+                                snapshot[entry.path] = (st.st_size, st.st_mtime_ns)
+                else:
+                    st = os.stat(path)
+                    snapshot[path] = (st.st_size, st.st_mtime_ns)
+            except FileNotFoundError:
+                continue
+        return snapshot
+
+    def wait(self, timeout: Optional[float]) -> Set[str]:
+        """
+        Waits for changes.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait, or None to wait until something changes.
+
+        Returns:
+            Set[str]: Paths that were created, modified or removed. Empty if the timeout expired.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = self.interval if deadline is None else max(0.0, min(self.interval, deadline - time.monotonic()))
+            time.sleep(remaining)
+            snapshot = self._scan()
+            changed = {path for path in snapshot.keys() | self._snapshot.keys() if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        """Nothing to release; present for symmetry with InotifyWatcher."""
+
+
+def make_watcher(paths: List[str]):
+    """
+    Creates an InotifyWatcher, falling back to a PollingWatcher where inotify is unavailable.
+
+    Args:
+        paths (List[str]): Files and directories to watch.
+
+    Returns:
+        Union[InotifyWatcher, PollingWatcher]: The watcher.
+    """
+    try:
+        return InotifyWatcher(paths)
+    except (OSError, AttributeError, TypeError):
+        return PollingWatcher(paths)
+
+
+def watch_changes(watcher, debounce: float = 0.05) -> Iterator[Set[str]]:
+    """
+    Yields batches of changed paths. After the first change, changes keep being collected until
+    none arrive for `debounce` seconds, so a burst of saves triggers a single rebuild.
+
+    Args:
+        watcher (Union[InotifyWatcher, PollingWatcher]): The watcher to read from.
+        debounce (float): Quiet period in seconds that ends a batch. Defaults to 0.05.
+
+    Yields:
+        Set[str]: The paths changed in each batch.
+    """
+    while True:
+        changed = watcher.wait(None)
+        while changed:
+            more = watcher.wait(debounce)
+            if not more:
+                break
+            changed |= more
+        if changed:
+            yield changed
+
+
+def _is_within(path: str, directory: str) -> bool:
+    return path == directory or path.startswith(directory + os.sep)
+
+
+class SiteRebuilder:
+    """
+    Applies a batch of changed source paths to `public/`, touching only the affected outputs:
+    a changed page is regenerated, a changed asset is copied, and the outputs of removed
+    sources are deleted. A changed template regenerates the pages that use it. A page or
+    asset that fails is logged and skipped, so the rest of the batch is still applied.
+
+    Attributes:
+        content_path (str): The content directory.
+        static_path (str): The static assets directory.
+        public_path (str): The output directory.
+        template_path (str): The default page template.
+        manifest (BuildManifest): The build manifest, saved after every batch.
+        cache (Optional[RenderCache]): The render cache.
+        checksum (bool): Compare assets by content instead of size and mtime.
+        link_mode (str): How assets are placed; see `copy_to_public.place_file`.
+        index (SiteIndex): The site index, updated for every changed page and saved after
+            every batch.
+        listings (Optional[ListingManifest]): The listing pages, brought up to date after every
+            batch that changed a page. None if listing pages are not generated.
+        minify (bool): Whether pages are minified.
+        compression (Optional[CompressionManifest]): The precompressed outputs, brought up to
+            date after every batch. None if outputs are not precompressed.
+    """
+    def __init__(self, content_path: str, static_path: str, public_path: str, template_path: str, manifest: BuildManifest, cache: Optional[RenderCache] = None, checksum: bool = False, link_mode: str = "copy", index: Optional[SiteIndex] = None, listings: Optional[ListingManifest] = None, minify: bool = False, compression: Optional[CompressionManifest] = None):
+        """
+        Initializes a SiteRebuilder.
+
+        Args:
+            content_path (str): The content directory.
+            static_path (str): The static assets directory.
+            public_path (str): The output directory.
+            template_path (str): The default page template.
+            manifest (BuildManifest): The build manifest of the initial build.
+            cache (Optional[RenderCache]): The render cache.
+            checksum (bool): Compare assets by content instead of size and mtime.
+            link_mode (str): How assets are placed; see `copy_to_public.place_file`.
+            index (Optional[SiteIndex]): The site index of the initial build. Built in memory
+                if not given.
+            listings (Optional[ListingManifest]): The listing pages of the initial build.
+            minify (bool): Minify pages, as the initial build did. Defaults to False.
+            compression (Optional[CompressionManifest]): The precompressed outputs of the
+                initial build.
+        """
+        self.content_path = os.path.abspath(content_path)
+        self.static_path = os.path.abspath(static_path)
+        self.public_path = os.path.abspath(public_path)
+        self.template_path = os.path.abspath(template_path)
+        self.manifest = manifest
+        self.cache = cache
+        self.checksum = checksum
+        self.link_mode = link_mode
+        self.loader = TemplateLoader(self.template_path, self.content_path)
+        if index is None:
+            index = SiteIndex(None, self.content_path)
+            index.update()
+        self.index = index
+        self.listings = listings
+        self.minify = minify
+        self.compression = compression
+
+    def apply(self, changed: Set[str]) -> None:
+        """
+        Rebuilds the outputs affected by `changed`.
+
+        Args:
+            changed (Set[str]): Changed, created or removed files or directories.
+        """
+        pages: Set[str] = set()
+        assets: Set[str] = set()
+        template_changed = False
+        removed_pages: List[str] = []
+        for path in sorted(os.path.abspath(path) for path in changed):
+            if os.path.basename(path) == TEMPLATE_FILE_NAME and (path == self.template_path or _is_within(path, self.content_path)):
+                self.manifest.invalidate(path)
+                template_changed = True
+            elif not (_is_within(path, self.content_path) or _is_within(path, self.static_path)):
+                continue
+            elif not os.path.exists(path):
+                removed_pages = self.index.remove(path) or removed_pages
+                for output in self.manifest.remove(path):
+                    logger.info("Removed %s", output)
+            elif os.path.isdir(path):
+                for dir_path, _, file_names in os.walk(path):
+                    for file_name in file_names:
+                        self._classify(os.path.join(dir_path, file_name), pages, assets)
+            else:
+                self._classify(path, pages, assets)
+
+        for src in sorted(assets):
+            dst = os.path.join(self.public_path, os.path.relpath(src, self.static_path))
+            try:
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                copy_asset(src, dst, self.manifest, self.checksum, self.link_mode)
+            except OSError as e:
+                # e.g. the asset was removed again before it could be copied
+                logger.error("Failed to copy %s: %s: %s", src, type(e).__name__, e)
+
+        if template_changed:
+            # which template applies to which directory may have changed as well
+            self.loader = TemplateLoader(self.template_path, self.content_path)
+            for src in sorted(pages):
+                self._rebuild_page(src, update_index=True, generate=False)
+            for src, _ in collect_pages(self.content_path, self.public_path):
+                self._rebuild_page(src)
+        else:
+            for src in sorted(pages):
+                self._rebuild_page(src, update_index=True)
+        if self.listings is not None and (pages or removed_pages or template_changed):
+            generate_listings(self.index, self.public_path, self.loader, self.listings, minify=self.minify)
+            self.listings.save()
+        if self.compression is not None:
+            precompress_outputs(self.public_path, self.compression, placed=self.manifest.outputs())
+            self.compression.save()
+        self.manifest.save()
+        self.index.save()
+
+    def _rebuild_page(self, src: str, update_index: bool = False, generate: bool = True) -> None:
+        try:
+            if update_index:
+                self.index.update_page(src)
+            if not generate:
+                return
+            tpl = page_template(src, self.loader, self.index)
+            if tpl is None:
+                # the page is a draft
+                for output in self.manifest.remove(src):
+                    logger.info("Removed %s", output)
+                return
+            generate_page(src, tpl, page_destination(src, self.content_path, self.public_path), self.manifest, self.cache, self.loader, minify=self.minify)
+        except Exception as e:
+            logger.error("Failed to generate page from %s: %s: %s", src, type(e).__name__, e)
+
+    def _classify(self, path: str, pages: Set[str], assets: Set[str]) -> None:
+        self.manifest.invalidate(path)
+        if _is_within(path, self.static_path):
+            assets.add(path)
+        elif os.path.splitext(path)[1] == ".md":
+            pages.add(path)
+
+
+class DevRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Serves files from `public/` with `Cache-Control: no-cache`, so browsers revalidate every
+    response with If-Modified-Since and get a cheap 304 for anything that was not rebuilt.
+    """
+    def end_headers(self):
+        self.send_header("Cache-Control", "no-cache")
+        super().end_headers()
+
+
+def serve(rebuilder: SiteRebuilder, bind: str = "127.0.0.1", port: int = 8888, debounce: float = 0.05) -> None:
+    """
+    Serves `public/` over HTTP while watching the sources and rebuilding what changes.
+
+    Runs until interrupted with Ctrl-C.
+
+    Args:
+        rebuilder (SiteRebuilder): Rebuilder for a site that has already been built once.
+        bind (str): Address to listen on. Defaults to 127.0.0.1.
+        port (int): Port to listen on. Defaults to 8888.
+        debounce (float): Quiet period in seconds that ends a batch of changes.
+    """
+    handler = functools.partial(DevRequestHandler, directory=rebuilder.public_path)
+    server = http.server.ThreadingHTTPServer((bind, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    watcher = make_watcher([rebuilder.content_path, rebuilder.static_path, rebuilder.template_path])
+    logger.info("Serving %s at http://%s:%d/ (watching with %s)", rebuilder.public_path, bind, port, type(watcher).__name__)
+    try:
+        for changed in watch_changes(watcher, debounce):
+            start = time.perf_counter()
+            try:
+                rebuilder.apply(changed)
+            except Exception:
+                # keep watching: the next change may well fix it
+                logger.exception("Rebuild of %d changed path(s) failed", len(changed))
+                continue
+            logger.info("Rebuilt %d changed path(s) in %.1f ms", len(changed), (time.perf_counter() - start) * 1000)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        watcher.close()
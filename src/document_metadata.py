@@ -0,0 +1,92 @@
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+SLUG_STRIP_PATTERN = re.compile(r"[^\w\- ]")
+
+
+def slugify(text: str) -> str:
+    """
+    Turns heading text into a URL fragment: lowercased, punctuation removed and spaces
+    replaced by hyphens.
+
+    Args:
+        text (str): The plain heading text.
+
+    Returns:
+        str: The slug, e.g. "Why Redis?" -> "why-redis".
+    """
+    return SLUG_STRIP_PATTERN.sub("", text.strip().lower()).replace(" ", "-")
+
+
+class Heading(NamedTuple):
+    """
+    An entry of a document's heading outline.
+
+    Attributes:
+        level (int): The heading level (1-6).
+        text (str): The heading as plain text, without inline markdown.
+        slug (str): A slug for the heading, unique within the document.
+    """
+    level: int
+    text: str
+    slug: str
+
+
+class DocumentMetadata:
+    """
+    Facts about a markdown document gathered while it is parsed, so nothing needs to scan
+    the markdown again afterwards.
+
+    Attributes:
+        title (Optional[str]): The first line of the first level-1 heading, as written (inline
+            markdown included). None if the document has no level-1 heading.
+        headings (List[Heading]): Every heading in document order.
+    """
+    def __init__(self, title: Optional[str] = None, headings: Optional[List[Heading]] = None):
+        """
+        Initializes a DocumentMetadata.
+
+        Args:
+            title (Optional[str]): The document title.
+            headings (Optional[List[Heading]]): The heading outline.
+        """
+        self.title = title
+        self.headings: List[Heading] = headings if headings is not None else []
+        self._slugs: Set[str] = {heading.slug for heading in self.headings}
+
+    def add_heading(self, level: int, markdown: str, text: str) -> Heading:
+        """
+        Records a heading, and takes it as the title if it is the first level-1 heading.
+
+        Args:
+            level (int): The heading level.
+            markdown (str): The heading content as written.
+            text (str): The heading content as plain text.
+
+        Returns:
+            Heading: The recorded outline entry.
+        """
+        if level == 1 and self.title is None:
+            self.title = markdown.split("\n", 1)[0].strip()
+        base = slugify(text) or "section"
+        slug, suffix = base, 1
+        while slug in self._slugs:
+            slug = f"{base}-{suffix}"
+            suffix += 1
+        self._slugs.add(slug)
+        heading = Heading(level, text, slug)
+        self.headings.append(heading)
+        return heading
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the metadata as JSON-serializable data.
+        """
+        return {"title": self.title, "headings": [list(heading) for heading in self.headings]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DocumentMetadata":
+        """
+        Rebuilds metadata saved with `to_dict`.
+        """
+        return cls(data.get("title"), [Heading(*heading) for heading in data.get("headings", [])])
@@ -0,0 +1,405 @@
+import io
+from array import array
+from typing import Dict, List, Mapping, Optional, TextIO, Tuple
+
+from blocktype import BlockType, block_tag, scan_blocks
+from htmlnode import EMPTY_PROPS, HTMLNode
+from inline_tokenizer import tokenize_inline
+from leafnode import LeafNode
+from parentnode import ParentNode
+from textnode import TextType, text_node_to_html_node
+
+# Node kinds, one per node class, since each class serializes slightly differently.
+KIND_ELEMENT = 0  # HTMLNode
+KIND_PARENT = 1  # ParentNode
+KIND_LEAF = 2  # LeafNode
+
+NO_NODE = -1
+
+# Leaf tags of the inline types that carry no props; links and images go through
+# `text_node_to_html_node`.
+_INLINE_TAGS: Dict[TextType, Optional[str]] = {
+    TextType.TEXT: None,
+    TextType.BOLD: "b",
+    TextType.ITALIC: "i",
+    TextType.CODE: "code",
+}
+
+
+class FlatTree:
+    """
+    An HTML node tree stored as parallel arrays instead of a graph of `HTMLNode` objects.
+
+    Node `i` is described by the `i`-th entry of every array. Nodes are stored in document
+    (pre-order) order, so the descendants of node `i` are exactly the nodes
+    `i + 1 .. subtree_ends[i] - 1`, and serializing the tree is one pass over the indices.
+    All values and prop keys and values are slices of the single `text` buffer.
+
+    A tree holds a handful of arrays of machine integers and one string however many nodes
+    it has. `benchmark.py` times parsing into it and serializing it against node objects
+    (`markdown_to_flat_tree` and `flat_to_html`). Build one with `FlatTreeBuilder`,
+    `FlatTree.from_html_node` or `markdown_to_flat_tree`, and convert it back with
+    `to_html_node`.
+
+    Attributes:
+        kinds (array): `KIND_ELEMENT`, `KIND_PARENT` or `KIND_LEAF` per node.
+        tags (array): Index into `tag_names` per node.
+        parents (array): Parent index per node (`NO_NODE` for the root).
+        first_children (array): Index of the first child per node, or `NO_NODE`.
+        next_siblings (array): Index of the next sibling per node, or `NO_NODE`.
+        subtree_ends (array): One past the index of the last descendant per node.
+        in_paragraph (array): 1 if an enclosing `<p>` makes the node render newlines as spaces.
+        value_starts (array): Start of the node's value in `text`, or -1 if it has none.
+        value_ends (array): End of the node's value in `text`.
+        prop_starts (array): Index of the node's first prop in `prop_offsets` (in props, not ints).
+        prop_counts (array): Number of props per node.
+        prop_offsets (array): Start and end in `text` of each prop's key and value, four ints per prop.
+        tag_names (List[Optional[str]]): The distinct tags; index 0 is "no tag".
+        text (str): The shared text buffer.
+    """
+    def __init__(self):
+        """
+        Initializes an empty FlatTree.
+        """
+        self.kinds = array("b")
+        self.tags = array("H")
+        self.parents = array("i")
+        self.first_children = array("i")
+        self.next_siblings = array("i")
+        self.subtree_ends = array("i")
+        self.in_paragraph = array("b")
+        self.value_starts = array("i")
+        self.value_ends = array("i")
+        self.prop_starts = array("i")
+        self.prop_counts = array("H")
+        self.prop_offsets = array("i")
+        self.tag_names: List[Optional[str]] = [None]
+        self.text = ""
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def value(self, index: int) -> Optional[str]:
+        """
+        Returns the value of node `index`, or None if it has none.
+        """
+        start = self.value_starts[index]
+        return self.text[start:self.value_ends[index]] if start >= 0 else None
+
+    def props(self, index: int) -> Dict[str, str]:
+        """
+        Returns the props of node `index` as a new dict.
+        """
+        text, offsets = self.text, self.prop_offsets
+        props = {}
+        for at in range(self.prop_starts[index] * 4, (self.prop_starts[index] + self.prop_counts[index]) * 4, 4):
+            props[text[offsets[at]:offsets[at + 1]]] = text[offsets[at + 2]:offsets[at + 3]]
+        return props
+
+    def children(self, index: int) -> List[int]:
+        """
+        Returns the indices of the children of node `index` in order.
+        """
+        children = []
+        child = self.first_children[index]
+        while child != NO_NODE:
+            children.append(child)
+            child = self.next_siblings[child]
+        return children
+
+    def _props_to_html(self, index: int) -> str:
+        count = self.prop_counts[index]
+        if not count:
+            return ""
+        text, offsets = self.text, self.prop_offsets
+        parts = []
+        for at in range(self.prop_starts[index] * 4, (self.prop_starts[index] + count) * 4, 4):
+            parts.append(f' {text[offsets[at]:offsets[at + 1]]}="{text[offsets[at + 2]:offsets[at + 3]]}"')
+        return "".join(parts)
+
+    def to_html(self) -> str:
+        """
+        Serializes the tree to an HTML string, exactly as `HTMLNode.to_html` would.
+        """
+        buffer = io.StringIO()
+        self.write_html(buffer)
+        return buffer.getvalue()
+
+    def write_html(self, out: TextIO) -> None:
+        """
+        Serializes the tree into `out`, producing the same HTML as `HTMLNode.write_html` on the
+        equivalent node tree.
+
+        Nodes are visited in index order; the closing tags of open elements wait on a stack
+        until the loop passes the end of their subtree.
+
+        Args:
+            out (TextIO): Any object with a `write(str)` method.
+        """
+        write = out.write
+        kinds, tags, in_paragraph, prop_counts = self.kinds, self.tags, self.in_paragraph, self.prop_counts
+        value_starts, value_ends, subtree_ends, text = self.value_starts, self.value_ends, self.subtree_ends, self.text
+        tag_names = self.tag_names
+        # "<tag>" and "</tag>" per tag id, so nodes without props need no formatting
+        openings = [f"<{tag}>" for tag in tag_names]
+        closings = [f"</{tag}>" for tag in tag_names]
+        closing: List[Tuple[int, str]] = []
+        index, count = 0, len(kinds)
+        while index < count:
+            while closing and closing[-1][0] <= index:
+                write(closing.pop()[1])
+            kind = kinds[index]
+            tag_id = tags[index]
+            start = value_starts[index]
+            value = text[start:value_ends[index]] if start >= 0 else None
+            if prop_counts[index]:
+                opening = f"<{tag_names[tag_id]}{self._props_to_html(index)}>"
+            else:
+                opening = openings[tag_id]
+
+            if kind == KIND_LEAF:
+                html = opening + value + closings[tag_id] if tag_id else value
+                if in_paragraph[index] or tag_names[tag_id] == "p":
+                    html = html.replace("\n", " ")
+                write(html)
+                index += 1
+                continue
+
+            if not tag_id and kind == KIND_ELEMENT:
+                # an HTMLNode without a tag renders its value only, never its children
+                html = value or ""
+                write(html.replace("\n", " ") if in_paragraph[index] else html)
+                index = subtree_ends[index]
+                continue
+
+            if kind == KIND_ELEMENT:
+                if value:
+                    opening += value.replace("\n", " ") if tag_names[tag_id] == "p" else value
+                if in_paragraph[index]:
+                    opening = opening.replace("\n", " ")
+            elif in_paragraph[index] or tag_names[tag_id] == "p":
+                opening = opening.replace("\n", " ")
+            write(opening)
+            closing.append((subtree_ends[index], closings[tag_id]))
+            index += 1
+        while closing:
+            write(closing.pop()[1])
+
+    def to_html_node(self, index: int = 0) -> HTMLNode:
+        """
+        Converts the subtree rooted at node `index` back into `HTMLNode` objects of the
+        original classes, for callers that work with node objects.
+
+        Args:
+            index (int): The root of the subtree to convert. Defaults to the whole tree.
+
+        Returns:
+            HTMLNode: The root of the rebuilt tree.
+        """
+        nodes: Dict[int, HTMLNode] = {}
+        for i in range(self.subtree_ends[index] - 1, index - 1, -1):
+            tag = self.tag_names[self.tags[i]]
+            children = [nodes.pop(child) for child in self.children(i)]
+            props = self.props(i) if self.prop_counts[i] else None
+            kind = self.kinds[i]
+            if kind == KIND_LEAF:
+                nodes[i] = LeafNode(self.value(i), tag, props)
+            elif kind == KIND_PARENT:
+                nodes[i] = ParentNode(tag, children, props)
+            else:
+                nodes[i] = HTMLNode(tag, self.value(i), children or None, props)
+        return nodes[index]
+
+    @classmethod
+    def from_html_node(cls, root: HTMLNode) -> "FlatTree":
+        """
+        Flattens a tree of `HTMLNode` objects.
+
+        Args:
+            root (HTMLNode): The root of the tree.
+
+        Returns:
+            FlatTree: The equivalent flat tree.
+        """
+        builder = FlatTreeBuilder()
+        stack: List[Tuple[Optional[HTMLNode], int, bool]] = [(root, NO_NODE, False)]
+        while stack:
+            node, parent, in_paragraph = stack.pop()
+            if node is None:
+                builder.close(parent)
+                continue
+            if isinstance(node, LeafNode):
+                builder.leaf(node.value, node.tag, node.props, parent, in_paragraph)
+                continue
+            kind = KIND_PARENT if isinstance(node, ParentNode) else KIND_ELEMENT
+            index = builder.open(kind, node.tag, node.value, node.props, parent, in_paragraph)
+            children_in_paragraph = in_paragraph or (kind == KIND_PARENT and node.tag == "p")
+            stack.append((None, index, False))
+            for child in reversed(node.children):
+                stack.append((child, index, children_in_paragraph))
+        return builder.build()
+
+
+class FlatTreeBuilder:
+    """
+    Appends nodes to a `FlatTree` in document order.
+
+    Every node must be added after its parent and before any node that follows the parent's
+    subtree: call `open` for a node with children, add its children, then `close` it. Leaves
+    are added with `leaf`.
+
+    Nodes are collected as rows and turned into the tree's columns, sibling links included,
+    in one pass by `build`.
+    """
+    def __init__(self):
+        """
+        Initializes a builder for an empty tree.
+        """
+        self._rows: List[Tuple[int, int, int, bool, int, int, int, int]] = []
+        self._ends: List[int] = []
+        self._parts: List[str] = []
+        self._length = 0
+        self._prop_offsets: List[int] = []
+        self._tag_ids: Dict[Optional[str], int] = {None: 0}
+        self._tag_names: List[Optional[str]] = [None]
+        self._key_offsets: Dict[str, int] = {}
+
+    def _tag_id(self, tag: Optional[str]) -> int:
+        tag_id = self._tag_ids.get(tag)
+        if tag_id is None:
+            tag_id = self._tag_ids[tag] = len(self._tag_names)
+            self._tag_names.append(tag)
+        return tag_id
+
+    def _add_props(self, props: Mapping[str, str]) -> int:
+        start = len(self._prop_offsets) // 4
+        for key, value in props.items():
+            # prop keys repeat on nearly every node that has props, so each is stored once
+            key_start = self._key_offsets.get(key)
+            if key_start is None:
+                key_start = self._key_offsets[key] = self._length
+                self._parts.append(key)
+                self._length += len(key)
+            value_start = self._length
+            self._parts.append(value)
+            self._length += len(value)
+            self._prop_offsets.extend((key_start, key_start + len(key), value_start, self._length))
+        return start
+
+    def open(self, kind: int, tag: Optional[str], value: Optional[str], props: Mapping[str, str], parent: int, in_paragraph: bool) -> int:
+        """
+        Adds a node whose children follow, and returns its index. Call `close` with the index
+        once all of its descendants have been added.
+
+        Args:
+            kind (int): `KIND_ELEMENT`, `KIND_PARENT` or `KIND_LEAF`.
+            tag (Optional[str]): The node's tag.
+            value (Optional[str]): The node's value.
+            props (Mapping[str, str]): The node's props.
+            parent (int): The parent's index, or `NO_NODE` for the root.
+            in_paragraph (bool): Whether an enclosing `<p>` makes the node render newlines as spaces.
+
+        Returns:
+            int: The index of the new node.
+        """
+        index = len(self._rows)
+        if value is None:
+            value_start = value_end = -1
+        else:
+            value_start = self._length
+            self._parts.append(value)
+            self._length = value_end = value_start + len(value)
+        prop_start = self._add_props(props) if props else 0
+        self._rows.append((kind, self._tag_id(tag), parent, in_paragraph, value_start, value_end, prop_start, len(props)))
+        self._ends.append(index + 1)
+        return index
+
+    def close(self, index: int) -> None:
+        """
+        Marks the end of the subtree of node `index`.
+        """
+        self._ends[index] = len(self._rows)
+
+    def leaf(self, value: str, tag: Optional[str], props: Mapping[str, str], parent: int, in_paragraph: bool) -> int:
+        """
+        Adds a `LeafNode` and returns its index.
+        """
+        return self.open(KIND_LEAF, tag, value, props, parent, in_paragraph)
+
+    def build(self) -> FlatTree:
+        """
+        Finishes the tree. The builder must not be used afterwards.
+
+        Returns:
+            FlatTree: The built tree.
+        """
+        tree = FlatTree()
+        count = len(self._rows)
+        if count:
+            kinds, tags, parents, in_paragraph, value_starts, value_ends, prop_starts, prop_counts = zip(*self._rows)
+            tree.kinds = array("b", kinds)
+            tree.tags = array("H", tags)
+            tree.parents = array("i", parents)
+            tree.in_paragraph = array("b", in_paragraph)
+            tree.value_starts = array("i", value_starts)
+            tree.value_ends = array("i", value_ends)
+            tree.prop_starts = array("i", prop_starts)
+            tree.prop_counts = array("H", prop_counts)
+        first_children = [NO_NODE] * count
+        next_siblings = [NO_NODE] * count
+        for index in range(count - 1, 0, -1):
+            parent = parents[index]
+            if parent != NO_NODE:
+                next_siblings[index] = first_children[parent]
+                first_children[parent] = index
+        tree.first_children = array("i", first_children)
+        tree.next_siblings = array("i", next_siblings)
+        tree.subtree_ends = array("i", self._ends)
+        tree.prop_offsets = array("i", self._prop_offsets)
+        tree.tag_names = self._tag_names
+        tree.text = "".join(self._parts)
+        self._rows, self._parts = [], []
+        return tree
+
+
+def _add_inline(builder: FlatTreeBuilder, text: str, parent: int, in_paragraph: bool) -> None:
+    for text_node in tokenize_inline(text):
+        text_type = text_node.text_type
+        if text_type in _INLINE_TAGS:
+            builder.leaf(text_node.text, _INLINE_TAGS[text_type], EMPTY_PROPS, parent, in_paragraph)
+        else:
+            leaf = text_node_to_html_node(text_node)
+            builder.leaf(leaf.value, leaf.tag, leaf.props, parent, in_paragraph)
+
+
+def markdown_to_flat_tree(markdown: str) -> FlatTree:
+    """
+    Parses markdown straight into a `FlatTree`, without creating `HTMLNode` objects.
+
+    Blocks are classified by `scan_blocks` and mapped to their elements by `block_tag`, as for
+    `markdown_to_html_node`, so the tree has the same shape and renders the same HTML.
+
+    Args:
+        markdown (str): The markdown document.
+
+    Returns:
+        FlatTree: The parsed document.
+    """
+    builder = FlatTreeBuilder()
+    root = builder.open(KIND_ELEMENT, "div", None, EMPTY_PROPS, NO_NODE, False)
+    for block in scan_blocks(markdown.split("\n")):
+        block_type = block.block_type
+        tag = block_tag(block)
+        index = builder.open(KIND_PARENT, tag, None, EMPTY_PROPS, root, False)
+        if block_type == BlockType.CODE:
+            builder.close(builder.open(KIND_ELEMENT, "code", block.content, EMPTY_PROPS, index, False))
+        elif block.items:
+            for item in block.items:
+                item_index = builder.open(KIND_ELEMENT, "li", None, EMPTY_PROPS, index, False)
+                _add_inline(builder, item, item_index, False)
+                builder.close(item_index)
+        elif block_type not in (BlockType.ORDERED_LIST, BlockType.UNORDERED_LIST):
+            _add_inline(builder, block.content, index, tag == "p")
+        builder.close(index)
+    builder.close(root)
+    return builder.build()
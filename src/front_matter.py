@@ -0,0 +1,202 @@
+import datetime
+import io
+import logging
+import re
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+# Opening fence -> separator between keys and values. `---` opens YAML-style front matter
+# (`key: value`), `+++` TOML-style front matter (`key = value`).
+FENCES = {"---": ":", "+++": "="}
+KEY_PATTERN = re.compile(r"[A-Za-z_][\w-]*$")
+INTEGER_PATTERN = re.compile(r"[-+]?\d+$")
+
+logger = logging.getLogger(__name__)
+
+
+class FrontMatter:
+    """
+    The metadata block at the top of a markdown page.
+
+    ```
+    ---
+    title: Why Tom Bombadil Was a Mistake
+    date: 2024-05-01
+    tags: [tolkien, opinion]
+    draft: false
+    template: post.html
+    ---
+    ```
+
+    A page without front matter gets an empty FrontMatter: no title or date, no tags, not a
+    draft and the template of its directory.
+
+    Attributes:
+        fields (Dict[str, Any]): Every key of the block with its parsed value.
+        title (Optional[str]): The page title, overriding the first heading.
+        date (Optional[str]): The publication date in ISO format (`YYYY-MM-DD`, optionally
+            followed by a time).
+        tags (List[str]): The page's tags.
+        draft (bool): Whether the page is left out of the build.
+        template (Optional[str]): The template to render the page with, relative to the project
+            directory.
+    """
+    def __init__(self, fields: Optional[Dict[str, Any]] = None):
+        """
+        Initializes a FrontMatter.
+
+        Args:
+            fields (Optional[Dict[str, Any]]): The parsed keys and values.
+
+        Raises:
+            ValueError: If `date` is not an ISO date or `draft` is not a boolean.
+        """
+        self.fields: Dict[str, Any] = fields if fields is not None else {}
+        self.title: Optional[str] = _optional_str(self.fields.get("title"))
+        self.date: Optional[str] = _optional_str(self.fields.get("date"))
+        if self.date is not None:
+            try:
+                datetime.date.fromisoformat(self.date[:10])
+            except ValueError:
+                raise ValueError(f"Invalid front matter date: {self.date!r}") from None
+        tags = self.fields.get("tags", [])
+        if isinstance(tags, str):
+            tags = tags.split(",")
+        self.tags: List[str] = [str(tag).strip() for tag in tags if str(tag).strip()]
+        self.draft = self.fields.get("draft", False)
+        if not isinstance(self.draft, bool):
+            raise ValueError(f"Invalid front matter draft flag: {self.draft!r}")
+        self.template: Optional[str] = _optional_str(self.fields.get("template"))
+
+    def context(self) -> Dict[str, str]:
+        """
+        Returns the template slot values of the page: every field under its own name, plus
+        `Date` and `Tags` (comma separated), which are always set so they never show up as
+        unfilled placeholders.
+
+        Returns:
+            Dict[str, str]: Slot values keyed by slot name.
+        """
+        context = {key: ", ".join(map(str, value)) if isinstance(value, list) else str(value) for key, value in self.fields.items()}
+        context["Date"] = self.date or ""
+        context["Tags"] = ", ".join(self.tags)
+        return context
+
+
+def read_front_matter(f: TextIO) -> FrontMatter:
+    """
+    Reads the front matter at the current position of `f`, leaving `f` at the first line of
+    the page body.
+
+    Only the front matter itself is read: parsing stops at the closing fence. If `f` does not
+    start with a fence, the fence is never closed, or the lines between the fences are not
+    fields (see `parse_fields`), `f` is rewound and an empty FrontMatter is returned, so a page
+    that merely starts with a thematic break renders as before. The last case is logged, in
+    case it was meant as front matter.
+
+    Args:
+        f (TextIO): A seekable text file (or `io.StringIO`).
+
+    Returns:
+        FrontMatter: The parsed front matter.
+
+    Raises:
+        ValueError: If the front matter's `date` or `draft` is invalid (see `FrontMatter`).
+    """
+    start = f.tell()
+    fence = f.readline().rstrip("\r\n")
+    if fence not in FENCES:
+        f.seek(start)
+        return FrontMatter()
+    lines = []
+    for line in iter(f.readline, ""):
+        line = line.rstrip("\r\n")
+        if line == fence:
+            try:
+                fields = parse_fields(lines, FENCES[fence])
+            except ValueError as e:
+                logger.warning("Reading %s without front matter: %s", getattr(f, "name", "page"), e)
+                break
+            return FrontMatter(fields)
+        lines.append(line)
+    f.seek(start)
+    return FrontMatter()
+
+
+def split_front_matter(text: str) -> Tuple[FrontMatter, str]:
+    """
+    Splits a page into its front matter and its markdown body.
+
+    Args:
+        text (str): The page source.
+
+    Returns:
+        Tuple[FrontMatter, str]: The front matter and the body.
+    """
+    f = io.StringIO(text)
+    front_matter = read_front_matter(f)
+    return front_matter, text[f.tell():]
+
+
+def parse_fields(lines: List[str], separator: str = ":") -> Dict[str, Any]:
+    """
+    Parses the lines between the fences into a dict.
+
+    Supported are `key<separator>value` lines with strings (quoted or bare), integers,
+    booleans and inline lists (`[a, "b"]`), YAML-style block lists (a key without a value
+    followed by `- item` lines), blank lines and `#` comments.
+
+    Args:
+        lines (List[str]): The lines between the fences.
+        separator (str): `:` for YAML-style, `=` for TOML-style front matter.
+
+    Returns:
+        Dict[str, Any]: The parsed keys and values in order of appearance.
+
+    Raises:
+        ValueError: If a line is not one of the supported forms.
+    """
+    fields: Dict[str, Any] = {}
+    block_list: Optional[List[Any]] = None
+    for number, line in enumerate(lines, start=2):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if block_list is not None and stripped.startswith("- "):
+            block_list.append(parse_value(stripped[2:]))
+            continue
+        key, found, value = line.partition(separator)
+        key = key.strip()
+        if not found or not KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid front matter on line {number}: {line!r}")
+        value = value.strip()
+        if value:
+            fields[key] = parse_value(value)
+            block_list = None
+        else:
+            block_list = fields[key] = []
+    return fields
+
+
+def parse_value(value: str) -> Any:
+    """
+    Parses a single front matter value.
+
+    Args:
+        value (str): The value as written, without surrounding whitespace.
+
+    Returns:
+        Any: A str, int, bool or list of those.
+    """
+    if value.startswith("[") and value.endswith("]"):
+        return [parse_value(item.strip()) for item in value[1:-1].split(",") if item.strip()]
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value in ("true", "false"):
+        return value == "true"
+    if INTEGER_PATTERN.match(value):
+        return int(value)
+    return value
+
+
+def _optional_str(value: Any) -> Optional[str]:
+    return str(value) if value is not None else None
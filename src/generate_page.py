@@ -1,11 +1,33 @@
-import re
-from blocktype import markdown_to_html_node
+import contextlib
+import io
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, TextIO, Tuple, Union
+from asset_pipeline import rewrite_node_urls
+from blocktype import blocks_to_html_node, classify_block, find_title, parse_markdown, read_lines, scan_blocks, split_blocks, write_blocks_html
+from build_log import elapsed, emit_event, events_enabled
+from build_manifest import BuildManifest
+from document_metadata import DocumentMetadata
+from front_matter import read_front_matter
+from htmlnode import HTMLNode
+from image_size import ImageSize, ImageSizeCache, add_image_dimensions
+from minify import minified, minify_html
+from profiler import PhaseTimes, Profiler
+from render_cache import CachedFragment, RenderCache
+from site_index import SiteIndex
+from template import Template, TemplateLoader
 import os
+
+logger = logging.getLogger(__name__)
+
+# Markdown files larger than this are rendered block by block straight from the file (see
+# `render_page_streaming`) instead of being read into memory whole.
+STREAM_THRESHOLD_BYTES = 16 * 1024 * 1024
+
 def extract_title(markdown: str) -> str:
     """
-    Extracts the title from a Markdown string.
-
-    The title is assumed to be the first level-1 Markdown heading (starting with '#').
+    Extracts the title from a Markdown string; see `blocktype.find_title`.
 
     Args:
         markdown (str): The Markdown content.
@@ -16,20 +38,282 @@ def extract_title(markdown: str) -> str:
     Raises:
         Exception: If no valid title heading is found in the Markdown content.
     """
-    matchgroup = re.findall(r"^[#]([^#].+)", markdown, re.MULTILINE)
-    if matchgroup:
-        return matchgroup[0].strip()
-    else:
+    title = find_title(markdown.split("\n"))
+    if title is None:
         raise Exception("Incorrect Format: Missing header")
+    return title
+
+def document_title(metadata: DocumentMetadata, markdown: str) -> str:
+    """
+    Returns a page's title: the first level-1 heading found while the page was parsed.
+
+    Only a document whose title line is not a heading block (e.g. `#Title` without a space)
+    is searched again with `extract_title`.
+
+    Args:
+        metadata (DocumentMetadata): The metadata gathered while parsing `markdown`.
+        markdown (str): The Markdown content.
+
+    Returns:
+        str: The page title.
+
+    Raises:
+        Exception: If the document has no title.
+    """
+    if metadata.title:
+        return metadata.title
+    return extract_title(markdown)
+
+def write_page(out: TextIO, template: Template, title: str, html_node: Union[HTMLNode, CachedFragment, "StreamedBody"], context: Optional[Mapping[str, str]] = None) -> None:
+    """
+    Streams a rendered page into `out`: the template's literal text with {{ Title }} filled in
+    and {{ Content }} serialized straight from the node tree. Any other slot is filled from
+    `context` (the page's front matter).
+
+    The page body is never materialized as a single string, so peak memory does not grow
+    with the size of the rendered HTML.
+
+    Args:
+        out (TextIO): The open output file (or any object with a `write(str)` method).
+        template (Template): The compiled page template.
+        title (str): The page title substituted for {{ Title }}.
+        html_node (Union[HTMLNode, CachedFragment, StreamedBody]): The root node of the page
+            body, its already rendered fragment from the render cache, or the body streamed
+            from the markdown file.
+        context (Optional[Mapping[str, str]]): Values for the template's other slots.
+    """
+    template.write(out, {**(context or {}), "Title": title, "Content": html_node})
+
+class StreamedBody:
+    """
+    A page body rendered straight from an open markdown file.
+
+    It provides the same `write_html(out)` method as `HTMLNode`, so it can fill the template's
+    {{ Content }} slot: the file is read one line at a time, and each block is rendered and
+    written as soon as it ends.
+
+    Attributes:
+        f (TextIO): The open markdown file.
+        start (int): The position of the body in `f` (after any front matter).
+        asset_urls (Mapping[str, str]): Fingerprinted asset URLs each block is rewritten with.
+        image_sizes (Mapping[str, ImageSize]): Sizes of local images, added to each block's images.
+    """
+    def __init__(self, f: TextIO, start: int, asset_urls: Optional[Mapping[str, str]] = None, image_sizes: Optional[Mapping[str, ImageSize]] = None):
+        """
+        Initializes a StreamedBody.
+
+        Args:
+            f (TextIO): The open markdown file.
+            start (int): The position of the body in `f`, as returned by `f.tell()`.
+            asset_urls (Optional[Mapping[str, str]]): Fingerprinted asset URLs, if assets are
+                fingerprinted.
+            image_sizes (Optional[Mapping[str, ImageSize]]): Sizes of local images, if they are
+                added to the page.
+        """
+        self.f = f
+        self.start = start
+        self.asset_urls = asset_urls or {}
+        self.image_sizes = image_sizes or {}
+
+    def write_html(self, out: TextIO) -> None:
+        """
+        Renders the body into `out`.
+
+        Args:
+            out (TextIO): Any object with a `write(str)` method.
+        """
+        self.f.seek(self.start)
+        transform = (lambda node: rewrite_body(node, self.asset_urls, self.image_sizes)) if self.asset_urls or self.image_sizes else None
+        write_blocks_html(scan_blocks(read_lines(self.f)), out, transform=transform)
+
+def rewrite_body(html_node: HTMLNode, asset_urls: Optional[Mapping[str, str]], image_sizes: Optional[Mapping[str, ImageSize]]) -> None:
+    """
+    Applies the build's rewrites to a freshly parsed body: image sizes first, since they are
+    looked up by the original image URLs, then fingerprinted asset URLs.
+
+    Args:
+        html_node (HTMLNode): The body, or one block of it.
+        asset_urls (Optional[Mapping[str, str]]): Fingerprinted asset URLs.
+        image_sizes (Optional[Mapping[str, ImageSize]]): Sizes of local images.
+    """
+    if image_sizes:
+        add_image_dimensions(html_node, image_sizes)
+    if asset_urls:
+        rewrite_node_urls(html_node, asset_urls)
+
+def stream_title(f: TextIO, start: int) -> str:
+    """
+    Finds a page's title (see `blocktype.find_title`) in an open markdown file without reading
+    the file into memory. Reading stops as soon as the title is found.
+
+    Args:
+        f (TextIO): The open markdown file.
+        start (int): The position of the body in `f`.
+
+    Returns:
+        str: The page title, the same as `document_title` finds for the whole body.
+
+    Raises:
+        Exception: If the document has no title.
+    """
+    f.seek(start)
+    title = find_title(read_lines(f))
+    if title is None:
+        raise Exception("Incorrect Format: Missing header")
+    return title
+
+def render_page_streaming(f: TextIO, template: Template, dest_path: str, asset_urls: Optional[Mapping[str, str]] = None, minify: bool = False, image_sizes: Optional[Mapping[str, ImageSize]] = None) -> str:
+    """
+    Renders a page like `render_page`, but straight from the open markdown file: the title is
+    found in a first pass that stops at the title, and the body is then rendered one block at
+    a time and written out before the next block is read. Peak memory stays at about one block
+    however large the file is.
+
+    The render cache is not used, since it is keyed by the whole markdown text.
+
+    Args:
+        f (TextIO): The markdown file, open at its start.
+        template (Template): The compiled HTML template.
+        dest_path (str): Destination path where the generated HTML page will be saved.
+        asset_urls (Optional[Mapping[str, str]]): Fingerprinted asset URLs to rewrite links with.
+        minify (bool): Minify the page as it is written.
+        image_sizes (Optional[Mapping[str, ImageSize]]): Sizes of local images to add to them.
+
+    Returns:
+        str: The page title.
+    """
+    front_matter = read_front_matter(f)
+    start = f.tell()
+    page_title = front_matter.title or stream_title(f, start)
+
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    with open(dest_path, "w") as out, minified(out, minify) as out:
+        write_page(out, template, page_title, StreamedBody(f, start, asset_urls, image_sizes), front_matter.context())
+    return page_title
+
+def render_page(from_path: str, template: Template, dest_path: str, cache: Optional[RenderCache] = None, profiler: Optional[Profiler] = None, stream_threshold: int = STREAM_THRESHOLD_BYTES, asset_urls: Optional[Mapping[str, str]] = None, minify: bool = False, image_sizes: Optional[Mapping[str, ImageSize]] = None) -> str:
+    """
+    Reads a Markdown file, renders it into an already loaded template and streams the result
+    to `dest_path`.
+
+    The page's front matter is read first and stripped from the body. Its title takes
+    precedence over the first heading, and its fields fill the template's other slots.
+
+    Args:
+        from_path (str): Path to the Markdown file.
+        template (Template): The compiled HTML template.
+        dest_path (str): Destination path where the generated HTML page will be saved.
+        cache (Optional[RenderCache]): If given, the rendered body is taken from the cache when
+            the same markdown was rendered before, and stored in it otherwise.
+        profiler (Optional[Profiler]): If given, the page is rendered one phase at a time and
+            each phase is timed. See `render_page_profiled`.
+        stream_threshold (int): Files larger than this many bytes are rendered block by block
+            without being read into memory. See `render_page_streaming`.
+        asset_urls (Optional[Mapping[str, str]]): Fingerprinted asset URLs: `href` and `src`
+            attributes of the body that refer to fingerprinted assets are rewritten. A cache
+            shared between builds must then use a `variant` that depends on them.
+        minify (bool): Minify the page while it is streamed to `dest_path` (see
+            `minify.HTMLMinifier`). The render cache keeps the unminified body.
+        image_sizes (Optional[Mapping[str, ImageSize]]): (width, height) by local image URL:
+            the body's images of known size get their dimensions and lazy loading attributes
+            (see `image_size.add_image_dimensions`). Like `asset_urls`, they end up in the
+            render cache, whose `variant` must then depend on them.
+
+    Returns:
+        str: The page title.
+    """
+    if profiler is not None:
+        return render_page_profiled(from_path, template, dest_path, profiler, cache, asset_urls, minify, image_sizes)
+    with open(from_path, 'r') as f:
+        if os.fstat(f.fileno()).st_size > stream_threshold:
+            return render_page_streaming(f, template, dest_path, asset_urls, minify, image_sizes)
+        front_matter = read_front_matter(f)
+        markdown = f.read()
+
+    html_node: Union[HTMLNode, CachedFragment, None] = cache.get(markdown) if cache is not None else None
+    metadata = html_node.metadata() if html_node is not None else None
+    if metadata is None:
+        html_node, metadata = parse_markdown(markdown)
+        rewrite_body(html_node, asset_urls, image_sizes)
+        if cache is not None:
+            html_node = cache.put(markdown, html_node, metadata)
+    page_title = front_matter.title or document_title(metadata, markdown)
+
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    with open(dest_path, "w") as f, minified(f, minify) as f:
+        write_page(f, template, page_title, html_node, front_matter.context())
+    return page_title
 
-def generate_page(from_path: str, template_path: str, dest_path: str) -> None:
+def render_page_profiled(from_path: str, template: Template, dest_path: str, profiler: Profiler, cache: Optional[RenderCache] = None, asset_urls: Optional[Mapping[str, str]] = None, minify: bool = False, image_sizes: Optional[Mapping[str, ImageSize]] = None) -> str:
+    """
+    Renders a page like `render_page`, timing each phase separately in `profiler`.
+
+    To tell the phases apart, each one runs to completion before the next starts: the blocks
+    are all split before any is classified, and the body and then the whole page are built as
+    strings before anything is written. The output is identical to `render_page`'s, but peak
+    memory is higher, so this is only used when profiling.
+
+    Args:
+        from_path (str): Path to the Markdown file.
+        template (Template): The compiled HTML template.
+        dest_path (str): Destination path where the generated HTML page will be saved.
+        profiler (Profiler): Collects the phase times under the page's source path.
+        cache (Optional[RenderCache]): Render cache consulted before parsing the Markdown.
+        asset_urls (Optional[Mapping[str, str]]): Fingerprinted asset URLs to rewrite links with.
+        minify (bool): Minify the page, timed as its own phase.
+        image_sizes (Optional[Mapping[str, ImageSize]]): Sizes of local images to add to them.
+
+    Returns:
+        str: The page title.
+    """
+    with profiler.phase("read", from_path):
+        with open(from_path, 'r') as f:
+            front_matter = read_front_matter(f)
+            markdown = f.read()
+        cached = cache.get(markdown) if cache is not None else None
+        metadata = cached.metadata() if cached is not None else None
+
+    html_node: Union[HTMLNode, CachedFragment]
+    if cached is None or metadata is None:
+        cached = None
+        metadata = DocumentMetadata()
+        with profiler.phase("block splitting", from_path):
+            block_lines = list(split_blocks(markdown.split("\n")))
+        with profiler.phase("block classification", from_path):
+            blocks = [classify_block(lines) for lines in block_lines]
+        with profiler.phase("inline parsing", from_path):
+            html_node = blocks_to_html_node(blocks, metadata)
+            rewrite_body(html_node, asset_urls, image_sizes)
+    else:
+        html_node = cached
+    if front_matter.title or metadata.title:
+        page_title = front_matter.title or metadata.title
+    else:
+        with profiler.phase("title extraction", from_path):
+            page_title = extract_title(markdown)
+    with profiler.phase("serialization", from_path):
+        body = io.StringIO()
+        html_node.write_html(body)
+    with profiler.phase("template fill", from_path):
+        page = template.render({**front_matter.context(), "Title": page_title, "Content": body.getvalue()})
+    if minify:
+        with profiler.phase("minification", from_path):
+            page = minify_html(page)
+    with profiler.phase("disk write", from_path):
+        if cache is not None and cached is None:
+            cache.put(markdown, body.getvalue(), metadata)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, "w") as f:
+            f.write(page)
+    return page_title
+
+def generate_page(from_path: str, template_path: str, dest_path: str, manifest: Optional[BuildManifest] = None, cache: Optional[RenderCache] = None, loader: Optional[TemplateLoader] = None, profiler: Optional[Profiler] = None, minify: bool = False, images: Optional[ImageSizeCache] = None) -> None:
     """
     Generates a single HTML page from a Markdown file using a provided template.
 
     This function:
         - Reads the Markdown content.
-        - Converts the Markdown to HTML.
-        - Extracts the page title from the Markdown.
+        - Converts the Markdown to HTML, picking up the page title on the way.
         - Injects the title and HTML content into the template.
         - Writes the final HTML page to the destination path.
 
@@ -37,58 +321,291 @@ def generate_page(from_path: str, template_path: str, dest_path: str) -> None:
         from_path (str): Path to the Markdown file.
         template_path (str): Path to the HTML template file containing {{ Title }} and {{ Content }} placeholders.
         dest_path (str): Destination path where the generated HTML page will be saved.
+        manifest (Optional[BuildManifest]): If given, the page is skipped when neither the
+            Markdown file nor the template changed since the last build.
+        cache (Optional[RenderCache]): Render cache consulted before parsing the Markdown.
+        loader (Optional[TemplateLoader]): Loader holding already compiled templates, so the
+            template is read and compiled once per build rather than once per page. Its
+            asset URLs are applied to the page.
+        profiler (Optional[Profiler]): If given, the time spent in each phase is recorded.
+        minify (bool): Minify the page's HTML.
+        images (Optional[ImageSizeCache]): If given, the sizes of local images are added to
+            the page's images.
 
     Returns:
         None
     """
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    print()
-    print(f"Reading markdown file at {from_path}")
-    with open(from_path, 'r') as f:
-        markdown = f.read()
-    print()
-    print(f"Reading template file from {template_path}")
-    with open(template_path, 'r') as f:
-        template = f.read()
+    if loader is None:
+        loader = TemplateLoader(template_path)
+    if manifest is not None:
+        deps = page_deps(manifest, template_path, loader, minify, images)
+        if manifest.is_fresh(from_path, dest_path, deps):
+            return
 
-    html_node = markdown_to_html_node(markdown)
-    html_string = html_node.to_html()
+    start = time.perf_counter()
+    template = loader.load(template_path)
 
-    page_title = extract_title(markdown)
-    print("Page Title: " + page_title)
-    new_template = template.replace("{{ Title }}", page_title).replace("{{ Content }}", html_string)
+    page_title = render_page(from_path, template, dest_path, cache, profiler, asset_urls=loader.asset_urls, minify=minify, image_sizes=images.sizes if images is not None else None)
+    logger.debug("Generated %s from %s using %s (title: %s)", dest_path, from_path, template_path, page_title)
+    if events_enabled():
+        emit_event("page_built", source=from_path, output=dest_path, bytes=os.path.getsize(dest_path), seconds=elapsed(start))
 
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    print("Saving updated template!")
-    with open(dest_path, "w") as f:
-        f.write(new_template)
+    if manifest is not None:
+        manifest.record(from_path, dest_path, deps)
+
+def page_deps(manifest: BuildManifest, template_path: str, loader: TemplateLoader, minify: bool = False, images: Optional[ImageSizeCache] = None) -> Dict[str, str]:
+    """
+    Lists the inputs besides its markdown that a page is rendered from, for the build manifest:
+    its template, the asset URLs when assets are fingerprinted, whether it is minified and the
+    image sizes when they are added.
 
-    print("Static page created")
+    Args:
+        manifest (BuildManifest): The build manifest, which caches the template's hash.
+        template_path (str): The page's template.
+        loader (TemplateLoader): The build's template loader.
+        minify (bool): Whether the page is minified.
+        images (Optional[ImageSizeCache]): The image sizes, if they are added.
+
+    Returns:
+        Dict[str, str]: Input hashes keyed by input name.
+    """
+    deps = {"template": manifest.file_hash(template_path)}
+    if loader.asset_digest is not None:
+        deps["assets"] = loader.asset_digest
+    if minify:
+        deps["minify"] = "1"
+    if images is not None:
+        deps["images"] = images.digest()
+    return deps
+
+def page_template(page_path: str, loader: TemplateLoader, index: SiteIndex) -> Optional[str]:
+    """
+    Picks the template of a page: the one named in its front matter, or else the one of its
+    directory. Draft pages are left out of the build unless the index includes drafts.
+
+    Args:
+        page_path (str): Path to the Markdown file.
+        loader (TemplateLoader): The build's template loader.
+        index (SiteIndex): The site index holding the page's front matter.
+
+    Returns:
+        Optional[str]: Path to the page's template, or None if the page is not built.
+    """
+    if not index.is_built(page_path):
+        return None
+    info = index.get(page_path)
+    return loader.resolve(page_path, info.template if info is not None else None)
 
-def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir_path: str) -> None:
+def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir_path: str, manifest: Optional[BuildManifest] = None, cache: Optional[RenderCache] = None, loader: Optional[TemplateLoader] = None, profiler: Optional[Profiler] = None, index: Optional[SiteIndex] = None, asset_urls: Optional[Mapping[str, str]] = None, minify: bool = False, images: Optional[ImageSizeCache] = None, errors: Optional[Dict[str, str]] = None) -> Dict[str, str]:
     """
     Recursively generates HTML pages from a directory of Markdown files.
 
     This function traverses the source directory, converts each Markdown file into an HTML page
     using the provided template, and replicates the folder structure in the destination directory.
+    A `template.html` inside a content directory overrides the template for the pages below it,
+    and a page's front matter can name its own template. Draft pages are skipped.
+
+    A page that fails to render does not stop the build; its error is reported and returned.
 
     Args:
         dir_path_content (str): Path to the source directory containing Markdown files (and possibly subdirectories).
-        template_path (str): Path to the HTML template file.
+        template_path (str): Path to the default HTML template file.
         dest_dir_path (str): Path to the destination directory where the generated HTML pages will be saved.
+        manifest (Optional[BuildManifest]): Build manifest used to skip unchanged pages.
+        cache (Optional[RenderCache]): Render cache consulted before parsing each page.
+        loader (Optional[TemplateLoader]): Template loader shared across the recursion. Created
+            on the first call.
+        profiler (Optional[Profiler]): If given, directory listing is timed as file discovery
+            and each page's phases are recorded.
+        index (Optional[SiteIndex]): The site index of the content directory. Built in memory
+            on the first call if not given.
+        asset_urls (Optional[Mapping[str, str]]): Fingerprinted asset URLs that templates and
+            pages are rewritten with. Used on the first call to create the loader.
+        minify (bool): Minify the pages' HTML.
+        images (Optional[ImageSizeCache]): If given, the sizes of local images are added to
+            the pages' images.
+        errors (Optional[Dict[str, str]]): Errors collected across the recursion. Created on
+            the first call.
 
     Returns:
-        None
+        Dict[str, str]: Errors keyed by the Markdown path that failed. Empty if every page was built.
     """
+    if errors is None:
+        errors = {}
+    if loader is None:
+        loader = TemplateLoader(template_path, dir_path_content, asset_urls)
+    if index is None:
+        index = SiteIndex(None, dir_path_content)
+        index.update()
     if not os.path.isfile(dir_path_content) and os.path.exists(dir_path_content): 
-        content = [file for file in os.listdir(dir_path_content)]
-        for file in content:
-            if os.path.isfile(os.path.join(dir_path_content, file)):
+        with profiler.phase("file discovery") if profiler is not None else contextlib.nullcontext():
+            content = [(file, os.path.isfile(os.path.join(dir_path_content, file))) for file in os.listdir(dir_path_content)]
+        for file, is_file in content:
+            if is_file:
                 if os.path.splitext(os.path.join(dir_path_content, file))[1] == '.md':
-                    generate_page(os.path.join(dir_path_content, file), template_path, os.path.join(dest_dir_path, os.path.splitext(file)[0] + ".html"))
+                    page_path = os.path.join(dir_path_content, file)
+                    try:
+                        page_template_path = page_template(page_path, loader, index)
+                        if page_template_path is not None:
+                            generate_page(page_path, page_template_path, os.path.join(dest_dir_path, os.path.splitext(file)[0] + ".html"), manifest, cache, loader, profiler, minify, images)
+                    except Exception as e:
+                        logger.error("Failed to generate page from %s: %s: %s", page_path, type(e).__name__, e)
+                        errors[page_path] = f"{type(e).__name__}: {e}"
             else:
                 os.makedirs(os.path.join(dest_dir_path, file), exist_ok=True)
-                generate_pages_recursive(os.path.join(dir_path_content, file), template_path, os.path.join(dest_dir_path, file))
-        return
-    else:
-        return
+                generate_pages_recursive(os.path.join(dir_path_content, file), template_path, os.path.join(dest_dir_path, file), manifest, cache, loader, profiler, index, minify=minify, images=images, errors=errors)
+    return errors
+
+
+def collect_pages(dir_path_content: str, dest_dir_path: str) -> List[Tuple[str, str]]:
+    """
+    Collects every Markdown file below `dir_path_content` together with the path of the
+    HTML page it should be rendered to, mirroring the folder structure in `dest_dir_path`.
+
+    Args:
+        dir_path_content (str): Path to the source directory containing Markdown files.
+        dest_dir_path (str): Path to the destination directory for the generated pages.
+
+    Returns:
+        List[Tuple[str, str]]: (source, destination) pairs, sorted by source path so the
+        build order is deterministic.
+    """
+    pages = []
+    for dir_path, _, file_names in os.walk(dir_path_content):
+        for file_name in file_names:
+            if os.path.splitext(file_name)[1] == ".md":
+                from_path = os.path.join(dir_path, file_name)
+                pages.append((from_path, page_destination(from_path, dir_path_content, dest_dir_path)))
+    pages.sort()
+    return pages
+
+def page_destination(from_path: str, dir_path_content: str, dest_dir_path: str) -> str:
+    """
+    Maps a Markdown file below `dir_path_content` to the HTML page it is rendered to.
+
+    Args:
+        from_path (str): Path to the Markdown file.
+        dir_path_content (str): Path to the content directory.
+        dest_dir_path (str): Path to the destination directory.
+
+    Returns:
+        str: The destination path, e.g. `content/blog/post/index.md` -> `public/blog/post/index.html`.
+    """
+    relative = os.path.splitext(os.path.relpath(from_path, dir_path_content))[0] + ".html"
+    return os.path.normpath(os.path.join(dest_dir_path, relative))
+
+_worker_templates: Dict[str, Template] = {}
+_worker_cache: Optional[RenderCache] = None
+_worker_profile = False
+_worker_asset_urls: Mapping[str, str] = {}
+_worker_minify = False
+_worker_image_sizes: Mapping[str, ImageSize] = {}
+
+def _init_worker(templates: Dict[str, Template], cache: Optional[RenderCache], profile: bool = False, asset_urls: Optional[Mapping[str, str]] = None, minify: bool = False, image_sizes: Optional[Mapping[str, ImageSize]] = None) -> None:
+    """
+    Process pool initializer: stores the compiled templates, asset URLs and image sizes once per worker
+    process so they are not pickled and sent along with every page, keeps the render cache if
+    one is used and records whether pages are profiled and minified.
+    """
+    global _worker_templates, _worker_cache, _worker_profile, _worker_asset_urls, _worker_minify, _worker_image_sizes
+    _worker_templates = templates
+    _worker_cache = cache
+    _worker_profile = profile
+    _worker_asset_urls = asset_urls or {}
+    _worker_minify = minify
+    _worker_image_sizes = image_sizes or {}
+
+class PageResult(NamedTuple):
+    """
+    The outcome of rendering one page in a worker process.
+
+    Attributes:
+        error (Optional[str]): None on success, otherwise a description of the error.
+        seconds (float): Wall time spent rendering the page.
+        phases (Optional[PhaseTimes]): The page's phase times when profiling.
+    """
+    error: Optional[str]
+    seconds: float
+    phases: Optional[PhaseTimes] = None
+
+def _render_page_worker(from_path: str, template_path: str, dest_path: str) -> PageResult:
+    """
+    Renders one page inside a worker process.
+
+    Returns:
+        PageResult: Whether the page was rendered, and how long it took.
+    """
+    start = time.perf_counter()
+    profiler = Profiler() if _worker_profile else None
+    try:
+        render_page(from_path, _worker_templates[template_path], dest_path, _worker_cache, profiler, asset_urls=_worker_asset_urls, minify=_worker_minify, image_sizes=_worker_image_sizes)
+    except Exception as e:
+        return PageResult(f"{type(e).__name__}: {e}", elapsed(start))
+    return PageResult(None, elapsed(start), profiler.pages.get(from_path) if profiler is not None else None)
+
+def generate_pages_parallel(dir_path_content: str, template_path: str, dest_dir_path: str, jobs: Optional[int] = None, manifest: Optional[BuildManifest] = None, cache: Optional[RenderCache] = None, profiler: Optional[Profiler] = None, index: Optional[SiteIndex] = None, asset_urls: Optional[Mapping[str, str]] = None, minify: bool = False, images: Optional[ImageSizeCache] = None) -> Dict[str, str]:
+    """
+    Generates HTML pages from a directory of Markdown files using a pool of worker processes.
+
+    The full list of pages is collected up front, unchanged pages are filtered out using the
+    manifest (if given), and the remaining pages are rendered in parallel. Each template is
+    compiled once and handed to each worker when it starts. Each page is written to its own file,
+    so the output does not depend on the order in which workers finish.
+
+    A page that fails to render does not stop the build; its error is reported and returned.
+
+    Args:
+        dir_path_content (str): Path to the source directory containing Markdown files.
+        template_path (str): Path to the default HTML template file.
+        dest_dir_path (str): Path to the destination directory for the generated pages.
+        jobs (Optional[int]): Number of worker processes. Defaults to the number of CPUs.
+        manifest (Optional[BuildManifest]): Build manifest used to skip unchanged pages.
+        cache (Optional[RenderCache]): Render cache shared by the workers. Entries are only
+            added during the build; call `RenderCache.prune` afterwards to evict.
+        profiler (Optional[Profiler]): If given, page collection is timed as file discovery and
+            the workers send back the phase times of each page they render.
+        index (Optional[SiteIndex]): The site index of the content directory, used to pick
+            templates and skip drafts. Built in memory if not given.
+        asset_urls (Optional[Mapping[str, str]]): Fingerprinted asset URLs that templates and
+            pages are rewritten with.
+        minify (bool): Minify the pages' HTML.
+        images (Optional[ImageSizeCache]): If given, the sizes of local images are added to
+            the pages' images.
+
+    Returns:
+        Dict[str, str]: Errors keyed by the Markdown path that failed. Empty if every page was built.
+    """
+    loader = TemplateLoader(template_path, dir_path_content, asset_urls)
+    with profiler.phase("file discovery") if profiler is not None else contextlib.nullcontext():
+        if index is None:
+            index = SiteIndex(None, dir_path_content)
+            index.update()
+        pages = []
+        for src, dst in collect_pages(dir_path_content, dest_dir_path):
+            tpl = page_template(src, loader, index)
+            if tpl is not None:
+                pages.append((src, tpl, dst))
+    if manifest is not None:
+        pages = [(src, tpl, dst) for src, tpl, dst in pages if not manifest.is_fresh(src, dst, page_deps(manifest, tpl, loader, minify, images))]
+    if not pages:
+        return {}
+    templates = {tpl: loader.load(tpl) for _, tpl, _ in pages}
+
+    logger.info("Generating %d pages using %d workers", len(pages), jobs or os.cpu_count())
+    errors: Dict[str, str] = {}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(templates, cache, profiler is not None, loader.asset_urls, minify, images.sizes if images is not None else None)) as executor:
+        futures = [executor.submit(_render_page_worker, src, tpl, dst) for src, tpl, dst in pages]
+        for (src, tpl, dst), future in zip(pages, futures):
+            result = future.result()
+            if profiler is not None and result.phases is not None:
+                profiler.add_page(src, result.phases)
+            if result.error is not None:
+                logger.error("Failed to generate page from %s: %s", src, result.error)
+                errors[src] = result.error
+                continue
+            logger.debug("Generated %s from %s using %s", dst, src, tpl)
+            if events_enabled():
+                emit_event("page_built", source=src, output=dst, bytes=os.path.getsize(dst), seconds=result.seconds)
+            if manifest is not None:
+                manifest.record(src, dst, page_deps(manifest, tpl, loader, minify, images))
+    return errors
@@ -0,0 +1,272 @@
+import hashlib
+import json
+import logging
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, List, Mapping, Optional, Tuple
+
+from asset_pipeline import URL_SUFFIX_PATTERN, asset_url
+from copy_to_public import walk_tree
+from htmlnode import HTMLNode
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SIZES_VERSION = 1
+IMAGE_EXTENSIONS = frozenset({".png", ".gif", ".jpg", ".jpeg", ".webp"})
+# Enough for the PNG, GIF and WebP headers; JPEG files are read one segment header at a time.
+HEADER_BYTES = 30
+DEFAULT_READ_WORKERS = 8
+# Attributes added to local images besides their size: off-screen images are fetched only when
+# scrolled near, and decoded off the main thread.
+LAZY_ATTRIBUTES = {"loading": "lazy", "decoding": "async"}
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Start of frame markers; DHT (C4), JPG (C8) and DAC (CC) share the range but are not frames.
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Markers without a length field.
+JPEG_STANDALONE_MARKERS = frozenset({0x01, *range(0xD0, 0xD9)})
+EXIF_ORIENTATION_TAG = 0x0112
+
+ImageSize = Tuple[int, int]
+
+
+def read_image_size(path: str) -> Optional[ImageSize]:
+    """
+    Reads the pixel dimensions of a PNG, GIF, JPEG or WebP image from its header, without
+    decoding the image: only the first few bytes are read, and for JPEG the segment headers up
+    to the first frame header.
+
+    JPEG images with an EXIF orientation that rotates them by 90 degrees report their size as
+    displayed, i.e. with width and height swapped.
+
+    Args:
+        path (str): Path to the image file.
+
+    Returns:
+        Optional[ImageSize]: (width, height), or None if the format is not recognised or the
+        header is malformed.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER_BYTES)
+        try:
+            if header.startswith(PNG_SIGNATURE) and header[12:16] == b"IHDR":
+                return struct.unpack(">II", header[16:24])
+            if header[:6] in (b"GIF87a", b"GIF89a"):
+                return struct.unpack("<HH", header[6:10])
+            if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+                return _webp_size(header)
+            if header[:2] == b"\xff\xd8":
+                f.seek(2)
+                return _jpeg_size(f)
+        except struct.error:
+            return None
+    return None
+
+
+def _webp_size(header: bytes) -> Optional[ImageSize]:
+    chunk = header[12:16]
+    if chunk == b"VP8 " and header[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and header[20] == 0x2F:
+        bits = struct.unpack("<I", header[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        return int.from_bytes(header[24:27], "little") + 1, int.from_bytes(header[27:30], "little") + 1
+    return None
+
+
+def _jpeg_size(f: BinaryIO) -> Optional[ImageSize]:
+    rotated = False
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b"\xff":
+            continue
+        marker = f.read(1)
+        while marker == b"\xff":  # fill bytes
+            marker = f.read(1)
+        if not marker:
+            return None
+        code = marker[0]
+        if code in JPEG_STANDALONE_MARKERS:
+            continue
+        if code in (0xD9, 0xDA):  # end of image, start of scan: no frame header
+            return None
+        length = struct.unpack(">H", f.read(2))[0]
+        if length < 2:
+            return None
+        if code in JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">xHH", f.read(5))
+            return (height, width) if rotated else (width, height)
+        if code == 0xE1:
+            segment = f.read(length - 2)
+            rotated = rotated or _exif_orientation(segment) in (5, 6, 7, 8)
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+def _exif_orientation(segment: bytes) -> Optional[int]:
+    if not segment.startswith(b"Exif\0\0"):
+        return None
+    tiff = segment[6:]
+    order = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if order is None:
+        return None
+    try:
+        offset = struct.unpack(order + "I", tiff[4:8])[0]
+        count = struct.unpack(order + "H", tiff[offset:offset + 2])[0]
+        for i in range(count):
+            entry = tiff[offset + 2 + i * 12:offset + 14 + i * 12]
+            if struct.unpack(order + "H", entry[:2])[0] == EXIF_ORIENTATION_TAG:
+                return struct.unpack(order + "H", entry[8:10])[0]
+    except struct.error:
+        return None
+    return None
+
+
+class ImageSizeCache:
+    """
+    The pixel dimensions of the images in `static/`, by URL, kept on disk together with each
+    image's size and mtime so an unchanged image is never read again.
+
+    Attributes:
+        path (Optional[str]): Location of the cache JSON file. None keeps it in memory.
+        static_root (str): The static directory the images are found in.
+        entries (Dict[str, Dict]): Size, mtime, width and height by image path relative to
+            `static_root`. Width and height are None for images whose header was not understood.
+        sizes (Dict[str, ImageSize]): (width, height) by image URL, e.g. `/images/tom.png`.
+    """
+    def __init__(self, path: Optional[str], static_root: str):
+        """
+        Initializes an ImageSizeCache and loads any existing cache from `path`. Call `update`
+        to read the current images.
+
+        Args:
+            path (Optional[str]): Location of the cache JSON file.
+            static_root (str): The static directory.
+        """
+        self.path = path
+        self.static_root = static_root
+        self.entries: Dict[str, Dict] = {}
+        self.sizes: Dict[str, ImageSize] = {}
+        self._digest: Optional[str] = None
+        self.load()
+
+    def load(self) -> None:
+        """
+        Loads the cache from disk. A missing, unreadable or outdated cache is treated as empty,
+        which reads every image header again.
+        """
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == IMAGE_SIZES_VERSION:
+            self.entries = data.get("entries", {})
+
+    def save(self) -> None:
+        """
+        Writes the cache to disk atomically (write to a temporary file, then rename).
+        """
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": IMAGE_SIZES_VERSION, "entries": self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def update(self, workers: int = DEFAULT_READ_WORKERS) -> int:
+        """
+        Walks the static directory and refreshes `sizes`. Only images that are new or whose
+        size or mtime changed have their header read, in a pool of `workers` threads. Images
+        that were removed are dropped.
+
+        Args:
+            workers (int): Number of threads reading headers. Defaults to 8.
+
+        Returns:
+            int: The number of image headers read.
+        """
+        def read(relative_path: str, st: os.stat_result) -> Tuple[str, Dict]:
+            size = None
+            try:
+                size = read_image_size(os.path.join(self.static_root, relative_path))
+            except OSError as e:
+                logger.warning("Could not read image %s: %s", relative_path, e)
+            if size is None:
+                logger.debug("Unknown image size of %s", relative_path)
+            width, height = size if size is not None else (None, None)
+            return relative_path, {"size": st.st_size, "mtime": st.st_mtime_ns, "width": width, "height": height}
+
+        entries: Dict[str, Dict] = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            if os.path.isdir(self.static_root):
+                for entry in walk_tree(self.static_root):
+                    if entry.is_dir or os.path.splitext(entry.path)[1].lower() not in IMAGE_EXTENSIONS:
+                        continue
+                    cached = self.entries.get(entry.path)
+                    if cached is not None and cached["size"] == entry.stat.st_size and cached["mtime"] == entry.stat.st_mtime_ns:
+                        entries[entry.path] = cached
+                    else:
+                        futures.append(executor.submit(read, entry.path, entry.stat))
+            for future in futures:
+                relative_path, cached = future.result()
+                entries[relative_path] = cached
+
+        self.entries = entries
+        self.sizes = {asset_url(relative_path): (entry["width"], entry["height"]) for relative_path, entry in entries.items() if entry["width"] is not None}
+        self._digest = None
+        logger.info("Image sizes: %d images, %d headers read", len(entries), len(futures))
+        return len(futures)
+
+    def digest(self) -> str:
+        """
+        Returns a hash of `sizes`, which changes whenever an image is added, removed or
+        resized. It stands in for the sizes as a dependency of the pages they are applied to.
+
+        Returns:
+            str: The hex digest.
+        """
+        if self._digest is None:
+            self._digest = hashlib.sha256(json.dumps(self.sizes, sort_keys=True).encode("utf-8")).hexdigest()
+        return self._digest
+
+
+def add_image_dimensions(node: HTMLNode, sizes: Mapping[str, ImageSize]) -> None:
+    """
+    Adds `width` and `height` attributes, plus `loading="lazy"` and `decoding="async"`, to the
+    `<img>` nodes of a tree whose `src` is a local image of known size. The browser can then
+    reserve the image's space before it loads, so the page does not shift as images arrive.
+
+    Attributes already present are kept, and an image that already has a `width` or `height`
+    gets neither. External images are left untouched. `src` must still be the original URL,
+    so this runs before asset URLs are fingerprinted. Changed nodes get a new props dict: props
+    may be shared, so they are never modified in place.
+
+    Args:
+        node (HTMLNode): The root of the tree.
+        sizes (Mapping[str, ImageSize]): (width, height) by image URL.
+    """
+    if not sizes:
+        return
+    stack: List[HTMLNode] = [node]
+    while stack:
+        node = stack.pop()
+        if node.tag == "img" and node.props:
+            url = node.props.get("src", "")
+            match = URL_SUFFIX_PATTERN.search(url)
+            size = sizes.get(url[:match.start()] if match else url)
+            if size is not None:
+                added = dict(LAZY_ATTRIBUTES)
+                if "width" not in node.props and "height" not in node.props:
+                    added = {"width": str(size[0]), "height": str(size[1]), **added}
+                node.props = {**node.props, **{key: value for key, value in added.items() if key not in node.props}}
+        stack.extend(node.children)
@@ -0,0 +1,98 @@
+import re
+from typing import List
+
+from textnode import TextNode, TextType
+
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\[\]\(\)]*)\)")
+LINK_PATTERN = re.compile(r"\[([^\[\]]*)\]\(([^\[\]\(\)]*)\)")
+# Any position where an inline element may start.
+SPECIAL_PATTERN = re.compile(r"!\[|\*\*|[\[`_]")
+
+DELIMITER_TYPES = {
+    "`": TextType.CODE,
+    "**": TextType.BOLD,
+    "_": TextType.ITALIC,
+}
+
+
+def tokenize_inline(text: str) -> List[TextNode]:
+    """
+    Splits a run of inline markdown into TextNodes in a single left-to-right scan.
+
+    The scanner jumps between positions where an inline element can start
+    (`![`, `[`, `` ` ``, `**`, `_`) and tries to read the element there:
+
+        - `![alt](url)` becomes an IMAGE node and `[text](url)` a LINK node.
+        - `` `code` ``, `**bold**` and `_italic_` become CODE, BOLD and ITALIC nodes.
+          Their contents are not parsed any further.
+        - Links and images take precedence over bold and italic: a `**` or `_` only closes
+          before the next link or image, so e.g. the `_` in a url never closes emphasis.
+          Code spans take precedence over links.
+
+    Anything that does not form a complete element (e.g. an unclosed delimiter or a
+    bracket that is not followed by a url) is kept as literal text. Consecutive literal
+    text is emitted as one TEXT node and empty nodes are never emitted.
+
+    Every character is visited a constant number of times (the position of the next link
+    is searched for once and reused until the scan passes it), so the work grows linearly
+    with the length of `text`.
+
+    Args:
+        text (str): The inline markdown text to tokenize.
+
+    Returns:
+        List[TextNode]: The TextNodes in document order.
+
+    Example:
+        >>> tokenize_inline("a **b** [c](d)")
+        [TextNode(a ,1,None), TextNode(b,2,None), TextNode( ,1,None), TextNode(c,5,d)]
+    """
+    nodes: List[TextNode] = []
+    text_start = 0
+    pos = 0
+    length = len(text)
+
+    # start of the next link or image (its `[`) at or after `pos`, or `length` if there is none
+    next_link = -1
+
+    def flush(end: int) -> None:
+        if end > text_start:
+            nodes.append(TextNode(text[text_start:end], TextType.TEXT))
+
+    while pos < length:
+        special = SPECIAL_PATTERN.search(text, pos)
+        if special is None:
+            break
+        pos = special.start()
+        token = special.group()
+
+        if token == "![" or token == "[":
+            match = (IMAGE_PATTERN if token == "![" else LINK_PATTERN).match(text, pos)
+            if match is None:
+                # `![` that is not an image may still start a link at the `[`
+                pos += 1
+                continue
+            flush(pos)
+            text_type = TextType.IMAGE if token == "![" else TextType.LINK
+            nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            pos = text_start = match.end()
+            continue
+
+        if token == "`":
+            close = text.find(token, pos + 1)
+        else:
+            if next_link < pos:
+                link = LINK_PATTERN.search(text, pos)
+                next_link = link.start() if link is not None else length
+            close = text.find(token, pos + len(token), next_link)
+        if close == -1:
+            # unclosed delimiter: keep it as text
+            pos += len(token)
+            continue
+        flush(pos)
+        if close > pos + len(token):
+            nodes.append(TextNode(text[pos + len(token):close], DELIMITER_TYPES[token]))
+        pos = text_start = close + len(token)
+
+    flush(length)
+    return nodes
@@ -1,4 +1,4 @@
-from typing import Dict, Optional
+from typing import Dict, Optional, Sequence, Tuple
 from htmlnode import HTMLNode
 
 class LeafNode(HTMLNode):
@@ -13,6 +13,8 @@ class LeafNode(HTMLNode):
         tag: Optional HTML tag name (None for raw text)
         props: Optional dictionary of HTML attributes
     """
+    __slots__ = ()
+
     def __init__(self, value: str, tag: Optional[str] = None, props: Optional[Dict[str,str]] = None):
         """
         Initialize a new LeafNode.
@@ -24,26 +26,17 @@ class LeafNode(HTMLNode):
         """
         super().__init__(tag=tag, value=value, props=props)
     
-    def to_html(self):
+    def _html_parts(self, in_paragraph: bool) -> Tuple[str, Sequence[HTMLNode], str, bool]:
         """
-        Convert the LeafNode to an HTML string.
-        
-        If no tag is specified, returns the raw text value.
-        Otherwise, returns the value wrapped in the appropriate HTML tags with properties.
-        
-        Returns:
-            str: HTML representation of this node
+        Describes how this node is serialized; see `HTMLNode.write_html`.
+
+        If no tag is specified, the raw text value is written.
+        Otherwise, the value is wrapped in the appropriate HTML tags with properties.
         """
         if not self.tag:
-            return self.value
-        return_string = ""
-        return_string += f"<{self.tag}" + f"{self.props_to_html()}>{self.value}</{self.tag}>"
-        
-        return_string = return_string.replace("\n", " ") if self.tag == "p" else return_string
-        return return_string
-
-
-
-
-
-        
+            html = self.value
+        else:
+            html = f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        if in_paragraph or self.tag == "p":
+            html = html.replace("\n", " ")
+        return html, (), "", in_paragraph
@@ -0,0 +1,294 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from build_log import elapsed, emit_event
+from build_manifest import hash_file
+from document_metadata import slugify
+from front_matter import FrontMatter
+from generate_page import write_page
+from htmlnode import HTMLNode
+from leafnode import LeafNode
+from minify import minified
+from parentnode import ParentNode
+from site_index import PageInfo, SiteIndex
+from template import TemplateLoader
+from utility import text_to_children
+
+logger = logging.getLogger(__name__)
+
+LISTINGS_VERSION = 1
+LISTING_SECTION = "blog"
+POSTS_PER_PAGE = 10
+TAGS_URL = "/tags/"
+
+
+class ListingPage(NamedTuple):
+    """
+    One generated listing page: a page of the blog archive or of a tag's archive.
+
+    Attributes:
+        url (str): The URL of the page, e.g. `/blog/page/2/`.
+        title (str): The page title.
+        base_url (str): The URL of the archive's front page.
+        posts (List[PageInfo]): The posts listed on the page, newest first.
+        newer_url (Optional[str]): The URL of the page with the next newer posts, if any.
+        older_url (Optional[str]): The URL of the page with the next older posts, if any.
+    """
+    url: str
+    title: str
+    base_url: str
+    posts: List[PageInfo]
+    newer_url: Optional[str]
+    older_url: Optional[str]
+
+
+def collect_posts(pages: List[PageInfo], section: str = LISTING_SECTION) -> List[PageInfo]:
+    """
+    Returns the posts of a section, newest first. Undated posts come last, and posts with the
+    same date are ordered by source path.
+
+    Args:
+        pages (List[PageInfo]): The built pages, sorted by source path (see `SiteIndex.pages`).
+        section (str): The content directory holding the posts, relative to the content root.
+
+    Returns:
+        List[PageInfo]: The posts, excluding the section's own index page.
+    """
+    prefix = section + os.sep
+    section_url = f"/{section}/"
+    posts = [page for page in pages if page.source.startswith(prefix) and page.url != section_url]
+    posts.sort(key=lambda post: post.date or "", reverse=True)
+    return posts
+
+
+def paginate(posts: List[PageInfo], base_url: str, title: str, per_page: int = POSTS_PER_PAGE) -> List[ListingPage]:
+    """
+    Splits sorted posts into the pages of an archive.
+
+    Pages are numbered from the oldest post: `<base_url>page/1/` holds the `per_page` oldest
+    posts, `page/2/` the next newer ones, and so on, and the front page at `base_url` holds the
+    newest `per_page` to `2 * per_page - 1` posts. A numbered page therefore keeps its posts
+    when a newer post is published: that changes the front page, and once every `per_page`
+    posts adds a numbered page (which changes the newer link of the previous newest one).
+
+    Args:
+        posts (List[PageInfo]): The posts, newest first.
+        base_url (str): The URL of the front page.
+        title (str): The title of the archive.
+        per_page (int): Posts per page.
+
+    Returns:
+        List[ListingPage]: The pages, newest first. Empty if there are no posts.
+    """
+    if not posts:
+        return []
+    numbered = max(0, len(posts) // per_page - 1)
+    front = len(posts) - numbered * per_page
+    urls = [base_url] + [f"{base_url}page/{number}/" for number in range(numbered, 0, -1)]
+    chunks = [posts[:front]] + [posts[start:start + per_page] for start in range(front, len(posts), per_page)]
+    return [
+        ListingPage(url, title, base_url, chunk, urls[i - 1] if i > 0 else None, urls[i + 1] if i + 1 < len(urls) else None)
+        for i, (url, chunk) in enumerate(zip(urls, chunks))
+    ]
+
+
+def plan_listings(posts: List[PageInfo], section: str = LISTING_SECTION, per_page: int = POSTS_PER_PAGE) -> List[ListingPage]:
+    """
+    Lays out every listing page: the section's paginated archive (its front page being the
+    section index) and a paginated archive per tag. See `paginate` for the page layout.
+
+    The posts are sorted once by the caller; each archive is a slice of that order, so no
+    archive is sorted again.
+
+    Args:
+        posts (List[PageInfo]): The section's posts, newest first (see `collect_posts`).
+        section (str): The section the posts belong to.
+        per_page (int): Posts per page.
+
+    Returns:
+        List[ListingPage]: The listing pages.
+    """
+    listings = paginate(posts, f"/{section}/", section.capitalize(), per_page)
+    tags: Dict[str, List[PageInfo]] = {}
+    tag_names: Dict[str, str] = {}
+    slugs: Dict[str, str] = {}
+    for post in posts:
+        for tag in post.tags:
+            slug = slugs.get(tag)
+            if slug is None:
+                slug = slugs[tag] = slugify(tag) or "tag"
+                tag_names.setdefault(slug, tag)
+            tags.setdefault(slug, []).append(post)
+    for slug in sorted(tags):
+        listings.extend(paginate(tags[slug], f"{TAGS_URL}{slug}/", f"Posts tagged {tag_names[slug]}", per_page))
+    return listings
+
+
+def listing_node(listing: ListingPage) -> HTMLNode:
+    """
+    Builds the body of a listing page: its title, a list of links to its posts with their
+    dates, and links to the neighbouring pages of the archive.
+
+    Args:
+        listing (ListingPage): The listing page.
+
+    Returns:
+        HTMLNode: The root node of the page body.
+    """
+    items: List[HTMLNode] = []
+    for post in listing.posts:
+        children: List[HTMLNode] = [ParentNode("a", text_to_children(post.title or post.url), {"href": post.url})]
+        if post.date:
+            children.append(LeafNode(post.date, "time", {"datetime": post.date}))
+        items.append(ParentNode("li", children))
+    children = [LeafNode(listing.title, "h1"), ParentNode("ul", items)]
+    links: List[HTMLNode] = []
+    if listing.newer_url is not None:
+        links.append(LeafNode("Newer posts", "a", {"href": listing.newer_url, "rel": "prev"}))
+    if listing.older_url is not None:
+        links.append(LeafNode("Older posts", "a", {"href": listing.older_url, "rel": "next"}))
+    if links:
+        children.append(ParentNode("nav", links))
+    return ParentNode("div", children)
+
+
+def listing_signature(listing: ListingPage, template_hash: str) -> str:
+    """
+    Hashes everything a listing page is rendered from, so an unchanged page is not written again.
+
+    Args:
+        listing (ListingPage): The listing page.
+        template_hash (str): The content hash of the page's template, followed by the hash of
+            the asset URLs it is rewritten with and a minification marker, if any.
+
+    Returns:
+        str: The hex digest.
+    """
+    data = [listing.title, listing.newer_url, listing.older_url, template_hash, [(post.url, post.title, post.date) for post in listing.posts]]
+    return hashlib.sha256(json.dumps(data).encode("utf-8")).hexdigest()
+
+
+class ListingManifest:
+    """
+    A persistent record of the listing pages of the last build and what each was rendered from.
+
+    Attributes:
+        path (Optional[str]): Location of the manifest JSON file. None keeps it in memory.
+        entries (Dict[str, str]): Listing page signatures keyed by output path, relative to the
+            output directory.
+    """
+    def __init__(self, path: Optional[str]):
+        """
+        Initializes a ListingManifest and loads any existing manifest from `path`.
+
+        Args:
+            path (Optional[str]): Location of the manifest JSON file.
+        """
+        self.path = path
+        self.entries: Dict[str, str] = {}
+        self.load()
+
+    def load(self) -> None:
+        """
+        Loads the manifest from disk. A missing, unreadable or outdated manifest is treated as
+        empty, which regenerates every listing page.
+        """
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == LISTINGS_VERSION:
+            self.entries = data.get("entries", {})
+
+    def save(self) -> None:
+        """
+        Writes the manifest to disk atomically (write to a temporary file, then rename).
+        """
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": LISTINGS_VERSION, "entries": self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def remove_outputs(self, dest_dir_path: str, outputs: Optional[Iterable[str]] = None) -> None:
+        """
+        Deletes listing pages and drops their entries.
+
+        Args:
+            dest_dir_path (str): The output directory.
+            outputs (Optional[Iterable[str]]): The outputs to delete, relative to the output
+                directory. Defaults to every recorded listing page.
+        """
+        for relative in list(outputs if outputs is not None else self.entries):
+            path = os.path.join(dest_dir_path, relative)
+            if os.path.isfile(path):
+                os.remove(path)
+                logger.info("Removed listing page %s", path)
+            self.entries.pop(relative, None)
+
+
+def generate_listings(index: SiteIndex, dest_dir_path: str, loader: TemplateLoader, manifest: ListingManifest, section: str = LISTING_SECTION, per_page: int = POSTS_PER_PAGE, minify: bool = False) -> List[str]:
+    """
+    Generates the section index, its paginated archive and the per-tag archives from the
+    site index, writing only the listing pages whose posts, title, neighbouring pages or template
+    changed since the last build. Listing pages that are no longer produced are deleted.
+
+    A listing page never overwrites or deletes a content page served at the same URL (e.g. a
+    hand-written `content/blog/index.md`). The pages of an archive use the template that a
+    page in the directory of its first page would use.
+
+    Args:
+        index (SiteIndex): The up to date site index.
+        dest_dir_path (str): The output directory.
+        loader (TemplateLoader): The build's template loader. Listing pages are regenerated
+            when its asset URLs change.
+        manifest (ListingManifest): The listing pages of the last build; updated in place.
+        section (str): The content directory holding the posts.
+        per_page (int): Posts per listing page.
+        minify (bool): Minify the listing pages' HTML.
+
+    Returns:
+        List[str]: The listing pages that were written.
+    """
+    start = time.perf_counter()
+    pages = index.pages()
+    content_urls = {page.url for page in pages}
+    templates: Dict[str, Tuple[str, str]] = {}
+    entries: Dict[str, str] = {}
+    shadowed: Set[str] = set()
+    written: List[str] = []
+    listings = plan_listings(collect_posts(pages, section), section, per_page)
+    for listing in listings:
+        relative = os.path.join(*listing.url.strip("/").split("/"), "index.html")
+        if listing.url in content_urls:
+            shadowed.add(relative)
+            continue
+        dest_path = os.path.join(dest_dir_path, relative)
+        if listing.base_url not in templates:
+            template_path = loader.resolve(os.path.join(index.content_root, *listing.base_url.strip("/").split("/"), "index.md"))
+            templates[listing.base_url] = (template_path, hash_file(template_path) + (loader.asset_digest or "") + ("+minify" if minify else ""))
+        template_path, template_hash = templates[listing.base_url]
+        signature = listing_signature(listing, template_hash)
+        entries[relative] = signature
+        if manifest.entries.get(relative) == signature and os.path.exists(dest_path):
+            continue
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, "w") as f, minified(f, minify) as f:
+            write_page(f, loader.load(template_path), listing.title, listing_node(listing), FrontMatter().context())
+        logger.debug("Generated listing page %s", dest_path)
+        written.append(dest_path)
+    # a listing page replaced by a content page leaves the file to it
+    manifest.remove_outputs(dest_dir_path, manifest.entries.keys() - entries.keys() - shadowed)
+    manifest.entries = entries
+    logger.info("Listing pages: %d, %d written", len(entries), len(written))
+    emit_event("listings_built", pages=len(entries), written=len(written), seconds=elapsed(start))
+    return written
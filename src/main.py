@@ -1,12 +1,137 @@
-from copy_to_public import copy_to_public
-from generate_page import generate_pages_recursive
+import argparse
+import cProfile
+import contextlib
+import logging
+import sys
+import time
+from asset_pipeline import AssetManifest
+from build_log import configure_logging, elapsed, emit_event
+from build_manifest import BuildManifest
+from copy_to_public import LINK_MODES, copy_to_public
+from dev_server import SiteRebuilder, serve
+from generate_page import generate_pages_recursive, generate_pages_parallel
+from image_size import ImageSizeCache
+from listings import ListingManifest, generate_listings
+from precompress import CompressionManifest, precompress_outputs
+from profiler import DEFAULT_TOP_PAGES, Profiler
+from render_cache import RenderCache
+from site_index import SiteIndex
+from template import TemplateLoader
 import os
 import pathlib
 
-def main():
-    copy_to_public()
-    project_directory = str(pathlib.Path(__file__).parent.parent)
-    generate_pages_recursive(dir_path_content = os.path.join(project_directory, "content"), template_path = os.path.join(project_directory, "template.html"), dest_dir_path = os.path.join(project_directory, "public"))
-    
+logger = logging.getLogger("main")
 
-main()
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build the static site from content/ and static/ into public/.")
+    parser.add_argument("command", nargs="?", choices=["build", "serve"], default="build", help="build the site once, or build it and then serve public/ while rebuilding on changes (default: build)")
+    parser.add_argument("--root", help="project directory holding content/, static/ and template.html (default: the directory above src/)")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="number of worker processes used to generate pages (0 = one per CPU, default: 1)")
+    parser.add_argument("--asset-links", choices=LINK_MODES, default="copy", help="how static assets are placed in public/: copied, reflinked (copy-on-write) or hard-linked (default: copy)")
+    parser.add_argument("--checksum-assets", action="store_true", help="compare static assets by content instead of size and mtime")
+    parser.add_argument("--fingerprint-assets", action="store_true", help="place static assets under content-hashed names (e.g. index.1a2b3c4d.css) and rewrite href/src references to them, so they can be cached forever (build only)")
+    parser.add_argument("--image-dimensions", action="store_true", help="add width and height (read from the image headers) and lazy loading attributes to <img> tags of images in static/, so pages do not shift as images load (build only)")
+    parser.add_argument("--minify", action="store_true", help="minify the generated HTML: collapse whitespace between tags, strip comments and unneeded attribute quotes (<pre>/<code> content is kept as is)")
+    parser.add_argument("--precompress", action="store_true", help="write a gzip-compressed .gz sibling next to every HTML, CSS, JS and SVG file in public/ of at least 1 KiB, for servers that send precompressed files")
+    parser.add_argument("--drafts", action="store_true", help="also build pages marked `draft: true` in their front matter")
+    parser.add_argument("--no-listings", action="store_true", help="do not generate the blog index, tag and archive pages")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the render cache in .cache/render")
+    parser.add_argument("--bind", default="127.0.0.1", help="address the dev server listens on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8888, help="port the dev server listens on (default: 8888)")
+    parser.add_argument("--profile", action="store_true", help="time each build phase per page and in aggregate, write a JSON report and print the slowest pages")
+    parser.add_argument("--profile-output", default=os.path.join(".cache", "profile.json"), help="where --profile writes its JSON report, relative to the project directory (default: .cache/profile.json)")
+    parser.add_argument("--profile-top", type=int, default=DEFAULT_TOP_PAGES, help=f"number of slowest pages --profile prints (default: {DEFAULT_TOP_PAGES})")
+    parser.add_argument("--cprofile", metavar="PATH", help="dump cProfile statistics of the whole build to PATH for pstats (worker processes are not included)")
+    parser.add_argument("--verbose", "-v", action="count", default=0, help="show progress summaries; repeat (-vv) to list every page and file (default: warnings and errors only, serve shows summaries)")
+    parser.add_argument("--events", metavar="PATH", help="append a JSON-lines stream of build events (page built, asset placed, ...) to PATH, or write it to stdout with '-'")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging(args.verbose + (args.command == "serve"), args.events)
+    start = time.perf_counter()
+    project_directory = os.path.abspath(args.root) if args.root else str(pathlib.Path(__file__).parent.parent)
+    profiler = Profiler() if args.profile else None
+    call_profiler = cProfile.Profile() if args.cprofile else None
+    if call_profiler is not None:
+        call_profiler.enable()
+    manifest = BuildManifest(os.path.join(project_directory, ".cache", "build_manifest.json"), project_directory)
+    assets = None
+    if args.fingerprint_assets and args.command == "serve":
+        logger.warning("--fingerprint-assets is ignored by serve, which rebuilds assets under their own names")
+    elif args.fingerprint_assets:
+        assets = AssetManifest(os.path.join(project_directory, ".cache", "assets.json"))
+    images = None
+    if args.image_dimensions and args.command == "serve":
+        logger.warning("--image-dimensions is ignored by serve, which does not track image sizes")
+    elif args.image_dimensions:
+        images = ImageSizeCache(os.path.join(project_directory, ".cache", "image_sizes.json"), os.path.join(project_directory, "static"))
+    with profiler.phase("static copy") if profiler is not None else contextlib.nullcontext():
+        copy_to_public(manifest, args.checksum_assets, args.asset_links, project_directory, assets)
+    asset_urls = assets.urls if assets is not None else None
+    if images is not None:
+        with profiler.phase("image sizes") if profiler is not None else contextlib.nullcontext():
+            images.update()
+    variant = "+".join(digest for digest in (assets.digest() if assets is not None else "", images.digest() if images is not None else "") if digest)
+    cache = None if args.no_cache else RenderCache(os.path.join(project_directory, ".cache", "render"), variant=variant)
+    content_path = os.path.join(project_directory, "content")
+    template_path = os.path.join(project_directory, "template.html")
+    public_path = os.path.join(project_directory, "public")
+    index = SiteIndex(os.path.join(project_directory, ".cache", "site_index.json"), content_path, args.drafts)
+    with profiler.phase("file discovery") if profiler is not None else contextlib.nullcontext():
+        changed_pages = index.update()
+    logger.info("Site index: %d pages, %d changed", len(index.entries), len(changed_pages))
+    if args.jobs == 1:
+        errors = generate_pages_recursive(dir_path_content = content_path, template_path = template_path, dest_dir_path = public_path, manifest = manifest, cache = cache, profiler = profiler, index = index, asset_urls = asset_urls, minify = args.minify, images = images)
+    else:
+        errors = generate_pages_parallel(content_path, template_path, public_path, jobs = args.jobs or None, manifest = manifest, cache = cache, profiler = profiler, index = index, asset_urls = asset_urls, minify = args.minify, images = images)
+    # before the listings, which may take over the output of a removed page
+    for output in manifest.remove_orphans():
+        logger.info("Removed orphaned output %s", output)
+    listings = ListingManifest(os.path.join(project_directory, ".cache", "listings.json"))
+    if args.no_listings:
+        listings.remove_outputs(public_path)
+    else:
+        generate_listings(index, public_path, TemplateLoader(template_path, content_path, asset_urls), listings, minify=args.minify)
+    listings.save()
+    compression = CompressionManifest(os.path.join(project_directory, ".cache", "compression.json"))
+    if args.precompress:
+        with profiler.phase("compression") if profiler is not None else contextlib.nullcontext():
+            precompress_outputs(public_path, compression, placed=manifest.outputs())
+    else:
+        compression.remove_outputs(public_path)
+    compression.save()
+    manifest.save()
+    index.save()
+    if assets is not None:
+        assets.save()
+    if images is not None:
+        images.save()
+    if cache is not None:
+        cache.prune()
+
+    logger.info("Built site in %.2fs", time.perf_counter() - start)
+    emit_event("build_finished", errors=len(errors), seconds=elapsed(start))
+
+    if call_profiler is not None:
+        call_profiler.disable()
+        call_profiler.dump_stats(args.cprofile)
+        logger.info("cProfile statistics written to %s", args.cprofile)
+    if profiler is not None:
+        report_path = os.path.join(project_directory, args.profile_output)
+        profiler.write_report(report_path)
+        # stdout may carry the event stream, which must stay JSON lines
+        print(profiler.format_summary(args.profile_top), file=sys.stderr if args.events == "-" else sys.stdout)
+        logger.info("Profile report written to %s", report_path)
+
+    if args.command == "serve":
+        rebuilder = SiteRebuilder(content_path, os.path.join(project_directory, "static"), public_path, template_path, manifest, cache, args.checksum_assets, args.asset_links, index, None if args.no_listings else listings, args.minify, compression if args.precompress else None)
+        serve(rebuilder, args.bind, args.port)
+        return
+    if errors:
+        logger.error("%d page(s) failed to build", len(errors))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
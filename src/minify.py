@@ -0,0 +1,260 @@
+import io
+import re
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Match, TextIO, Tuple
+
+# Elements whose content is whitespace sensitive (or not HTML): written out untouched.
+RAW_TAGS = frozenset({"pre", "code", "textarea", "script", "style"})
+# Elements whose tags do not render adjacent whitespace, so whitespace next to them is dropped.
+# Next to any other tag a whitespace run is collapsed to a single space instead.
+BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "base", "blockquote", "body", "br", "dd", "details", "div",
+    "dl", "dt", "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4",
+    "h5", "h6", "head", "header", "hr", "html", "li", "link", "main", "meta", "nav", "ol", "p",
+    "pre", "section", "summary", "table", "tbody", "td", "tfoot", "th", "thead", "title", "tr", "ul",
+})
+VOID_TAGS = frozenset({"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"})
+# Buffered output is minified in chunks of about this many characters.
+CHUNK_CHARS = 64 * 1024
+# A `<` that is still not closed this many characters on is a stray one in text.
+MAX_TAG_CHARS = 64 * 1024
+
+# The rest of a tag after its first character, up to and including its closing `>`. Quoted
+# attribute values may hold `>` (the renderer does not escape them, e.g. `alt="a > b"`), so they
+# are skipped whole; tags without quotes take the first, cheaper branch.
+TAG_BODY = r"""(?:[^'">]*>|[^'">]*(?:(?:"[^"]*"|'[^']*')[^'">]*)*>)"""
+TAG_SPLIT_PATTERN = re.compile(r"(<[!/?A-Za-z]" + TAG_BODY + ")")
+# The longest run of complete text, comments and tags from a position on. It stops at a tag that
+# is not closed (yet).
+COMPLETE_PATTERN = re.compile(r"(?:[^<]+|<!--.*?-->|<[!/?A-Za-z]" + TAG_BODY + r"|<(?![!/?A-Za-z]))*", re.DOTALL)
+TAG_PATTERN = re.compile(r"""<(/?)([A-Za-z][\w:-]*)((?:\s+[^\s"'>/=]+(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'=<>`]+))?)*)\s*(/?)>$""")
+ATTRIBUTE_PATTERN = re.compile(r"""\s+([^\s"'>/=]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s"'=<>`]+))?""")
+# Values ending in `/` keep their quotes, so `href=/>` cannot be misread as self-closing.
+UNQUOTED_VALUE_PATTERN = re.compile(r"""[^\s"'=<>`]*[^\s"'=<>`/]$""")
+COMMENT_PATTERN = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+RAW_OPEN_PATTERN = re.compile(r"<(" + "|".join(sorted(RAW_TAGS)) + r")(?=[\s/>])" + TAG_BODY, re.IGNORECASE)
+RAW_TAG_PATTERN = re.compile(r"<(/?)(" + "|".join(sorted(RAW_TAGS)) + r")(?=[\s/>])" + TAG_BODY, re.IGNORECASE)
+# HTML whitespace; unlike `\s` it leaves non-breaking spaces alone.
+WHITESPACE = " \t\n\r\f"
+WHITESPACE_PATTERN = re.compile(f"[{WHITESPACE}]+")
+# Minified tags (with whether they are block tags) are remembered, since pages repeat the
+# same few tags over and over.
+TAG_CACHE_SIZE = 4096
+_tag_cache: Dict[str, Tuple[str, bool]] = {}
+
+
+class HTMLMinifier:
+    """
+    Minifies HTML while it is being written: a drop-in for the output file that
+    `Template.write` and `HTMLNode.write_html` stream into.
+
+    - Whitespace runs in text are collapsed to a single space, and dropped entirely next to
+      the tags of block elements (see `BLOCK_TAGS`), which removes the template's indentation.
+    - Comments are removed, except conditional comments (`<!--[if ...]>`).
+    - Attribute values that do not need quotes lose them, whitespace inside tags is collapsed
+      and void elements lose their `/>`.
+    - The content of `<pre>`, `<code>`, `<textarea>`, `<script>` and `<style>` is passed through
+      untouched.
+
+    Writes are buffered and minified a chunk of about `CHUNK_CHARS` at a time, cut after the
+    last complete tag. A chunk is split into text and tags with one regex pass; tags are
+    looked up in a cache of already minified tags, and only text that holds whitespace runs
+    is rewritten. Call `close` to write out the rest; the underlying file is not closed.
+
+    Attributes:
+        out (TextIO): Where the minified HTML is written.
+    """
+    def __init__(self, out: TextIO):
+        """
+        Initializes an HTMLMinifier.
+
+        Args:
+            out (TextIO): Any object with a `write(str)` method.
+        """
+        self.out = out
+        self._chunks: List[str] = []
+        self._size = 0
+        self._carry = ""
+        self._raw: List[str] = []
+        self._after_block = True
+        self._after_space = False
+
+    def write(self, s: str) -> int:
+        """
+        Buffers `s`, minifying and writing out the buffer once it is large enough.
+
+        Args:
+            s (str): HTML text. Tags may be split across writes.
+
+        Returns:
+            int: The number of characters accepted.
+        """
+        self._chunks.append(s)
+        self._size += len(s)
+        if self._size >= CHUNK_CHARS:
+            self._process(final=False)
+        return len(s)
+
+    def close(self) -> None:
+        """
+        Minifies and writes out everything still buffered.
+        """
+        self._process(final=True)
+
+    def _process(self, final: bool) -> None:
+        buffer = self._carry + "".join(self._chunks)
+        self._chunks.clear()
+        self._size = 0
+        cut = len(buffer)
+        if not final:
+            # keep any unclosed tag, any text after the last tag (it may go on) and any
+            # unterminated comment
+            cut = buffer.rfind(">", 0, _complete_end(buffer)) + 1
+            comment = buffer.rfind("<!--", 0, cut)
+            if comment != -1 and buffer.find("-->", comment + 4, cut) == -1:
+                cut = comment
+        self._carry = buffer[cut:]
+        parts: List[str] = []
+        pos = 0
+        while pos < cut:
+            if self._raw:
+                match = RAW_TAG_PATTERN.search(buffer, pos, cut)
+                end = match.end() if match is not None else cut
+                parts.append(buffer[pos:end])
+                self._after_space = False
+                pos = end
+                if match is not None:
+                    self._track_raw(match)
+                continue
+            match = RAW_OPEN_PATTERN.search(buffer, pos, cut)
+            end = match.end() if match is not None else cut
+            parts.append(self._minify(buffer[pos:end], final and match is None))
+            pos = end
+            if match is not None:
+                self._raw.append(match.group(1).lower())
+        self.out.write("".join(parts))
+
+    def _minify(self, html: str, final: bool) -> str:
+        parts = TAG_SPLIT_PATTERN.split(COMMENT_PATTERN.sub("", html))
+        tags = [_tag_cache.get(tag) or _minify_tag_text(tag) for tag in parts[1::2]]
+        texts = parts[0::2]
+        last = len(texts) - 1
+        for i, text in enumerate(texts):
+            if not text:
+                continue
+            if "\n" in text or "  " in text or "\t" in text or "\r" in text or "\f" in text:
+                text = WHITESPACE_PATTERN.sub(" ", text)
+            if text[0] == " " and (tags[i - 1][1] if i > 0 else self._after_block or self._after_space):
+                text = text[1:]
+            if text and text[-1] == " " and (tags[i][1] if i < last else final):
+                text = text[:-1]
+            texts[i] = text
+        parts[0::2] = texts
+        parts[1::2] = [minified for minified, _ in tags]
+        if texts[last]:
+            self._after_block = False
+            self._after_space = texts[last][-1] == " "
+        elif tags:
+            self._after_block = tags[-1][1]
+            self._after_space = False
+        return "".join(parts)
+
+    def _track_raw(self, tag: Match[str]) -> None:
+        name = tag.group(2).lower()
+        if not tag.group(1):
+            self._raw.append(name)
+        elif name in self._raw:
+            del self._raw[len(self._raw) - 1 - self._raw[::-1].index(name):]
+            if not self._raw:
+                self._after_block = name in BLOCK_TAGS
+
+
+def _complete_end(buffer: str) -> int:
+    # Where the buffer stops being complete: the start of a tag that is not closed yet. A `<`
+    # further than `MAX_TAG_CHARS` from the end is taken as text instead (as
+    # `TAG_SPLIT_PATTERN.split` does), so a stray one cannot hold back the rest of the page.
+    pos = 0
+    while True:
+        end = COMPLETE_PATTERN.match(buffer, pos).end()
+        if len(buffer) - end <= MAX_TAG_CHARS:
+            return end
+        pos = end + 1
+
+
+def _minify_tag_text(tag: str) -> Tuple[str, bool]:
+    match = TAG_PATTERN.match(tag)
+    if match is None:
+        # a doctype, conditional comment or processing instruction
+        result = (tag, True)
+    else:
+        result = (minify_tag(match), match.group(2).lower() in BLOCK_TAGS)
+    if len(_tag_cache) >= TAG_CACHE_SIZE:
+        _tag_cache.clear()
+    _tag_cache[tag] = result
+    return result
+
+
+def minify_tag(tag: Match[str]) -> str:
+    """
+    Rewrites a start or end tag in its shortest equivalent form.
+
+    Args:
+        tag (Match[str]): A match of `TAG_PATTERN`.
+
+    Returns:
+        str: The tag, e.g. `<meta  charset="utf-8" />` -> `<meta charset=utf-8>`.
+    """
+    closing, name, attributes, self_closing = tag.groups()
+    parts = ["<", closing, name]
+    unquoted = False
+    for attribute in ATTRIBUTE_PATTERN.finditer(attributes):
+        key, value = attribute.groups()
+        parts.append(" " + key)
+        if value is None:
+            continue
+        if value[0] in "\"'" and UNQUOTED_VALUE_PATTERN.match(value[1:-1]):
+            value = value[1:-1]
+        unquoted = value[0] not in "\"'"
+        parts.append("=" + value)
+    if self_closing and name.lower() not in VOID_TAGS:
+        # an unquoted value would swallow the slash
+        parts.append(" />" if unquoted else "/>")
+    else:
+        parts.append(">")
+    return "".join(parts)
+
+
+@contextmanager
+def minified(out: TextIO, enabled: bool = True) -> Iterator[TextIO]:
+    """
+    Wraps `out` in an HTMLMinifier for the body of a `with` block.
+
+    Args:
+        out (TextIO): The output file.
+        enabled (bool): If False, `out` itself is used.
+
+    Yields:
+        TextIO: The file to write the page to.
+    """
+    if not enabled:
+        yield out
+        return
+    minifier = HTMLMinifier(out)
+    yield minifier
+    minifier.close()
+
+
+def minify_html(html: str) -> str:
+    """
+    Minifies a complete HTML document; see `HTMLMinifier`.
+
+    Args:
+        html (str): The HTML.
+
+    Returns:
+        str: The minified HTML.
+    """
+    out = io.StringIO()
+    with minified(out) as writer:
+        writer.write(html)
+    return out.getvalue()
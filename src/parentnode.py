@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from htmlnode import HTMLNode
 
 class ParentNode(HTMLNode):
@@ -13,6 +13,8 @@ class ParentNode(HTMLNode):
         children: List of child HTMLNode objects
         props: Optional dictionary of HTML attributes
     """
+    __slots__ = ()
+
     def __init__(self, tag: str, children: List[HTMLNode], props: Optional[Dict[str,str]] = None):
         """
         Initialize a new ParentNode.
@@ -24,21 +26,15 @@ class ParentNode(HTMLNode):
         """
         super().__init__(tag=tag, children=children, props=props)
 
-    def to_html(self):
-        """
-        Convert the ParentNode and all its children to an HTML string.
-        
-        Returns:
-            str: HTML representation of this node and its children
+    def _html_parts(self, in_paragraph: bool) -> Tuple[str, Sequence[HTMLNode], str, bool]:
         """
-        if not self.children:
-            # base case we reach a leaf node and call its to_html method
-            return self.to_html()
-        return_string = f"<{self.tag}" + f"{self.props_to_html()}>"
+        Describes how this node is serialized; see `HTMLNode.write_html`.
 
-        for child in self.children:
-            return_string += child.to_html()
-        return_string = return_string.replace("\n", " ") if self.tag == "p" else return_string
-
-        return_string += f"</{self.tag}>"
-        return return_string
+        A `<p>` ParentNode renders newlines in all of its descendants as spaces.
+        A ParentNode without children is rendered as an empty element.
+        """
+        children_in_paragraph = in_paragraph or self.tag == "p"
+        opening = f"<{self.tag}{self.props_to_html()}>"
+        if children_in_paragraph:
+            opening = opening.replace("\n", " ")
+        return opening, self.children, f"</{self.tag}>", children_in_paragraph
@@ -0,0 +1,238 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import AbstractSet, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from build_log import emit_event
+from build_manifest import hash_file
+from copy_to_public import walk_tree
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_VERSION = 1
+COMPRESSIBLE_EXTENSIONS = frozenset({".html", ".css", ".js", ".svg"})
+GZIP_SUFFIX = ".gz"
+# Smaller files gain little from compression: their response headers dominate the transfer.
+MIN_COMPRESS_BYTES = 1024
+DEFAULT_COMPRESS_WORKERS = 4
+
+
+class CompressResult(NamedTuple):
+    """
+    Summary of a `precompress_outputs` run.
+
+    Attributes:
+        files (int): Number of files compressed.
+        bytes (int): Total size of the files compressed.
+        compressed_bytes (int): Total size of the `.gz` files written.
+        removed (int): Number of outdated `.gz` files deleted.
+        seconds (float): Wall time of the whole run, including unchanged files.
+    """
+    files: int
+    bytes: int
+    compressed_bytes: int
+    removed: int
+    seconds: float
+
+
+class CompressionManifest:
+    """
+    A persistent record of the outputs that have a precompressed `.gz` sibling, with the
+    size, mtime and content hash each one was compressed from.
+
+    Attributes:
+        path (Optional[str]): Location of the manifest JSON file. None keeps it in memory.
+        entries (Dict[str, Dict]): Size, mtime and hash keyed by output path relative to the
+            output directory.
+    """
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initializes a CompressionManifest and loads any existing manifest from `path`.
+
+        Args:
+            path (Optional[str]): Location of the manifest JSON file.
+        """
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self) -> None:
+        """
+        Loads the manifest from disk. A missing, unreadable or outdated manifest is treated as
+        empty, which compresses every output again.
+        """
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == COMPRESSION_VERSION:
+            self.entries = data.get("entries", {})
+
+    def save(self) -> None:
+        """
+        Writes the manifest to disk atomically (write to a temporary file, then rename).
+        """
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": COMPRESSION_VERSION, "entries": self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def remove_outputs(self, root: str, outputs: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Deletes the `.gz` siblings of outputs and drops their entries.
+
+        Args:
+            root (str): The output directory.
+            outputs (Optional[Iterable[str]]): The outputs whose `.gz` files are deleted,
+                relative to `root`. Defaults to every recorded output.
+
+        Returns:
+            List[str]: The deleted `.gz` files.
+        """
+        removed = []
+        for relative_path in list(outputs if outputs is not None else self.entries):
+            path = os.path.join(root, relative_path + GZIP_SUFFIX)
+            if os.path.isfile(path):
+                os.remove(path)
+                removed.append(path)
+                logger.info("Removed outdated %s", path)
+            self.entries.pop(relative_path, None)
+        return removed
+
+
+def compress_file(path: str, st: Optional[os.stat_result] = None) -> int:
+    """
+    Writes `<path>.gz` next to `path`, compressed at the highest zlib level.
+
+    The gzip header carries no timestamp, so unchanged content always compresses to the
+    same bytes, and the `.gz` file gets the mtime of `path`. It is written to a temporary file
+    and renamed into place, so a server never sees a partial file.
+
+    Args:
+        path (str): The file to compress.
+        st (Optional[os.stat_result]): The result of `os.stat(path)`, if already known.
+
+    Returns:
+        int: The size of the `.gz` file.
+    """
+    if st is None:
+        st = os.stat(path)
+    with open(path, "rb") as f:
+        data = gzip.compress(f.read(), compresslevel=9, mtime=0)
+    tmp_path = path + GZIP_SUFFIX + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(tmp_path, path + GZIP_SUFFIX)
+    return len(data)
+
+
+def _decompressed_hash(path: str) -> Optional[str]:
+    # SHA-256 of a `.gz` file's decompressed content, or None if it is not valid gzip data.
+    digest = hashlib.sha256()
+    try:
+        with gzip.open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                digest.update(chunk)
+    except (OSError, EOFError, zlib.error):
+        return None
+    return digest.hexdigest()
+
+
+def precompress_outputs(root: str, manifest: CompressionManifest, min_bytes: int = MIN_COMPRESS_BYTES, workers: int = DEFAULT_COMPRESS_WORKERS, placed: AbstractSet[str] = frozenset()) -> CompressResult:
+    """
+    Writes a `.gz` sibling (see `compress_file`) next to every HTML, CSS, JS and SVG file
+    below `root` of at least `min_bytes`, so a server or proxy can send precompressed files
+    instead of compressing on every request.
+
+    An output whose size and mtime match the manifest (and whose `.gz` file is still there) is
+    skipped without being read. Any
+    other output is hashed first and only compressed if its content changed, so pages that
+    were rewritten with the same content are not compressed again. Hashing and compression
+    run in a pool of `workers` threads (zlib releases the GIL while it compresses).
+
+    `.gz` files recorded in the manifest whose output was removed, or fell below `min_bytes`,
+    are deleted. A `.gz` file placed by another build step (e.g. copied from `static/`) is
+    never overwritten or deleted. Any other `.gz` file that is not recorded (e.g. because the
+    manifest was lost) is taken for one of ours if it decompresses to its output's content, or
+    if it is older than its output, and then compressed again.
+
+    Args:
+        root (str): The output directory.
+        manifest (CompressionManifest): The outputs compressed by the last build; updated in
+            place.
+        min_bytes (int): Files smaller than this are not compressed. Defaults to 1 KiB.
+        workers (int): Number of compression threads. Defaults to 4.
+        placed (AbstractSet[str]): Paths of the files other build steps placed below `root`,
+            e.g. `BuildManifest.outputs()`.
+
+    Returns:
+        CompressResult: How many files were compressed, their sizes before and after, and how
+        many outdated `.gz` files were deleted.
+    """
+    start = time.perf_counter()
+
+    def compress(relative_path: str, st: os.stat_result, cached: Optional[Dict], compressed_st: Optional[os.stat_result] = None) -> Tuple[str, Optional[Dict], int]:
+        path = os.path.join(root, relative_path)
+        digest = hash_file(path)
+        entry = {"size": st.st_size, "mtime": st.st_mtime_ns, "hash": digest}
+        if compressed_st is not None:
+            # an unrecorded `.gz` file: ours if it has the output's content, or is older than the
+            # output (`compress_file` gives it the output's mtime)
+            if _decompressed_hash(path + GZIP_SUFFIX) == digest:
+                return relative_path, entry, -1
+            if compressed_st.st_mtime_ns >= st.st_mtime_ns:
+                return relative_path, None, -1
+        elif cached is not None and cached["hash"] == digest and os.path.exists(path + GZIP_SUFFIX):
+            return relative_path, entry, -1
+        compressed = compress_file(path, st)
+        logger.debug("Compressed %s (%d -> %d bytes)", path, st.st_size, compressed)
+        return relative_path, entry, compressed
+
+    entries: Dict[str, Dict] = {}
+    files = total_bytes = compressed_bytes = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        if os.path.isdir(root):
+            for entry in walk_tree(root):
+                if entry.is_dir or os.path.splitext(entry.path)[1] not in COMPRESSIBLE_EXTENSIONS or entry.stat.st_size < min_bytes:
+                    continue
+                cached = manifest.entries.get(entry.path)
+                compressed_path = os.path.join(root, entry.path + GZIP_SUFFIX)
+                compressed_exists = os.path.exists(compressed_path)
+                if cached is None and compressed_exists:
+                    if os.path.abspath(compressed_path) not in placed:
+                        futures.append(executor.submit(compress, entry.path, entry.stat, None, os.stat(compressed_path)))
+                    continue
+                if compressed_exists and cached["size"] == entry.stat.st_size and cached["mtime"] == entry.stat.st_mtime_ns:
+                    entries[entry.path] = cached
+                    continue
+                futures.append(executor.submit(compress, entry.path, entry.stat, cached))
+        for future in futures:
+            relative_path, entry, compressed = future.result()
+            if entry is None:
+                continue  # not ours
+            entries[relative_path] = entry
+            if compressed >= 0:
+                files += 1
+                total_bytes += entry["size"]
+                compressed_bytes += compressed
+
+    removed = manifest.remove_outputs(root, manifest.entries.keys() - entries.keys())
+    manifest.entries = entries
+
+    result = CompressResult(files, total_bytes, compressed_bytes, len(removed), time.perf_counter() - start)
+    logger.info("Precompressed outputs: %d files, %.1f kB -> %.1f kB in %.2fs", result.files, result.bytes / 1e3, result.compressed_bytes / 1e3, result.seconds)
+    emit_event("outputs_compressed", files=result.files, bytes=result.bytes, compressed_bytes=result.compressed_bytes, removed=result.removed, seconds=round(result.seconds, 6))
+    return result
@@ -0,0 +1,174 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Build phases in the order they happen. Page phases are recorded for every generated page,
+# the others once per build. Title extraction only shows up for pages whose title is not a
+# heading block, since the title is otherwise picked up while parsing.
+BUILD_PHASES = ("static copy", "file discovery")
+PAGE_PHASES = (
+    "read",
+    "title extraction",
+    "block splitting",
+    "block classification",
+    "inline parsing",
+    "serialization",
+    "template fill",
+    "disk write",
+)
+
+DEFAULT_TOP_PAGES = 10
+
+PhaseTimes = Dict[str, List[float]]
+
+
+class Profiler:
+    """
+    Collects the wall and CPU time spent in each phase of a build, per page and in aggregate.
+
+    Times are accumulated in `[wall seconds, cpu seconds]` pairs keyed by phase name. CPU time
+    is the CPU time of the whole process, so it includes threads working for the phase (e.g. the
+    static copy pool).
+
+    Attributes:
+        phases (Dict[str, List[float]]): Build-wide times per phase, page phases included.
+        pages (Dict[str, Dict[str, List[float]]]): Times per phase for each generated page,
+            keyed by the page's source path.
+    """
+    def __init__(self):
+        """
+        Initializes an empty Profiler and starts the clock for the whole run.
+        """
+        self.phases: PhaseTimes = {}
+        self.pages: Dict[str, PhaseTimes] = {}
+        self._start = (time.perf_counter(), time.process_time())
+
+    @contextmanager
+    def phase(self, name: str, page: Optional[str] = None) -> Iterator[None]:
+        """
+        Times the body of a `with` block as phase `name`.
+
+        Args:
+            name (str): The phase name.
+            page (Optional[str]): The source path of the page the phase belongs to, if any.
+        """
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.process_time() - cpu, page)
+
+    def add(self, name: str, wall: float, cpu: float, page: Optional[str] = None) -> None:
+        """
+        Adds a measurement to phase `name`.
+
+        Args:
+            name (str): The phase name.
+            wall (float): Wall time in seconds.
+            cpu (float): CPU time in seconds.
+            page (Optional[str]): The source path of the page the phase belongs to, if any.
+        """
+        _accumulate(self.phases, name, wall, cpu)
+        if page is not None:
+            _accumulate(self.pages.setdefault(page, {}), name, wall, cpu)
+
+    def add_page(self, page: str, phases: PhaseTimes) -> None:
+        """
+        Merges the phase times of a page that was profiled elsewhere (e.g. in a worker process).
+
+        Args:
+            page (str): The source path of the page.
+            phases (Dict[str, List[float]]): The page's `[wall, cpu]` times per phase.
+        """
+        for name, (wall, cpu) in phases.items():
+            self.add(name, wall, cpu, page)
+
+    def slowest_pages(self, count: int = DEFAULT_TOP_PAGES) -> List[Tuple[str, float, float]]:
+        """
+        Returns the pages that took the longest wall time, slowest first.
+
+        Args:
+            count (int): Number of pages to return.
+
+        Returns:
+            List[Tuple[str, float, float]]: (page, wall seconds, cpu seconds) for each page.
+        """
+        totals = [(page, *_total(phases)) for page, phases in self.pages.items()]
+        totals.sort(key=lambda row: row[1], reverse=True)
+        return totals[:count]
+
+    def report(self) -> Dict:
+        """
+        Builds the JSON-serializable profile report.
+
+        Returns:
+            Dict: The run's total times, the times of every phase, and the per-phase times of
+            every page.
+        """
+        wall, cpu = self._start
+        return {
+            "total": _times(time.perf_counter() - wall, time.process_time() - cpu),
+            "page_count": len(self.pages),
+            "phases": {name: _times(*self.phases[name]) for name in _ordered(self.phases)},
+            "pages": {
+                page: {
+                    "total": _times(*_total(phases)),
+                    "phases": {name: _times(*phases[name]) for name in _ordered(phases)},
+                }
+                for page, phases in sorted(self.pages.items())
+            },
+        }
+
+    def write_report(self, path: str) -> None:
+        """
+        Writes the profile report to `path` as JSON.
+
+        Args:
+            path (str): Location of the report file.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=1)
+
+    def format_summary(self, top: int = DEFAULT_TOP_PAGES) -> str:
+        """
+        Formats the aggregate time of each phase and the `top` slowest pages as text tables.
+
+        Args:
+            top (int): Number of pages listed.
+
+        Returns:
+            str: The tables, one row per line.
+        """
+        lines = [f"{'phase':<24} {'wall ms':>10} {'cpu ms':>10}"]
+        for name in _ordered(self.phases):
+            wall, cpu = self.phases[name]
+            lines.append(f"{name:<24} {wall * 1000:>10.2f} {cpu * 1000:>10.2f}")
+        slowest = self.slowest_pages(top)
+        if slowest:
+            lines.append("")
+            lines.append(f"{'slowest pages':<48} {'wall ms':>10} {'cpu ms':>10}")
+            for page, wall, cpu in slowest:
+                lines.append(f"{page:<48} {wall * 1000:>10.2f} {cpu * 1000:>10.2f}")
+        return "\n".join(lines)
+
+
+def _accumulate(phases: PhaseTimes, name: str, wall: float, cpu: float) -> None:
+    times = phases.setdefault(name, [0.0, 0.0])
+    times[0] += wall
+    times[1] += cpu
+
+
+def _total(phases: PhaseTimes) -> Tuple[float, float]:
+    return sum(wall for wall, _ in phases.values()), sum(cpu for _, cpu in phases.values())
+
+
+def _times(wall: float, cpu: float) -> Dict[str, float]:
+    return {"wall": round(wall, 6), "cpu": round(cpu, 6)}
+
+
+def _ordered(phases: PhaseTimes) -> List[str]:
+    known = [name for name in BUILD_PHASES + PAGE_PHASES if name in phases]
+    return known + sorted(name for name in phases if name not in known)
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Optional, TextIO, Union
+
+from document_metadata import DocumentMetadata
+from htmlnode import HTMLNode
+
+# Bump whenever a change to the markdown parser or the HTML serializer changes the output
+# for the same input, so fragments rendered by older code are never reused.
+PARSER_VERSION = "2"
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class CachedFragment:
+    """
+    An HTML fragment stored in the render cache.
+
+    It provides the same `write_html(out)` method as `HTMLNode`, so it can be passed anywhere
+    a page body is expected. The fragment is copied from disk in chunks and never loaded whole.
+
+    The first line of the file holds the document's metadata as JSON, so a cache hit also
+    provides the title and outline without parsing the markdown.
+
+    Attributes:
+        path (str): Location of the fragment file.
+    """
+    def __init__(self, path: str):
+        """
+        Initializes a CachedFragment.
+
+        Args:
+            path (str): Location of the fragment file.
+        """
+        self.path = path
+
+    def write_html(self, out: TextIO) -> None:
+        """
+        Copies the cached HTML into `out`.
+
+        Args:
+            out (TextIO): Any object with a `write(str)` method.
+        """
+        with open(self.path, "r", encoding="utf-8") as f:
+            f.readline()
+            shutil.copyfileobj(f, out)
+
+    def metadata(self) -> Optional[DocumentMetadata]:
+        """
+        Reads the metadata stored with the fragment.
+
+        Returns:
+            Optional[DocumentMetadata]: The document's metadata, or None if none was stored.
+        """
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.loads(f.readline())
+        return DocumentMetadata.from_dict(data) if data is not None else None
+
+
+class RenderCache:
+    """
+    An on-disk cache of rendered HTML fragments, keyed by the SHA-256 hash of the markdown
+    source together with `PARSER_VERSION` and the cache's `variant`.
+
+    A hit skips parsing and serialization entirely. Reading an entry refreshes its
+    modification time, and `prune` evicts the least recently used entries once the
+    cache grows beyond `max_bytes`.
+
+    Attributes:
+        directory (str): Directory holding the cached fragments.
+        max_bytes (int): Size the cache is pruned down to.
+        variant (str): Tells apart renderings of the same markdown that differ in more than the
+            parser, e.g. in the asset URLs they were rewritten with.
+        created_ns (int): When the cache object was created, i.e. when the build started.
+    """
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES, variant: str = ""):
+        """
+        Initializes a RenderCache.
+
+        Args:
+            directory (str): Directory holding the cached fragments. Created on first write.
+            max_bytes (int): Size the cache is pruned down to. Defaults to 256 MiB.
+            variant (str): Part of every key. Defaults to "".
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.variant = variant
+        self.created_ns = time.time_ns()
+
+    def _path(self, markdown: str) -> str:
+        key = hashlib.sha256(f"{PARSER_VERSION}\0{self.variant}\0{markdown}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key[:2], key + ".html")
+
+    def get(self, markdown: str) -> Optional[CachedFragment]:
+        """
+        Looks up the rendered fragment for a markdown source.
+
+        Args:
+            markdown (str): The markdown source.
+
+        Returns:
+            Optional[CachedFragment]: The cached fragment, or None on a miss.
+        """
+        path = self._path(markdown)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return CachedFragment(path)
+
+    def put(self, markdown: str, html_node: Union[HTMLNode, str], metadata: Optional[DocumentMetadata] = None) -> CachedFragment:
+        """
+        Serializes `html_node` into the cache as the fragment for `markdown`.
+
+        The fragment is written to a temporary file and renamed into place, so concurrent
+        builds never observe a partially written entry.
+
+        Args:
+            markdown (str): The markdown source the node tree was parsed from.
+            html_node (Union[HTMLNode, str]): The root node of the rendered markdown, or the
+                HTML it was already serialized to.
+            metadata (Optional[DocumentMetadata]): The metadata gathered while parsing, stored
+                with the fragment.
+
+        Returns:
+            CachedFragment: The newly stored fragment.
+        """
+        path = self._path(markdown)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(metadata.to_dict() if metadata is not None else None) + "\n")
+            if isinstance(html_node, str):
+                f.write(html_node)
+            else:
+                html_node.write_html(f)
+        os.replace(tmp_path, path)
+        return CachedFragment(path)
+
+    def prune(self) -> int:
+        """
+        Evicts the least recently used fragments until the cache fits in `max_bytes`.
+
+        Temporary files left behind by interrupted writes are not counted as fragments; those
+        older than this build are deleted. This is meant to be called once at the end of a
+        build, from a single process.
+
+        Returns:
+            int: The number of fragments removed.
+        """
+        entries = []
+        total = 0
+        for dir_path, _, file_names in os.walk(self.directory):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                st = os.stat(path)
+                if file_name.endswith(".tmp"):
+                    if st.st_mtime_ns < self.created_ns:
+                        os.remove(path)
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, path))
+                total += st.st_size
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,254 @@
+import json
+import logging
+import os
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from blocktype import find_title, read_lines
+from copy_to_public import walk_tree
+from front_matter import FrontMatter, read_front_matter
+
+INDEX_VERSION = 3
+# The entry fields that describe a page, as opposed to the size and mtime of its file.
+METADATA_FIELDS = ("url", "title", "date", "tags", "draft", "template")
+
+logger = logging.getLogger(__name__)
+
+
+class PageInfo(NamedTuple):
+    """
+    What the site index knows about a page.
+
+    Attributes:
+        source (str): The markdown file, relative to the content directory.
+        url (str): The URL the page is served at, e.g. `/blog/tom/` for `blog/tom/index.md`.
+        title (Optional[str]): The front matter title, or else the title `blocktype.find_title`
+            finds, the same as the page's `<title>`.
+        date (Optional[str]): The front matter date.
+        tags (List[str]): The front matter tags.
+        draft (bool): Whether the page is a draft.
+        template (Optional[str]): The template named in the front matter.
+    """
+    source: str
+    url: str
+    title: Optional[str]
+    date: Optional[str]
+    tags: List[str]
+    draft: bool
+    template: Optional[str]
+
+
+def page_url(source: str) -> str:
+    """
+    Maps a markdown file to the URL of its page.
+
+    Args:
+        source (str): The markdown file, relative to the content directory.
+
+    Returns:
+        str: The URL, e.g. `blog/tom/index.md` -> `/blog/tom/`, `about.md` -> `/about.html`.
+    """
+    directory, file_name = os.path.split(os.path.splitext(source)[0])
+    parts = [part for part in directory.split(os.sep) if part]
+    if file_name != "index":
+        return "/" + "/".join(parts + [file_name + ".html"])
+    return "/" + "".join(part + "/" for part in parts)
+
+
+class SiteIndex:
+    """
+    A persistent index of every page's metadata, so the site's structure (titles, dates,
+    tags, drafts, templates) is known without reading the page bodies.
+
+    The index is built in one discovery pass over the content directory and stored on disk.
+    On later builds only pages whose size or mtime changed are read again, and of those only
+    the front matter (plus, for pages without a front matter title, the lines up to the first
+    level-1 heading).
+
+    Attributes:
+        path (Optional[str]): Location of the index JSON file. None keeps the index in memory.
+        content_root (str): The content directory.
+        include_drafts (bool): Whether draft pages are built.
+        entries (Dict[str, Dict]): Page metadata keyed by source path relative to `content_root`.
+    """
+    def __init__(self, path: Optional[str], content_root: str, include_drafts: bool = False):
+        """
+        Initializes a SiteIndex and loads any existing index from `path`.
+
+        Args:
+            path (Optional[str]): Location of the index JSON file.
+            content_root (str): The content directory.
+            include_drafts (bool): Whether draft pages are built. Defaults to False.
+        """
+        self.path = path
+        self.content_root = os.path.abspath(content_root)
+        self.include_drafts = include_drafts
+        self.entries: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self) -> None:
+        """
+        Loads the index from disk. A missing, unreadable or outdated index is treated as empty.
+        """
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self.entries = data.get("entries", {})
+
+    def save(self) -> None:
+        """
+        Writes the index to disk atomically (write to a temporary file, then rename).
+        """
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": INDEX_VERSION, "entries": self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.content_root)
+
+    def update(self) -> List[str]:
+        """
+        Brings the index up to date with the content directory in a single walk: new and
+        modified pages are read again, removed pages are dropped.
+
+        Returns:
+            List[str]: The source paths (relative to the content directory) that were added or
+            removed, or whose metadata changed, sorted. A page whose file changed but whose
+            metadata did not (e.g. after a `touch`) is not included.
+        """
+        changed: List[str] = []
+        seen: Set[str] = set()
+        if os.path.isdir(self.content_root):
+            for entry in walk_tree(self.content_root):
+                if entry.is_dir or os.path.splitext(entry.path)[1] != ".md":
+                    continue
+                seen.add(entry.path)
+                cached = self.entries.get(entry.path)
+                if cached is not None and cached["size"] == entry.stat.st_size and cached["mtime"] == entry.stat.st_mtime_ns:
+                    continue
+                if _metadata_changed(cached, self._read(entry.path, entry.stat)):
+                    changed.append(entry.path)
+        for key in [key for key in self.entries if key not in seen]:
+            del self.entries[key]
+            changed.append(key)
+        changed.sort()
+        return changed
+
+    def update_page(self, path: str) -> bool:
+        """
+        Re-reads one page, or drops it from the index if it no longer exists.
+
+        Args:
+            path (str): Path to the markdown file.
+
+        Returns:
+            bool: True if the page's metadata changed.
+        """
+        key = self._key(path)
+        if not os.path.isfile(path):
+            return self.entries.pop(key, None) is not None
+        cached = self.entries.get(key)
+        return _metadata_changed(cached, self._read(key, os.stat(path)))
+
+    def remove(self, path: str) -> List[str]:
+        """
+        Drops a removed page, or every page below a removed directory.
+
+        Args:
+            path (str): Path to the removed file or directory.
+
+        Returns:
+            List[str]: The dropped source paths, relative to the content directory.
+        """
+        prefix = self._key(path)
+        removed = [key for key in self.entries if key == prefix or key.startswith(prefix + os.sep)]
+        for key in removed:
+            del self.entries[key]
+        return removed
+
+    def _read(self, key: str, st: os.stat_result) -> Dict:
+        with open(os.path.join(self.content_root, key), "r") as f:
+            try:
+                try:
+                    front_matter = read_front_matter(f)
+                except UnicodeDecodeError:
+                    raise
+                except ValueError as e:
+                    # indexed without its front matter (`f` is past it); rendering the page
+                    # reports the error for this page alone
+                    logger.error("Invalid front matter in %s: %s", f.name, e)
+                    front_matter = FrontMatter()
+                title = front_matter.title if front_matter.title is not None else find_title(read_lines(f))
+            except UnicodeDecodeError as e:
+                # indexed without any metadata; rendering the page reports the error as well
+                logger.error("Could not read %s: %s", f.name, e)
+                front_matter, title = FrontMatter(), None
+        entry = {
+            "size": st.st_size,
+            "mtime": st.st_mtime_ns,
+            "url": page_url(key),
+            "title": title,
+            "date": front_matter.date,
+            "tags": front_matter.tags,
+            "draft": front_matter.draft,
+            "template": front_matter.template,
+        }
+        self.entries[key] = entry
+        return entry
+
+    def get(self, path: str) -> Optional[PageInfo]:
+        """
+        Looks up a page.
+
+        Args:
+            path (str): Path to the markdown file.
+
+        Returns:
+            Optional[PageInfo]: The page's metadata, or None if the page is not indexed.
+        """
+        key = self._key(path)
+        entry = self.entries.get(key)
+        return self._info(key, entry) if entry is not None else None
+
+    def pages(self) -> List[PageInfo]:
+        """
+        Returns every page that is built (drafts only if `include_drafts` is set), sorted by
+        source path.
+
+        Returns:
+            List[PageInfo]: The pages' metadata.
+        """
+        return [
+            self._info(key, entry)
+            for key, entry in sorted(self.entries.items())
+            if self.include_drafts or not entry["draft"]
+        ]
+
+    def is_built(self, path: str) -> bool:
+        """
+        Checks whether a page is part of the build, i.e. it is not a draft or drafts are built.
+        Pages missing from the index are built.
+
+        Args:
+            path (str): Path to the markdown file.
+
+        Returns:
+            bool: False for a draft page when drafts are excluded.
+        """
+        entry = self.entries.get(self._key(path))
+        return self.include_drafts or entry is None or not entry["draft"]
+
+    def _info(self, key: str, entry: Dict) -> PageInfo:
+        return PageInfo(key, entry["url"], entry["title"], entry["date"], entry["tags"], entry["draft"], entry["template"])
+
+
+def _metadata_changed(cached: Optional[Dict], entry: Dict) -> bool:
+    return cached is None or any(cached.get(field) != entry[field] for field in METADATA_FIELDS)
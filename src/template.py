@@ -0,0 +1,167 @@
+import os
+import re
+from typing import Any, Dict, List, Mapping, Optional, TextIO, Tuple
+
+from asset_pipeline import rewrite_html_urls, urls_digest
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*([A-Za-z_][\w-]*)\s*\}\}")
+TEMPLATE_FILE_NAME = "template.html"
+
+
+class Template:
+    """
+    A compiled HTML template: the literal text of the template split around its
+    `{{ name }}` placeholders.
+
+    The template is scanned for placeholders once, when it is compiled. Rendering only
+    joins the literal segments with the slot values, and slot values are never scanned
+    for placeholders themselves.
+
+    Attributes:
+        literals (List[str]): The literal text around the slots (always one more than `slots`).
+        slots (List[str]): The placeholder names in order of appearance.
+    """
+    def __init__(self, source: str):
+        """
+        Compiles a template.
+
+        Args:
+            source (str): The template text containing `{{ name }}` placeholders.
+        """
+        self.literals: List[str] = []
+        self.slots: List[str] = []
+        self._placeholders: List[str] = []
+        pos = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            self.literals.append(source[pos:match.start()])
+            self.slots.append(match.group(1))
+            self._placeholders.append(match.group())
+            pos = match.end()
+        self.literals.append(source[pos:])
+
+    def render(self, context: Mapping[str, Any]) -> str:
+        """
+        Fills the slots with values from `context` and returns the page.
+
+        Slots missing from `context` are left as they were written in the template.
+
+        Args:
+            context (Mapping[str, Any]): Slot values. Non-string values are converted with `str`.
+
+        Returns:
+            str: The rendered text.
+        """
+        parts = [self.literals[0]]
+        for slot, placeholder, literal in zip(self.slots, self._placeholders, self.literals[1:]):
+            value = context.get(slot, placeholder)
+            parts.append(value if isinstance(value, str) else str(value))
+            parts.append(literal)
+        return "".join(parts)
+
+    def write(self, out: TextIO, context: Mapping[str, Any]) -> None:
+        """
+        Streams the rendered page into `out`.
+
+        Slot values that provide a `write_html(out)` method (an `HTMLNode` tree or a cached
+        fragment) are serialized straight into `out` instead of being converted to a string.
+
+        Args:
+            out (TextIO): Any object with a `write(str)` method.
+            context (Mapping[str, Any]): Slot values.
+        """
+        out.write(self.literals[0])
+        for slot, placeholder, literal in zip(self.slots, self._placeholders, self.literals[1:]):
+            value = context.get(slot, placeholder)
+            if hasattr(value, "write_html"):
+                value.write_html(out)
+            else:
+                out.write(value if isinstance(value, str) else str(value))
+            out.write(literal)
+
+
+class TemplateLoader:
+    """
+    Loads and compiles templates, keeping each compiled template for as long as its file's
+    mtime is unchanged, and picks the template that applies to each page.
+
+    A page uses the template named in its front matter if there is one, otherwise the nearest
+    `template.html` found in its own directory or any parent directory up to the content root,
+    falling back to the default template.
+
+    Attributes:
+        default_path (str): The template used when no directory provides its own.
+        content_root (Optional[str]): The content directory that per-directory lookups stop at.
+        asset_urls (Mapping[str, str]): Fingerprinted asset URL by original URL; `href` and
+            `src` attributes of the templates are rewritten with it when they are compiled.
+        asset_digest (Optional[str]): The hash of `asset_urls` (see `urls_digest`), or None if
+            assets are not fingerprinted.
+    """
+    def __init__(self, default_path: str, content_root: Optional[str] = None, asset_urls: Optional[Mapping[str, str]] = None):
+        """
+        Initializes a TemplateLoader.
+
+        Args:
+            default_path (str): The template used when no directory provides its own.
+            content_root (Optional[str]): The content directory. Without it, per-directory
+                templates are not looked up.
+            asset_urls (Optional[Mapping[str, str]]): Fingerprinted asset URLs, if assets are
+                fingerprinted.
+        """
+        self.default_path = default_path
+        self.content_root = os.path.abspath(content_root) if content_root is not None else None
+        self.asset_urls: Mapping[str, str] = asset_urls or {}
+        self.asset_digest: Optional[str] = urls_digest(self.asset_urls) if self.asset_urls else None
+        self._templates: Dict[str, Tuple[int, Template]] = {}
+        self._directory_templates: Dict[str, str] = {}
+
+    def load(self, path: str) -> Template:
+        """
+        Returns the compiled template at `path`, reading and compiling it only if it was not
+        loaded before or has been modified since.
+
+        Args:
+            path (str): Path to the template file.
+
+        Returns:
+            Template: The compiled template.
+        """
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._templates.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, "r") as f:
+            template = Template(rewrite_html_urls(f.read(), self.asset_urls))
+        self._templates[path] = (mtime, template)
+        return template
+
+    def resolve(self, page_path: str, name: Optional[str] = None) -> str:
+        """
+        Finds the template that applies to a page.
+
+        Args:
+            page_path (str): Path to the page's markdown file.
+            name (Optional[str]): The template named in the page's front matter, relative to
+                the directory of the default template. Takes precedence over any
+                per-directory template.
+
+        Returns:
+            str: Path to the template file to use.
+        """
+        if name:
+            return os.path.join(os.path.dirname(self.default_path), name)
+        if self.content_root is None:
+            return self.default_path
+        return self._resolve_directory(os.path.dirname(os.path.abspath(page_path)))
+
+    def _resolve_directory(self, directory: str) -> str:
+        if directory in self._directory_templates:
+            return self._directory_templates[directory]
+        candidate = os.path.join(directory, TEMPLATE_FILE_NAME)
+        if os.path.isfile(candidate):
+            path = candidate
+        elif directory == self.content_root or os.path.dirname(directory) == directory or os.path.commonpath([directory, self.content_root]) != self.content_root:
+            path = self.default_path
+        else:
+            path = self._resolve_directory(os.path.dirname(directory))
+        self._directory_templates[directory] = path
+        return path
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from asset_pipeline import AssetManifest, fingerprinted_path, rewrite_html_urls, rewrite_node_urls, rewrite_url
+from blocktype import markdown_to_html_node
+from build_manifest import BuildManifest
+from copy_to_public import sync_to_dest
+
+URLS = {"/index.css": "/index.1a2b3c4d.css", "/images/tom.png": "/images/tom.5e6f7a8b.png"}
+
+
+class TestRewriting(unittest.TestCase):
+    def test_fingerprinted_path(self):
+        self.assertEqual(fingerprinted_path(os.path.join("images", "tom.png"), "1a2b3c4d5e6f"), os.path.join("images", "tom.1a2b3c4d.png"))
+        self.assertEqual(fingerprinted_path("LICENSE", "1a2b3c4d5e6f"), "LICENSE.1a2b3c4d")
+
+    def test_rewrite_url(self):
+        self.assertEqual(rewrite_url("/index.css", URLS), "/index.1a2b3c4d.css")
+        self.assertEqual(rewrite_url("/index.css?v=2#top", URLS), "/index.1a2b3c4d.css?v=2#top")
+        self.assertEqual(rewrite_url("https://example.com/index.css", URLS), "https://example.com/index.css")
+        self.assertEqual(rewrite_url("/about.html", URLS), "/about.html")
+
+    def test_rewrite_html_urls(self):
+        html = '<link href="/index.css" rel="stylesheet"><img src=\'/images/tom.png\' alt="/index.css"><a href="/">Home</a>'
+        self.assertEqual(
+            rewrite_html_urls(html, URLS),
+            '<link href="/index.1a2b3c4d.css" rel="stylesheet"><img src=\'/images/tom.5e6f7a8b.png\' alt="/index.css"><a href="/">Home</a>',
+        )
+
+    def test_rewrite_node_urls(self):
+        node = markdown_to_html_node("![Tom](/images/tom.png) and [style](/index.css) and [Home](/)")
+        rewrite_node_urls(node, URLS)
+        self.assertEqual(
+            node.to_html(),
+            '<div><p><img src="/images/tom.5e6f7a8b.png" alt="Tom"></img> and <a href="/index.1a2b3c4d.css">style</a> and <a href="/">Home</a></p></div>',
+        )
+
+
+class TestFingerprintedSync(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "public")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "tom.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def sync(self):
+        manifest = BuildManifest(os.path.join(self.root, ".cache", "build_manifest.json"), self.root)
+        assets = AssetManifest(os.path.join(self.root, ".cache", "assets.json"))
+        result = sync_to_dest(self.static, self.public, manifest, workers=2, assets=assets)
+        manifest.remove_orphans()
+        manifest.save()
+        assets.save()
+        return result.files, assets
+
+    def public_files(self):
+        return sorted(os.path.relpath(os.path.join(path, name), self.public) for path, _, names in os.walk(self.public) for name in names)
+
+    def test_assets_are_placed_under_fingerprinted_names(self):
+        files, assets = self.sync()
+        self.assertEqual(files, 2)
+        css = assets.urls["/index.css"]
+        self.assertRegex(css, r"^/index\.[0-9a-f]{8}\.css$")
+        self.assertEqual(self.public_files(), sorted([css[1:], assets.urls["/images/tom.png"][1:]]))
+        self.assertEqual(self.sync()[0], 0)
+
+    def test_changed_asset_replaces_its_old_copy(self):
+        _, assets = self.sync()
+        old = assets.urls["/index.css"]
+        self.write(os.path.join(self.static, "index.css"), "body { color: red }")
+        files, assets = self.sync()
+        self.assertEqual(files, 1)
+        self.assertNotEqual(assets.urls["/index.css"], old)
+        self.assertIn(assets.urls["/index.css"][1:], self.public_files())
+        self.assertNotIn(old[1:], self.public_files())
+
+    def test_unchanged_assets_are_not_hashed_again(self):
+        self.sync()
+        assets = AssetManifest(os.path.join(self.root, ".cache", "assets.json"))
+        assets.hashes["index.css"]["hash"] = "0" * 64
+        src = os.path.join(self.static, "index.css")
+        self.assertEqual(assets.fingerprint(src, "index.css", os.stat(src)), "index.00000000.css")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from benchmark import CorpusSpec, compare, generate_corpus, run_benchmarks
+
+TINY = CorpusSpec(short_pages=3, huge_pages=1, huge_page_bytes=4096, inline_pages=1, list_pages=1, code_pages=1)
+
+
+class TestCorpus(unittest.TestCase):
+    def read_all(self, paths):
+        contents = []
+        for path in paths:
+            with open(path) as f:
+                contents.append(f.read())
+        return contents
+
+    def test_deterministic(self):
+        with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+            first = generate_corpus(a, TINY)
+            second = generate_corpus(b, TINY)
+            self.assertEqual(len(first), 7)
+            self.assertEqual([os.path.relpath(path, a) for path in first], [os.path.relpath(path, b) for path in second])
+            self.assertEqual(self.read_all(first), self.read_all(second))
+            self.assertNotEqual(self.read_all(generate_corpus(b, TINY._replace(seed=1))), self.read_all(first))
+
+    def test_refuses_to_overwrite_other_directories(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "content"))
+            with open(os.path.join(root, "content", "index.md"), "w") as f:
+                f.write("# Real site")
+            with self.assertRaises(ValueError):
+                generate_corpus(root, TINY)
+            with self.assertRaises(ValueError):
+                run_benchmarks(root, TINY, repeat=1)
+            with open(os.path.join(root, "content", "index.md")) as f:
+                self.assertEqual(f.read(), "# Real site")
+
+            corpus = os.path.join(root, "corpus")
+            self.assertEqual(generate_corpus(corpus, TINY), generate_corpus(corpus, TINY))
+
+    def test_run_benchmarks(self):
+        with tempfile.TemporaryDirectory() as root:
+            results = run_benchmarks(root, TINY, repeat=1)
+            self.assertEqual(set(results["benchmarks"]), {"text_to_textnodes", "markdown_to_html_node", "to_html", "markdown_to_flat_tree", "flat_to_html", "generate_page", "main"})
+            self.assertEqual(results["benchmarks"]["main"]["pages"], 7)
+            self.assertFalse(os.path.exists(os.path.join(root, "public")))
+
+
+class TestCompare(unittest.TestCase):
+    def results(self, **seconds):
+        return {"corpus": TINY._asdict(), "benchmarks": {name: {"seconds": value} for name, value in seconds.items()}}
+
+    def test_threshold(self):
+        baseline = self.results(to_html=1.0, main=2.0)
+        self.assertEqual(compare(baseline, self.results(to_html=1.05, main=1.0), 0.1), [])
+        regressions = compare(baseline, self.results(to_html=1.2, main=2.0), 0.1)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("to_html"))
+
+    def test_different_corpus(self):
+        other = self.results(main=1.0)
+        other["corpus"] = TINY._replace(seed=5)._asdict()
+        with self.assertRaises(ValueError):
+            compare(self.results(main=1.0), other)
+
+
+if __name__ == "__main__":
+    unittest.main()
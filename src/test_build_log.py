@@ -0,0 +1,33 @@
+import json
+import os
+import tempfile
+import unittest
+from build_log import configure_logging, emit_event, events_enabled
+
+
+class TestEvents(unittest.TestCase):
+    def tearDown(self):
+        configure_logging()
+
+    def test_disabled_by_default(self):
+        configure_logging()
+        self.assertFalse(events_enabled())
+        emit_event("page_built", bytes=1)
+
+    def test_json_lines(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "events.jsonl")
+            configure_logging(events=path)
+            self.assertTrue(events_enabled())
+            emit_event("page_built", source="a.md", bytes=12, seconds=0.5)
+            emit_event("build_finished", errors=0)
+            configure_logging()
+            with open(path) as f:
+                events = [json.loads(line) for line in f]
+        self.assertEqual([event["event"] for event in events], ["page_built", "build_finished"])
+        self.assertEqual((events[0]["source"], events[0]["bytes"], events[0]["seconds"]), ("a.md", 12, 0.5))
+        self.assertIn("time", events[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
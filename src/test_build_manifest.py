@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from build_manifest import BuildManifest, hash_file
+from generate_page import generate_pages_recursive
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.manifest_path = os.path.join(self.root, ".cache", "build_manifest.json")
+        self.source = os.path.join(self.root, "a.md")
+        self.output = os.path.join(self.root, "a.html")
+        with open(self.source, "w") as f:
+            f.write("# A")
+        with open(self.output, "w") as f:
+            f.write("<h1>A</h1>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fresh_after_record_and_reload(self):
+        manifest = BuildManifest(self.manifest_path, self.root)
+        self.assertFalse(manifest.is_fresh(self.source, self.output))
+        manifest.record(self.source, self.output, {"template": "t1"})
+        manifest.save()
+
+        reloaded = BuildManifest(self.manifest_path, self.root)
+        self.assertTrue(reloaded.is_fresh(self.source, self.output, {"template": "t1"}))
+        self.assertEqual(reloaded.entries["a.md"]["hash"], hash_file(self.source))
+
+    def test_stale_on_change(self):
+        manifest = BuildManifest(self.manifest_path, self.root)
+        manifest.record(self.source, self.output, {"template": "t1"})
+        manifest.save()
+
+        self.assertFalse(BuildManifest(self.manifest_path, self.root).is_fresh(self.source, self.output, {"template": "t2"}))
+
+        with open(self.source, "w") as f:
+            f.write("# B, longer")
+        self.assertFalse(BuildManifest(self.manifest_path, self.root).is_fresh(self.source, self.output, {"template": "t1"}))
+
+    def test_stale_when_output_missing(self):
+        manifest = BuildManifest(self.manifest_path, self.root)
+        manifest.record(self.source, self.output)
+        os.remove(self.output)
+        self.assertFalse(manifest.is_fresh(self.source, self.output))
+
+    def test_remove_orphans(self):
+        manifest = BuildManifest(self.manifest_path, self.root)
+        manifest.record(self.source, self.output)
+        manifest.save()
+
+        next_build = BuildManifest(self.manifest_path, self.root)
+        self.assertEqual(next_build.remove_orphans(), [self.output])
+        self.assertFalse(os.path.exists(self.output))
+        self.assertEqual(next_build.entries, {})
+
+
+class TestIncrementalPages(unittest.TestCase):
+    def test_template_change_rebuilds_pages(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            public = os.path.join(root, "public")
+            template = os.path.join(root, "template.html")
+            os.makedirs(content)
+            with open(os.path.join(content, "index.md"), "w") as f:
+                f.write("# Title\n\nBody")
+            with open(template, "w") as f:
+                f.write("<main>{{ Content }}</main>")
+            manifest_path = os.path.join(root, ".cache", "build_manifest.json")
+
+            manifest = BuildManifest(manifest_path, root)
+            generate_pages_recursive(content, template, public, manifest)
+            manifest.save()
+            output = os.path.join(public, "index.html")
+            os.utime(output, ns=(0, 0))
+
+            manifest = BuildManifest(manifest_path, root)
+            generate_pages_recursive(content, template, public, manifest)
+            self.assertEqual(os.stat(output).st_mtime_ns, 0)
+
+            with open(template, "w") as f:
+                f.write("<article>{{ Content }}</article>")
+            manifest = BuildManifest(manifest_path, root)
+            generate_pages_recursive(content, template, public, manifest)
+            with open(output) as f:
+                self.assertEqual(f.read(), "<article><div><h1>Title</h1><p>Body</p></div></article>")
+
+
+if __name__ == "__main__":
+    unittest.main()
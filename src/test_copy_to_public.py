@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+from build_manifest import BuildManifest
+from copy_to_public import Directory, place_file, sync_to_dest, walk_tree
+
+
+class TestSyncToDest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.static = os.path.join(root, "static")
+        self.public = os.path.join(root, "public")
+        self.manifest_path = os.path.join(root, ".cache", "build_manifest.json")
+        self.root = root
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def sync(self, **kwargs):
+        manifest = BuildManifest(self.manifest_path, self.root)
+        result = sync_to_dest(self.static, self.public, manifest, **kwargs)
+        removed = manifest.remove_orphans()
+        manifest.save()
+        return result.files, removed
+
+    def test_only_changed_files_are_placed(self):
+        self.assertEqual(self.sync(), (2, []))
+        self.assertEqual(self.sync(), (0, []))
+
+        self.write(os.path.join(self.static, "index.css"), "body { color: red }")
+        self.assertEqual(self.sync(), (1, []))
+        with open(os.path.join(self.public, "index.css")) as f:
+            self.assertEqual(f.read(), "body { color: red }")
+
+    def test_reports_bytes(self):
+        manifest = BuildManifest(self.manifest_path, self.root)
+        result = sync_to_dest(self.static, self.public, manifest, workers=2)
+        self.assertEqual((result.files, result.bytes), (2, len("body {}") + len("png")))
+        self.assertEqual(os.stat(os.path.join(self.public, "index.css")).st_mtime_ns, os.stat(os.path.join(self.static, "index.css")).st_mtime_ns)
+
+    def test_checksum_ignores_touched_files(self):
+        self.sync()
+        os.utime(os.path.join(self.static, "index.css"), ns=(1, 1))
+        self.assertEqual(self.sync(checksum=True), (0, []))
+        self.assertEqual(self.sync(), (1, []))
+
+    def test_removed_files_are_deleted(self):
+        self.sync()
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        self.assertEqual(self.sync(), (0, [os.path.join(self.public, "images", "a.png")]))
+
+    def test_generated_files_are_kept(self):
+        self.sync()
+        self.write(os.path.join(self.public, "index.html"), "<html></html>")
+        self.sync()
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_hardlink(self):
+        self.sync(link_mode="hardlink")
+        src = os.stat(os.path.join(self.static, "index.css"))
+        dst = os.stat(os.path.join(self.public, "index.css"))
+        self.assertEqual((src.st_dev, src.st_ino), (dst.st_dev, dst.st_ino))
+        self.assertEqual(self.sync(link_mode="hardlink"), (0, []))
+
+        # switching back to copies must not write through the link into static/
+        os.utime(os.path.join(self.static, "index.css"), ns=(1, 1))
+        self.sync(link_mode="hardlink")
+        self.write(os.path.join(self.static, "index.css"), "changed")
+        self.sync(link_mode="copy")
+        self.assertNotEqual(os.stat(os.path.join(self.public, "index.css")).st_ino, os.stat(os.path.join(self.static, "index.css")).st_ino)
+
+    def test_reflink_falls_back_to_copy(self):
+        self.assertEqual(self.sync(link_mode="reflink"), (2, []))
+        with open(os.path.join(self.public, "images", "a.png")) as f:
+            self.assertEqual(f.read(), "png")
+
+    def test_failed_link_leaves_no_temporary_file(self):
+        # a directory in the way makes replacing it fail
+        dst = os.path.join(self.root, "in-the-way")
+        os.makedirs(os.path.join(dst, "sub"))
+        with self.assertRaises(OSError):
+            place_file(os.path.join(self.static, "index.css"), dst, "hardlink")
+        self.assertEqual(sorted(os.listdir(self.root)), ["in-the-way", "static"])
+
+
+class TestWalkTree(unittest.TestCase):
+    def test_directories_come_before_their_contents(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "a", "b"))
+            for path in ("top.txt", os.path.join("a", "x.txt"), os.path.join("a", "b", "y.txt")):
+                with open(os.path.join(root, path), "w") as f:
+                    f.write(path)
+            entries = list(walk_tree(root))
+            paths = [entry.path for entry in entries]
+            self.assertEqual(sorted(paths), sorted(["top.txt", "a", os.path.join("a", "x.txt"), os.path.join("a", "b"), os.path.join("a", "b", "y.txt")]))
+            self.assertLess(paths.index("a"), paths.index(os.path.join("a", "b")))
+            self.assertLess(paths.index(os.path.join("a", "b")), paths.index(os.path.join("a", "b", "y.txt")))
+            for entry in entries:
+                self.assertEqual(entry.is_dir, entry.stat is None)
+                if not entry.is_dir:
+                    self.assertEqual(entry.stat.st_size, len(entry.path))
+
+    def test_symlinked_directories(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "a"))
+            os.makedirs(os.path.join(root, "shared"))
+            with open(os.path.join(root, "shared", "x.txt"), "w") as f:
+                f.write("x")
+            os.symlink(os.path.join(root, "shared"), os.path.join(root, "a", "shared"))
+            os.symlink(root, os.path.join(root, "a", "loop"))
+            os.symlink(os.path.join(root, "nonexistent"), os.path.join(root, "dangling"))
+            with self.assertLogs("copy_to_public", "WARNING") as logs:
+                paths = sorted(entry.path for entry in walk_tree(root))
+            self.assertEqual(len(logs.output), 2)
+            self.assertEqual(paths, ["a", os.path.join("a", "shared"), os.path.join("a", "shared", "x.txt"), "shared", os.path.join("shared", "x.txt")])
+
+    def test_directory_wrapper(self):
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "static")
+            os.makedirs(os.path.join(source, "images"))
+            with open(os.path.join(source, "images", "a.png"), "w") as f:
+                f.write("png")
+            directory = Directory(source)
+            directory.generate_file_structure()
+            self.assertEqual([child.path for child in directory.root.children], [os.path.join(source, "images")])
+            self.assertEqual([child.path for child in directory.root.children[0].children], [os.path.join(source, "images", "a.png")])
+            directory.copy_to_dest(os.path.join(root, "public"))
+            with open(os.path.join(root, "public", "images", "a.png")) as f:
+                self.assertEqual(f.read(), "png")
+
+
+if __name__ == "__main__":
+    unittest.main()
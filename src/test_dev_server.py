@@ -0,0 +1,138 @@
+import os
+import tempfile
+import unittest
+from build_manifest import BuildManifest
+from copy_to_public import sync_to_dest
+from dev_server import PollingWatcher, SiteRebuilder, make_watcher, watch_changes
+from generate_page import generate_pages_recursive
+
+
+class FakeWatcher:
+    def __init__(self, batches):
+        self.batches = list(batches)
+
+    def wait(self, timeout):
+        return self.batches.pop(0) if self.batches else set()
+
+
+class TestWatchChanges(unittest.TestCase):
+    def test_debounces_bursts(self):
+        batches = watch_changes(FakeWatcher([{"a"}, {"b"}, {"a", "c"}, set(), {"d"}]))
+        self.assertEqual(next(batches), {"a", "b", "c"})
+        self.assertEqual(next(batches), {"d"})
+
+
+class TestWatchers(unittest.TestCase):
+    def check_watcher(self, make):
+        with tempfile.TemporaryDirectory() as root:
+            existing = os.path.join(root, "a.md")
+            with open(existing, "w") as f:
+                f.write("a")
+            watcher = make([root])
+            sub = os.path.join(root, "sub")
+            os.makedirs(sub)
+            with open(os.path.join(sub, "b.md"), "w") as f:
+                f.write("b")
+            changed = watcher.wait(1.0) | watcher.wait(0.05)
+            # a file created together with its directory may be reported through the directory
+            self.assertTrue({sub, os.path.join(sub, "b.md")} & changed)
+            self.assertNotIn(existing, changed)
+
+            with open(existing, "a") as f:
+                f.write("more")
+            changed = watcher.wait(1.0) | watcher.wait(0.05)
+            self.assertIn(existing, changed)
+
+            os.remove(existing)
+            changed = watcher.wait(1.0) | watcher.wait(0.05)
+            self.assertIn(existing, changed)
+            watcher.close()
+
+    def test_polling_watcher(self):
+        self.check_watcher(lambda paths: PollingWatcher(paths, interval=0.01))
+
+    def test_default_watcher(self):
+        self.check_watcher(make_watcher)
+
+
+class TestSiteRebuilder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.public = os.path.join(root, "public")
+        self.template = os.path.join(root, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        os.makedirs(self.static)
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(self.template, "<main>{{ Content }}</main>")
+        self.manifest = BuildManifest(os.path.join(root, ".cache", "build_manifest.json"), root)
+        sync_to_dest(self.static, self.public, self.manifest)
+        generate_pages_recursive(self.content, self.template, self.public, self.manifest)
+        self.rebuilder = SiteRebuilder(self.content, self.static, self.public, self.template, self.manifest)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, *parts):
+        with open(os.path.join(self.public, *parts)) as f:
+            return f.read()
+
+    def test_changed_page_only(self):
+        home = os.path.join(self.public, "index.html")
+        os.utime(home, ns=(0, 0))
+        changed = os.path.join(self.content, "blog", "index.md")
+        self.write(changed, "# Blog, edited")
+        self.rebuilder.apply({changed})
+        self.assertEqual(self.read("blog", "index.html"), "<main><div><h1>Blog, edited</h1></div></main>")
+        self.assertEqual(os.stat(home).st_mtime_ns, 0)
+
+    def test_asset_added_and_removed(self):
+        asset = os.path.join(self.static, "images", "a.png")
+        os.makedirs(os.path.dirname(asset))
+        self.write(asset, "png")
+        self.rebuilder.apply({os.path.dirname(asset)})
+        self.assertEqual(self.read("images", "a.png"), "png")
+
+        os.remove(asset)
+        self.rebuilder.apply({asset})
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images", "a.png")))
+
+    def test_template_change_regenerates_pages(self):
+        self.write(self.template, "<article>{{ Content }}</article>")
+        self.rebuilder.apply({self.template})
+        self.assertEqual(self.read("index.html"), "<article><div><h1>Home</h1></div></article>")
+        self.assertEqual(self.read("blog", "index.html"), "<article><div><h1>Blog</h1></div></article>")
+
+    def test_failing_page_does_not_stop_template_rebuild(self):
+        self.write(os.path.join(self.content, "broken.md"), "no heading here")
+        self.write(self.template, "<article>{{ Content }}</article>")
+        with self.assertLogs("dev_server", "ERROR") as logs:
+            self.rebuilder.apply({self.template})
+        self.assertIn("broken.md", logs.output[0])
+        self.assertEqual(self.read("index.html"), "<article><div><h1>Home</h1></div></article>")
+        self.assertEqual(self.read("blog", "index.html"), "<article><div><h1>Blog</h1></div></article>")
+
+    def test_missing_asset_does_not_stop_batch(self):
+        # a dangling link stands in for an asset deleted after the batch was collected
+        images = os.path.join(self.static, "images")
+        os.makedirs(images)
+        os.symlink(os.path.join(images, "deleted.png"), os.path.join(images, "gone.png"))
+        self.write(os.path.join(images, "a.png"), "png")
+        page = os.path.join(self.content, "index.md")
+        self.write(page, "# Home, edited")
+        with self.assertLogs("dev_server", "ERROR") as logs:
+            self.rebuilder.apply({images, page})
+        self.assertIn("gone.png", logs.output[0])
+        self.assertEqual(self.read("images", "a.png"), "png")
+        self.assertEqual(self.read("index.html"), "<main><div><h1>Home, edited</h1></div></main>")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from blocktype import markdown_to_html_node, parse_markdown
+from document_metadata import DocumentMetadata, Heading, slugify
+from generate_page import document_title
+
+
+class TestDocumentMetadata(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual(slugify("Why Redis?"), "why-redis")
+        self.assertEqual(slugify("  Tolkien's Legendarium "), "tolkiens-legendarium")
+
+    def test_outline(self):
+        markdown = "## Intro\n\n# The **Title**\nsecond line\n\ntext\n\n## Intro\n\n```\n# not a heading\n```\n\n### [Link](/x)"
+        node, metadata = parse_markdown(markdown)
+        self.assertEqual(node.to_html(), markdown_to_html_node(markdown).to_html())
+        self.assertEqual(metadata.title, "The **Title**")
+        self.assertEqual(metadata.headings, [
+            Heading(2, "Intro", "intro"),
+            Heading(1, "The Title second line", "the-title-second-line"),
+            Heading(2, "Intro", "intro-1"),
+            Heading(3, "Link", "link"),
+        ])
+        self.assertEqual(DocumentMetadata.from_dict(metadata.to_dict()).headings, metadata.headings)
+
+    def test_document_title(self):
+        markdown = "# Home\n\nWelcome"
+        self.assertEqual(document_title(parse_markdown(markdown).metadata, markdown), "Home")
+        # not a heading block, but still a title line for extract_title
+        markdown = "#Home\n\nWelcome"
+        self.assertEqual(document_title(parse_markdown(markdown).metadata, markdown), "Home")
+        with self.assertRaises(Exception):
+            document_title(parse_markdown("no title").metadata, "no title")
+
+
+if __name__ == "__main__":
+    unittest.main()
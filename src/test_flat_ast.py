@@ -0,0 +1,74 @@
+import pickle
+import unittest
+from blocktype import markdown_to_html_node
+from flat_ast import KIND_ELEMENT, KIND_LEAF, KIND_PARENT, NO_NODE, FlatTree, markdown_to_flat_tree
+from htmlnode import HTMLNode
+from leafnode import LeafNode
+from parentnode import ParentNode
+
+DOCUMENT = """
+# Title with **bold**
+
+A paragraph with _italic_, `code`,
+a [link](https://example.com) and ![an image](/images/a.png).
+
+> quoted
+> text
+
+- one
+- two **bold**
+- 
+
+1. first
+2. second
+
+```
+code **kept** as is
+```
+"""
+
+
+class TestFlatTree(unittest.TestCase):
+    def test_matches_node_tree(self):
+        for markdown in (DOCUMENT, "", "# Only a heading", "para\\nwith\\nlines", "- \n- "):
+            node = markdown_to_html_node(markdown)
+            flat = markdown_to_flat_tree(markdown)
+            self.assertEqual(flat.to_html(), node.to_html())
+            self.assertEqual(FlatTree.from_html_node(node).to_html(), node.to_html())
+            self.assertEqual(repr(flat.to_html_node()), repr(node))
+
+    def test_adapter_keeps_node_classes(self):
+        node = ParentNode("p", [LeafNode("a\nb"), HTMLNode("span", "c\nd", [LeafNode("e", "b", {"class": "x"})])], {"id": "p1"})
+        flat = FlatTree.from_html_node(node)
+        self.assertEqual(flat.to_html(), node.to_html())
+        rebuilt = flat.to_html_node()
+        self.assertIsInstance(rebuilt, ParentNode)
+        self.assertIsInstance(rebuilt.children[0], LeafNode)
+        self.assertIs(type(rebuilt.children[1]), HTMLNode)
+        self.assertEqual(rebuilt.children[1].children[0].props, {"class": "x"})
+        self.assertEqual(rebuilt.to_html(), node.to_html())
+
+    def test_untagged_html_node_skips_children(self):
+        node = ParentNode("div", [HTMLNode(None, "text", [LeafNode("hidden", "b")]), LeafNode("after")])
+        self.assertEqual(FlatTree.from_html_node(node).to_html(), node.to_html())
+
+    def test_navigation(self):
+        flat = markdown_to_flat_tree("# A\n\nb **c**")
+        self.assertEqual([flat.kinds[i] for i in range(len(flat))], [KIND_ELEMENT, KIND_PARENT, KIND_LEAF, KIND_PARENT, KIND_LEAF, KIND_LEAF])
+        self.assertEqual(flat.children(0), [1, 3])
+        self.assertEqual(flat.children(3), [4, 5])
+        self.assertEqual(flat.parents[5], 3)
+        self.assertEqual(flat.parents[0], NO_NODE)
+        self.assertEqual(flat.subtree_ends[1], 3)
+        self.assertEqual(flat.value(5), "c")
+        self.assertEqual(flat.tag_names[flat.tags[5]], "b")
+
+    def test_pickle(self):
+        flat = markdown_to_flat_tree(DOCUMENT)
+        restored = pickle.loads(pickle.dumps(flat))
+        self.assertEqual(restored.to_html(), flat.to_html())
+        self.assertEqual(restored.props(restored.children(restored.children(0)[1])[5]), {"href": "https://example.com"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import io
+import unittest
+from front_matter import FrontMatter, read_front_matter, split_front_matter
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_yaml_style(self):
+        text = "---\ntitle: \"Why: Tom\"\ndate: 2024-05-01\ntags: [tolkien, 'opinion']\ndraft: false\n# a comment\nweight: 3\n---\n# Heading\n\nBody"
+        front_matter, body = split_front_matter(text)
+        self.assertEqual(body, "# Heading\n\nBody")
+        self.assertEqual(front_matter.title, "Why: Tom")
+        self.assertEqual(front_matter.date, "2024-05-01")
+        self.assertEqual(front_matter.tags, ["tolkien", "opinion"])
+        self.assertFalse(front_matter.draft)
+        self.assertIsNone(front_matter.template)
+        self.assertEqual(front_matter.fields["weight"], 3)
+        self.assertEqual(front_matter.context()["Tags"], "tolkien, opinion")
+
+    def test_toml_style_and_block_lists(self):
+        front_matter, body = split_front_matter("+++\ntitle = Post\ndraft = true\ntemplate = \"post.html\"\n+++\nBody")
+        self.assertEqual((front_matter.title, front_matter.draft, front_matter.template), ("Post", True, "post.html"))
+        self.assertEqual(body, "Body")
+        front_matter, _ = split_front_matter("---\ntags:\n  - a\n  - b\ntitle: T\n---\n")
+        self.assertEqual(front_matter.tags, ["a", "b"])
+        self.assertEqual(front_matter.context(), {"tags": "a, b", "title": "T", "Date": "", "Tags": "a, b"})
+
+    def test_no_front_matter(self):
+        for text in ("# Title\n\n---\n\nBody", "---\n\nno closing fence", ""):
+            front_matter, body = split_front_matter(text)
+            self.assertEqual(body, text)
+            self.assertEqual(front_matter.fields, {})
+            self.assertEqual(front_matter.tags, [])
+
+    def test_stops_at_closing_fence(self):
+        f = io.StringIO("---\ntitle: T\n---\nfirst line\nsecond line\n")
+        self.assertEqual(read_front_matter(f).title, "T")
+        self.assertEqual(f.readline(), "first line\n")
+
+    def test_thematic_breaks_are_not_front_matter(self):
+        text = "---\nSome prose: not a field.\n\n---\n# Title"
+        with self.assertLogs("front_matter", "WARNING"):
+            front_matter, body = split_front_matter(text)
+        self.assertEqual(body, text)
+        self.assertEqual(front_matter.fields, {})
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\ndate: May 1st\n---\n")
+        with self.assertRaises(ValueError):
+            FrontMatter({"date": "May 1st"})
+        with self.assertRaises(ValueError):
+            FrontMatter({"draft": "yes"})
+
+
+if __name__ == "__main__":
+    unittest.main()
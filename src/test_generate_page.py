@@ -0,0 +1,178 @@
+import io
+import os
+import tempfile
+import unittest
+from generate_page import collect_pages, generate_pages_parallel, generate_pages_recursive, render_page, write_page
+from profiler import PAGE_PHASES, Profiler
+from template import Template
+from leafnode import LeafNode
+from parentnode import ParentNode
+
+
+class TestWritePage(unittest.TestCase):
+    def test_streams_template_around_body(self):
+        template = "<title>{{ Title }}</title><main>{{ Content }}</main><footer>{{ Title }}</footer>"
+        node = ParentNode(tag="div", children=[LeafNode("Hi {{ Title }}", "p")])
+        out = io.StringIO()
+        write_page(out, Template(template), "Home", node)
+        self.assertEqual(out.getvalue(), "<title>Home</title><main><div><p>Hi {{ Title }}</p></div></main><footer>Home</footer>")
+
+    def test_matches_string_replace(self):
+        template = "{{ Content }}<hr>{{ Content }}"
+        node = ParentNode(tag="p", children=[LeafNode("a\nb")])
+        out = io.StringIO()
+        write_page(out, Template(template), "T", node)
+        self.assertEqual(out.getvalue(), template.replace("{{ Content }}", node.to_html()))
+
+
+class TestStreamingRender(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def render(self, markdown, stream_threshold, asset_urls=None, minify=False, image_sizes=None):
+        source = os.path.join(self.tmp.name, "page.md")
+        dest = os.path.join(self.tmp.name, "page.html")
+        with open(source, "w") as f:
+            f.write(markdown)
+        title = render_page(source, Template("<title>{{ Title }}</title>{{ Content }}"), dest, stream_threshold=stream_threshold, asset_urls=asset_urls, minify=minify, image_sizes=image_sizes)
+        with open(dest) as f:
+            return title, f.read()
+
+    def test_matches_in_memory_render(self):
+        root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "content")
+        documents = [
+            "```\n# not the title\n```\n\n# The **Title**\nmore\n\n- a\n- b\n\n> quote",
+            "---\ntitle: Front\n---\nplain\n\n\n\ntext\n",
+            "#Fallback title\n\n## Sub",
+            "\r\n# Windows\r\n\r\nline endings\r\n",
+        ]
+        for dir_path, _, file_names in os.walk(root):
+            for file_name in file_names:
+                with open(os.path.join(dir_path, file_name)) as f:
+                    documents.append(f.read())
+        for markdown in documents:
+            self.assertEqual(self.render(markdown, 0), self.render(markdown, len(markdown) + 1))
+
+    def test_missing_title(self):
+        with self.assertRaises(Exception):
+            self.render("no heading here", 0)
+
+    def test_asset_urls_are_rewritten(self):
+        markdown = "# Tom\n\n![Tom](/images/tom.png)\n\n> [big](/images/tom.png?size=2)"
+        urls = {"/images/tom.png": "/images/tom.1a2b3c4d.png"}
+        for stream_threshold in (0, len(markdown) + 1):
+            _, html = self.render(markdown, stream_threshold, urls)
+            self.assertNotIn("/images/tom.png", html)
+            self.assertIn('src="/images/tom.1a2b3c4d.png"', html)
+            self.assertIn('href="/images/tom.1a2b3c4d.png?size=2"', html)
+
+    def test_image_sizes_use_original_urls(self):
+        markdown = "# Tom\n\n![Tom](/images/tom.png)"
+        urls = {"/images/tom.png": "/images/tom.1a2b3c4d.png"}
+        for stream_threshold in (0, len(markdown) + 1):
+            _, html = self.render(markdown, stream_threshold, urls, image_sizes={"/images/tom.png": (928, 468)})
+            self.assertIn('<img src="/images/tom.1a2b3c4d.png" alt="Tom" width="928" height="468" loading="lazy" decoding="async">', html)
+
+    def test_minify(self):
+        markdown = "# Tom\n\nSome  _text_\n\n```\nx  =  1\n```"
+        for stream_threshold in (0, len(markdown) + 1):
+            _, html = self.render(markdown, stream_threshold, minify=True)
+            self.assertEqual(html, "<title>Tom</title><div><h1>Tom</h1><p>Some <i>text</i></p><pre><code>x  =  1\n</code></pre></div>")
+
+
+class TestParallelGeneration(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.public = os.path.join(root, "public")
+        self.template = os.path.join(root, "template.html")
+        os.makedirs(os.path.join(self.content, "blog", "post"))
+        with open(os.path.join(self.content, "index.md"), "w") as f:
+            f.write("# Home\n\nWelcome")
+        with open(os.path.join(self.content, "blog", "post", "index.md"), "w") as f:
+            f.write("# Post\n\n- a\n- b")
+        with open(os.path.join(self.content, "blog", "broken.md"), "w") as f:
+            f.write("no heading here")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_collect_pages(self):
+        self.assertEqual(
+            collect_pages(self.content, self.public),
+            [
+                (os.path.join(self.content, "blog", "broken.md"), os.path.join(self.public, "blog", "broken.html")),
+                (os.path.join(self.content, "blog", "post", "index.md"), os.path.join(self.public, "blog", "post", "index.html")),
+                (os.path.join(self.content, "index.md"), os.path.join(self.public, "index.html")),
+            ]
+        )
+
+    def test_errors_are_reported_per_page(self):
+        with open(os.path.join(self.content, "blog", "dated.md"), "w") as f:
+            f.write("---\ndate: notadate\n---\n# Dated")
+        with open(os.path.join(self.content, "latin1.md"), "wb") as f:
+            f.write("# Caf\xe9".encode("latin-1"))
+        failed = sorted(os.path.join(self.content, *parts) for parts in (("blog", "broken.md"), ("blog", "dated.md"), ("latin1.md",)))
+        for jobs in (1, 2):
+            with self.assertLogs(level="ERROR"):
+                if jobs == 1:
+                    errors = generate_pages_recursive(self.content, self.template, self.public)
+                else:
+                    errors = generate_pages_parallel(self.content, self.template, self.public, jobs=jobs)
+            self.assertEqual(sorted(errors), failed)
+            with open(os.path.join(self.public, "index.html")) as f:
+                self.assertEqual(f.read(), "<title>Home</title><div><h1>Home</h1><p>Welcome</p></div>")
+            with open(os.path.join(self.public, "blog", "post", "index.html")) as f:
+                self.assertEqual(f.read(), "<title>Post</title><div><h1>Post</h1><ul><li>a</li><li>b</li></ul></div>")
+
+    def test_profiled_build_matches_and_records_phases(self):
+        os.remove(os.path.join(self.content, "blog", "broken.md"))
+        generate_pages_recursive(self.content, self.template, self.public)
+        expected = {}
+        for dir_path, _, file_names in os.walk(self.public):
+            for file_name in file_names:
+                with open(os.path.join(dir_path, file_name)) as f:
+                    expected[os.path.join(dir_path, file_name)] = f.read()
+
+        for jobs in (1, 2):
+            profiler = Profiler()
+            if jobs == 1:
+                generate_pages_recursive(self.content, self.template, self.public, profiler=profiler)
+            else:
+                generate_pages_parallel(self.content, self.template, self.public, jobs=jobs, profiler=profiler)
+            for path, html in expected.items():
+                with open(path) as f:
+                    self.assertEqual(f.read(), html)
+            self.assertEqual(sorted(profiler.pages), [os.path.join(self.content, "blog", "post", "index.md"), os.path.join(self.content, "index.md")])
+            for phases in profiler.pages.values():
+                # the title comes from the parse, so there is no separate title extraction
+                self.assertEqual(set(phases), set(PAGE_PHASES) - {"title extraction"})
+            self.assertIn("file discovery", profiler.phases)
+
+    def test_front_matter(self):
+        os.remove(os.path.join(self.content, "blog", "broken.md"))
+        with open(os.path.join(self.content, "blog", "post", "index.md"), "w") as f:
+            f.write("---\ntitle: Front\ndate: 2024-05-01\ntags: [a, b]\ntemplate: post.html\n---\nNo heading")
+        with open(os.path.join(self.content, "draft.md"), "w") as f:
+            f.write("---\ndraft: true\n---\n# Draft")
+        with open(os.path.join(self.tmp.name, "post.html"), "w") as f:
+            f.write("<title>{{ Title }}</title><time>{{ Date }}</time>{{ Tags }}|{{ Content }}")
+
+        for jobs in (1, 2):
+            if jobs == 1:
+                generate_pages_recursive(self.content, self.template, self.public)
+            else:
+                self.assertEqual(generate_pages_parallel(self.content, self.template, self.public, jobs=jobs), {})
+            with open(os.path.join(self.public, "blog", "post", "index.html")) as f:
+                self.assertEqual(f.read(), "<title>Front</title><time>2024-05-01</time>a, b|<div><p>No heading</p></div>")
+            self.assertFalse(os.path.exists(os.path.join(self.public, "draft.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
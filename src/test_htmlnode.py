@@ -1,5 +1,8 @@
+import pickle
 import unittest
-from htmlnode import HTMLNode
+from htmlnode import EMPTY_CHILDREN, EMPTY_PROPS, HTMLNode
+from leafnode import LeafNode
+from parentnode import ParentNode
 
 class TestHTMLNode(unittest.TestCase):
     def test_repr1(self):
@@ -17,6 +20,19 @@ class TestHTMLNode(unittest.TestCase):
         child = HTMLNode(tag="p")
         node = HTMLNode(tag="a", value="This is a link tag", children=[child], props={"href": "https://www.google.com"})
         self.assertEqual(repr(node), "HTMLNode(tag=a, value=This is a link tag, children=['HTMLNode(tag=p, value=None, children=[], props={})'], props={'href': 'https://www.google.com'})")
+    def test_compact_nodes(self):
+        for node in (HTMLNode(tag="p"), LeafNode("text"), ParentNode("div", [LeafNode("a")])):
+            self.assertFalse(hasattr(node, "__dict__"))
+            self.assertIs(node.props, EMPTY_PROPS)
+        self.assertIs(LeafNode("a").children, EMPTY_CHILDREN)
+        with self.assertRaises(TypeError):
+            LeafNode("a").props["href"] = "x"
+
+    def test_pickle(self):
+        node = ParentNode("p", [LeafNode("a"), LeafNode("b", "a", {"href": "/"})])
+        restored = pickle.loads(pickle.dumps(node))
+        self.assertEqual(restored.to_html(), node.to_html())
+        self.assertIs(restored.children[0].props, EMPTY_PROPS)
 
 if __name__ == "__main__":
     unittest.main()
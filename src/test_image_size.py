@@ -0,0 +1,127 @@
+import os
+import struct
+import tempfile
+import unittest
+from blocktype import markdown_to_html_node
+from image_size import ImageSizeCache, add_image_dimensions, read_image_size
+
+
+def png(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height) + b"\x08\x06\0\0\0" + b"\0" * 64
+
+
+def gif(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\0" * 64
+
+
+def jpeg(width, height, orientation=None):
+    data = b"\xff\xd8"
+    data += b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\0" + b"\0" * 9
+    if orientation is not None:
+        tiff = b"MM\0\x2a" + struct.pack(">I", 8) + struct.pack(">H", 1) + struct.pack(">HHIHH", 0x0112, 3, 1, orientation, 0) + b"\0\0\0\0"
+        exif = b"Exif\0\0" + tiff
+        data += b"\xff\xe1" + struct.pack(">H", len(exif) + 2) + exif
+    data += b"\xff\xdb" + struct.pack(">H", 67) + b"\0" * 65
+    data += b"\xff\xc2" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\0"
+    return data + b"\xff\xda" + b"\0" * 32 + b"\xff\xd9"
+
+
+def webp(chunk, payload):
+    return b"RIFF" + struct.pack("<I", 4 + 8 + len(payload)) + b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload
+
+
+class TestReadImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def size(self, data):
+        path = os.path.join(self.tmp.name, "image")
+        with open(path, "wb") as f:
+            f.write(data)
+        return read_image_size(path)
+
+    def test_formats(self):
+        self.assertEqual(self.size(png(928, 468)), (928, 468))
+        self.assertEqual(self.size(gif(16, 9)), (16, 9))
+        self.assertEqual(self.size(jpeg(1024, 768)), (1024, 768))
+        self.assertEqual(self.size(webp(b"VP8 ", b"\x30\x01\0\x9d\x01\x2a" + struct.pack("<HH", 640, 480) + b"\0" * 16)), (640, 480))
+        bits = (300 - 1) | ((200 - 1) << 14)
+        self.assertEqual(self.size(webp(b"VP8L", b"\x2f" + struct.pack("<I", bits) + b"\0" * 16)), (300, 200))
+        self.assertEqual(self.size(webp(b"VP8X", b"\x10\0\0\0" + (4000 - 1).to_bytes(3, "little") + (3000 - 1).to_bytes(3, "little") + b"\0" * 16)), (4000, 3000))
+
+    def test_jpeg_orientation(self):
+        self.assertEqual(self.size(jpeg(1024, 768, orientation=1)), (1024, 768))
+        self.assertEqual(self.size(jpeg(1024, 768, orientation=6)), (768, 1024))
+
+    def test_unknown_or_truncated(self):
+        self.assertIsNone(self.size(b"<svg></svg>"))
+        self.assertIsNone(self.size(png(1, 1)[:20]))
+        self.assertIsNone(self.size(jpeg(10, 10)[:30]))
+        self.assertIsNone(self.size(b""))
+
+
+class TestImageSizeCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.cache_path = os.path.join(self.tmp.name, ".cache", "image_sizes.json")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write(os.path.join("images", "tom.png"), png(928, 468))
+        self.write("logo.gif", gif(16, 9))
+        self.write("broken.jpg", b"not a jpeg")
+        self.write("index.css", b"body {}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, relative_path, data):
+        with open(os.path.join(self.static, relative_path), "wb") as f:
+            f.write(data)
+
+    def update(self):
+        images = ImageSizeCache(self.cache_path, self.static)
+        read = images.update(workers=2)
+        images.save()
+        return images, read
+
+    def test_only_new_or_changed_images_are_read(self):
+        images, read = self.update()
+        self.assertEqual(read, 3)
+        self.assertEqual(images.sizes, {"/images/tom.png": (928, 468), "/logo.gif": (16, 9)})
+        digest = images.digest()
+
+        images, read = self.update()
+        self.assertEqual(read, 0)
+        self.assertEqual(images.digest(), digest)
+
+        self.write("logo.gif", gif(32, 18))
+        os.remove(os.path.join(self.static, "images", "tom.png"))
+        images, read = self.update()
+        self.assertEqual(read, 1)
+        self.assertEqual(images.sizes, {"/logo.gif": (32, 18)})
+        self.assertNotEqual(images.digest(), digest)
+
+
+class TestAddImageDimensions(unittest.TestCase):
+    def test_local_images_of_known_size(self):
+        node = markdown_to_html_node("![Tom](/images/tom.png?v=2) ![Web](https://example.com/tom.png) ![Gone](/images/gone.png)")
+        add_image_dimensions(node, {"/images/tom.png": (928, 468)})
+        self.assertEqual(
+            node.to_html(),
+            '<div><p><img src="/images/tom.png?v=2" alt="Tom" width="928" height="468" loading="lazy" decoding="async"></img>'
+            ' <img src="https://example.com/tom.png" alt="Web"></img> <img src="/images/gone.png" alt="Gone"></img></p></div>',
+        )
+
+    def test_existing_attributes_are_kept(self):
+        node = markdown_to_html_node("![Tom](/images/tom.png)")
+        image = node.children[0].children[0]
+        image.props = {**image.props, "width": "100", "loading": "eager"}
+        add_image_dimensions(node, {"/images/tom.png": (928, 468)})
+        self.assertEqual(image.props, {"src": "/images/tom.png", "alt": "Tom", "width": "100", "loading": "eager", "decoding": "async"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from inline_tokenizer import tokenize_inline
+from textnode import TextNode, TextType
+
+
+class TestTokenizeInline(unittest.TestCase):
+    def test_plain_text(self):
+        self.assertEqual(tokenize_inline("just text"), [TextNode("just text", TextType.TEXT)])
+        self.assertEqual(tokenize_inline(""), [])
+
+    def test_all_inline_types(self):
+        text = "**b** _i_ `c` [l](u) ![a](p)"
+        self.assertEqual(tokenize_inline(text), [
+            TextNode("b", TextType.BOLD), TextNode(" ", TextType.TEXT),
+            TextNode("i", TextType.ITALIC), TextNode(" ", TextType.TEXT),
+            TextNode("c", TextType.CODE), TextNode(" ", TextType.TEXT),
+            TextNode("l", TextType.LINK, "u"), TextNode(" ", TextType.TEXT),
+            TextNode("a", TextType.IMAGE, "p"),
+        ])
+
+    def test_code_contents_are_literal(self):
+        self.assertEqual(tokenize_inline("`a **b** [c](d)`"), [TextNode("a **b** [c](d)", TextType.CODE)])
+
+    def test_unclosed_delimiters_stay_text(self):
+        self.assertEqual(tokenize_inline("snake_case and 2 ** 3 and ![not an image"), [TextNode("snake_case and 2 ** 3 and ![not an image", TextType.TEXT)])
+
+    def test_bang_before_link(self):
+        self.assertEqual(tokenize_inline("wow![x](y"), [TextNode("wow![x](y", TextType.TEXT)])
+        self.assertEqual(tokenize_inline("![x] [y](z)"), [TextNode("![x] ", TextType.TEXT), TextNode("y", TextType.LINK, "z")])
+
+    def test_emphasis_does_not_close_inside_urls(self):
+        self.assertEqual(tokenize_inline("snake_case [docs](http://x/a_b)"), [TextNode("snake_case ", TextType.TEXT), TextNode("docs", TextType.LINK, "http://x/a_b")])
+        self.assertEqual(tokenize_inline("a_b ![img](/a_b.png) _c_"), [
+            TextNode("a_b ", TextType.TEXT), TextNode("img", TextType.IMAGE, "/a_b.png"),
+            TextNode(" ", TextType.TEXT), TextNode("c", TextType.ITALIC),
+        ])
+        self.assertEqual(tokenize_inline("2 ** 3 [x](/a**b) **y**"), [
+            TextNode("2 ** 3 ", TextType.TEXT), TextNode("x", TextType.LINK, "/a**b"),
+            TextNode(" ", TextType.TEXT), TextNode("y", TextType.BOLD),
+        ])
+        self.assertEqual(tokenize_inline("_a_ [b](/c_d)"), [TextNode("a", TextType.ITALIC), TextNode(" ", TextType.TEXT), TextNode("b", TextType.LINK, "/c_d")])
+
+    def test_empty_elements_are_dropped(self):
+        self.assertEqual(tokenize_inline("a****b"), [TextNode("a", TextType.TEXT), TextNode("b", TextType.TEXT)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+from listings import ListingManifest, collect_posts, generate_listings, listing_node, plan_listings
+from site_index import SiteIndex
+from template import TemplateLoader
+
+
+class TestListings(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.public = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        self.write("index.md", "# Home")
+        for i in range(5):
+            self.write_post(i, f"2024-01-0{i + 1}", ["even" if i % 2 == 0 else "odd"])
+        self.write_post(9, None, [])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, relative, text):
+        path = os.path.join(self.content, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def write_post(self, i, date, tags):
+        front_matter = f"date: {date}\n" if date else ""
+        self.write(os.path.join("blog", f"post{i}", "index.md"), f"---\n{front_matter}tags: [{', '.join(tags)}]\n---\n# Post **{i}**\n")
+
+    def index(self):
+        index = SiteIndex(None, self.content)
+        index.update()
+        return index
+
+    def read(self, *parts):
+        with open(os.path.join(self.public, *parts, "index.html")) as f:
+            return f.read()
+
+    def test_plan(self):
+        posts = collect_posts(self.index().pages())
+        self.assertEqual([post.url for post in posts], ["/blog/post4/", "/blog/post3/", "/blog/post2/", "/blog/post1/", "/blog/post0/", "/blog/post9/"])
+        listings = plan_listings(posts, per_page=2)
+        self.assertEqual(
+            [(listing.url, [post.url[6:] for post in listing.posts], listing.newer_url, listing.older_url) for listing in listings],
+            [
+                ("/blog/", ["post4/", "post3/"], None, "/blog/page/2/"),
+                ("/blog/page/2/", ["post2/", "post1/"], "/blog/", "/blog/page/1/"),
+                ("/blog/page/1/", ["post0/", "post9/"], "/blog/page/2/", None),
+                ("/tags/even/", ["post4/", "post2/", "post0/"], None, None),
+                ("/tags/odd/", ["post3/", "post1/"], None, None),
+            ]
+        )
+        self.assertEqual(
+            listing_node(listings[1]).to_html(),
+            '<div><h1>Blog</h1><ul>'
+            '<li><a href="/blog/post2/">Post <b>2</b></a><time datetime="2024-01-03">2024-01-03</time></li>'
+            '<li><a href="/blog/post1/">Post <b>1</b></a><time datetime="2024-01-02">2024-01-02</time></li>'
+            '</ul><nav><a href="/blog/" rel="prev">Newer posts</a><a href="/blog/page/1/" rel="next">Older posts</a></nav></div>'
+        )
+        self.assertEqual(plan_listings(posts[:1], per_page=2)[0].posts, posts[:1])
+        self.assertEqual(plan_listings([], per_page=2), [])
+
+    def written(self, manifest, loader):
+        written = generate_listings(self.index(), self.public, loader, manifest, per_page=2)
+        return sorted(os.path.relpath(path, self.public) for path in written)
+
+    def test_only_affected_pages_are_written(self):
+        manifest = ListingManifest(os.path.join(self.tmp.name, ".cache", "listings.json"))
+        loader = TemplateLoader(self.template, self.content)
+        self.assertEqual(len(self.written(manifest, loader)), 5)
+        self.assertTrue(self.read("blog").startswith("<title>Blog</title><div><h1>Blog</h1>"))
+        self.assertIn("Posts tagged odd", self.read("tags", "odd"))
+        manifest.save()
+
+        manifest = ListingManifest(manifest.path)
+        self.assertEqual(self.written(manifest, loader), [])
+        # a new post only changes the front pages of its archives...
+        self.write_post(5, "2024-02-01", ["odd"])
+        self.assertEqual(self.written(manifest, loader), [os.path.join("blog", "index.html"), os.path.join("tags", "odd", "index.html")])
+        # ...until they are full and a numbered page is added
+        self.write_post(6, "2024-03-01", [])
+        self.assertEqual(self.written(manifest, loader), [
+            os.path.join("blog", "index.html"),
+            os.path.join("blog", "page", "2", "index.html"),
+            os.path.join("blog", "page", "3", "index.html"),
+        ])
+
+        os.remove(os.path.join(self.content, "blog", "post6", "index.md"))
+        self.written(manifest, loader)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "page", "3", "index.html")))
+
+    def test_content_page_wins(self):
+        self.write(os.path.join("blog", "index.md"), "# My blog")
+        generate_listings(self.index(), self.public, TemplateLoader(self.template, self.content), ListingManifest(None))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "tags", "even", "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
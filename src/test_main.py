@@ -0,0 +1,73 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from build_log import configure_logging
+from main import main
+
+
+class TestMain(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "static"))
+        with open(os.path.join(self.root, "template.html"), "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        self.write("index.md", "# Home")
+        self.write(os.path.join("blog", "post", "index.md"), "---\ndate: 2024-01-01\n---\n# Post")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        # main points logging and the event stream at this run's streams
+        configure_logging()
+
+    def write(self, relative, text):
+        path = os.path.join(self.root, "content", relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def build(self, *args):
+        main(["build", "--root", self.root, *args])
+
+    def read(self, *parts):
+        with open(os.path.join(self.root, "public", *parts)) as f:
+            return f.read()
+
+    def test_content_page_and_listing_at_the_same_url(self):
+        self.build()
+        self.assertIn("<h1>Blog</h1>", self.read("blog", "index.html"))
+        page = self.write(os.path.join("blog", "index.md"), "# My blog")
+        self.build()
+        self.assertEqual(self.read("blog", "index.html"), "<title>My blog</title><div><h1>My blog</h1></div>")
+        os.remove(page)
+        self.build()
+        self.assertIn("<h1>Blog</h1>", self.read("blog", "index.html"))
+
+    def test_failed_pages_fail_the_build(self):
+        self.write("bad.md", "---\ndate: notadate\n---\n# Bad")
+        for jobs in ("1", "2"):
+            with self.assertRaises(SystemExit) as exit:
+                self.build("--jobs", jobs)
+            self.assertEqual(exit.exception.code, 1)
+            self.assertIn("<h1>Home</h1>", self.read("index.html"))
+            self.assertTrue(os.path.exists(os.path.join(self.root, ".cache", "build_manifest.json")))
+            self.assertTrue(os.path.exists(os.path.join(self.root, ".cache", "site_index.json")))
+            os.remove(os.path.join(self.root, "public", "index.html"))
+
+    def test_profile_summary_stays_out_of_the_event_stream(self):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            self.build("--profile", "--events", "-")
+        lines = stdout.getvalue().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            json.loads(line)
+        self.assertIn("index.md", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
-from blocktype import BlockType, block_to_block_type
+from blocktype import Block, BlockType, block_to_block_type, scan_blocks
+from utility import markdown_to_blocks
 
 class TestBlockToBlockType(unittest.TestCase):
     def test_heading(self):
@@ -27,6 +28,26 @@ class TestBlockToBlockType(unittest.TestCase):
         self.assertEqual(block_to_block_type("This is a normal paragraph."), BlockType.PARAGRAPH)
 
 
+class TestScanBlocks(unittest.TestCase):
+    def test_payloads(self):
+        markdown = "\n## Heading two\n\n```\ncode\n```\n\n> one\n>two\n\n- a\n- b\n\n1. x\n2. y\n\n  plain\n text  \n"
+        self.assertEqual(list(scan_blocks(markdown.split("\n"))), [
+            Block(BlockType.HEADING, "Heading two", level=2),
+            Block(BlockType.CODE, "code\n"),
+            Block(BlockType.QUOTE, "one\ntwo"),
+            Block(BlockType.UNORDERED_LIST, "", ("a", "b")),
+            Block(BlockType.ORDERED_LIST, "", ("x", "y")),
+            Block(BlockType.PARAGRAPH, "plain\n text"),
+        ])
+
+    def test_same_blocks_as_markdown_to_blocks(self):
+        markdown = "a\n \nb\n\n\n\n \n\n  c  \n\t\n"
+        blocks = markdown_to_blocks(markdown)
+        scanned = list(scan_blocks(markdown.split("\n")))
+        self.assertEqual([block.content for block in scanned], blocks)
+        self.assertEqual([block.block_type for block in scanned], [block_to_block_type(block) for block in blocks])
+
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,70 @@
+import io
+import unittest
+import minify
+from minify import HTMLMinifier, minify_html
+
+PAGE = """<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <!-- the stylesheet -->
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article><div><h1>Title</h1><p>Some   <b>bold</b> <i>text</i>
+and <a href="/a b" class="link">a link</a></p><pre><code>def f():
+    return  1  <!-- kept -->
+</code></pre><p>Inline <code>x  =  1</code> code
+  <img src="/tom.png" alt="a > b" title='x >  y'>  and more</p></div></article>
+  </body>
+</html>
+"""
+
+EXPECTED = (
+    '<!doctype html><html><head><meta charset=utf-8><link href=/index.css rel=stylesheet></head>'
+    '<body><article><div><h1>Title</h1><p>Some <b>bold</b> <i>text</i> and <a href="/a b" class=link>a link</a></p>'
+    '<pre><code>def f():\n    return  1  <!-- kept -->\n</code></pre><p>Inline <code>x  =  1</code> code '
+    "<img src=/tom.png alt=\"a > b\" title='x >  y'> and more</p></div></article></body></html>"
+)
+
+
+class TestMinify(unittest.TestCase):
+    def test_minify_page(self):
+        self.assertEqual(minify_html(PAGE), EXPECTED)
+
+    def test_chunk_boundaries_do_not_matter(self):
+        chunk_chars = minify.CHUNK_CHARS
+        minify.CHUNK_CHARS = 1
+        try:
+            out = io.StringIO()
+            minifier = HTMLMinifier(out)
+            for char in PAGE:
+                minifier.write(char)
+            minifier.close()
+        finally:
+            minify.CHUNK_CHARS = chunk_chars
+        self.assertEqual(out.getvalue(), EXPECTED)
+
+    def test_attribute_quotes(self):
+        self.assertEqual(minify_html('<a href="/">x</a>'), '<a href="/">x</a>')
+        self.assertEqual(minify_html("<img src='a.png' alt=''>"), "<img src=a.png alt=''>")
+        self.assertEqual(minify_html('<path d="M0" />'), "<path d=M0 />")
+        self.assertEqual(minify_html('<input disabled type="text"/>'), "<input disabled type=text>")
+
+    def test_angle_brackets_in_quoted_attributes(self):
+        self.assertEqual(minify_html('<p>a <img alt="a > b" title=\'x > y\'>  b</p>'), '<p>a <img alt="a > b" title=\'x > y\'> b</p>')
+        self.assertEqual(minify_html('<pre title="<pre>">  x  </pre>  <p> y </p>'), '<pre title="<pre>">  x  </pre><p>y</p>')
+
+    def test_whitespace_between_inline_elements_is_kept(self):
+        self.assertEqual(minify_html("<p><b>a</b>\n  <i>b</i></p>"), "<p><b>a</b> <i>b</i></p>")
+        self.assertEqual(minify_html("<ul>\n  <li> a </li>\n</ul>"), "<ul><li>a</li></ul>")
+
+    def test_non_breaking_spaces_and_stray_brackets(self):
+        self.assertEqual(minify_html("<p>a\xa0\xa0b < c</p>"), "<p>a\xa0\xa0b < c</p>")
+
+    def test_conditional_comments_are_kept(self):
+        self.assertEqual(minify_html("<p>a<!--[if IE]>b<![endif]--><!-- c --></p>"), "<p>a<!--[if IE]>b<![endif]--></p>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import io
+import sys
 import unittest
 from parentnode import ParentNode
 from leafnode import LeafNode
@@ -20,5 +22,30 @@ class TestParentNode(unittest.TestCase):
         child_node = ParentNode(tag="span", children=[grandchild_node])
         parent_node = ParentNode(tag="div", children=[child_node])
         self.assertEqual(parent_node.to_html(), "<div><span><b>grandchild</b></span></div>")
+
+    def test_paragraph_newlines_become_spaces(self):
+        node = ParentNode(tag="div", children=[
+            ParentNode(tag="p", children=[LeafNode("line one\nline two"), ParentNode(tag="b", children=[LeafNode("bold\ntext")])]),
+            ParentNode(tag="pre", children=[LeafNode("keep\nthis", "code")]),
+        ])
+        self.assertEqual(node.to_html(), "<div><p>line one line two<b>bold text</b></p><pre><code>keep\nthis</code></pre></div>")
+
+    def test_write_html_to_stream(self):
+        node = ParentNode(tag="ul", children=[ParentNode(tag="li", children=[LeafNode(str(i))]) for i in range(3)])
+        out = io.StringIO()
+        node.write_html(out)
+        self.assertEqual(out.getvalue(), "<ul><li>0</li><li>1</li><li>2</li></ul>")
+
+    def test_deep_tree_does_not_recurse(self):
+        node = LeafNode("leaf", "b")
+        for _ in range(sys.getrecursionlimit() * 2):
+            node = ParentNode(tag="span", children=[node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span><span>"))
+        self.assertEqual(html.count("<b>leaf</b>"), 1)
+
+    def test_empty_children(self):
+        self.assertEqual(ParentNode(tag="blockquote", children=[]).to_html(), "<blockquote></blockquote>")
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,101 @@
+import gzip
+import os
+import tempfile
+import unittest
+from build_manifest import BuildManifest
+from copy_to_public import copy_to_public
+from precompress import GZIP_SUFFIX, CompressionManifest, precompress_outputs
+
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public = os.path.join(self.tmp.name, "public")
+        self.manifest_path = os.path.join(self.tmp.name, ".cache", "compression.json")
+        os.makedirs(os.path.join(self.public, "blog"))
+        self.write("index.html", "<p>home</p>" * 200)
+        self.write(os.path.join("blog", "index.html"), "<p>blog</p>" * 200)
+        self.write("index.css", "body {}")
+        self.write("tom.png", "png" * 1000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, relative_path, text):
+        with open(os.path.join(self.public, relative_path), "w") as f:
+            f.write(text)
+
+    def compress(self, placed=frozenset()):
+        manifest = CompressionManifest(self.manifest_path)
+        result = precompress_outputs(self.public, manifest, min_bytes=1024, workers=2, placed=placed)
+        manifest.save()
+        return result
+
+    def compressed_files(self):
+        return sorted(os.path.relpath(os.path.join(path, name), self.public) for path, _, names in os.walk(self.public) for name in names if name.endswith(GZIP_SUFFIX))
+
+    def test_large_text_outputs_are_compressed(self):
+        result = self.compress()
+        self.assertEqual(result.files, 2)
+        self.assertEqual(self.compressed_files(), [os.path.join("blog", "index.html.gz"), "index.html.gz"])
+        with gzip.open(os.path.join(self.public, "index.html.gz"), "rt") as f:
+            self.assertEqual(f.read(), "<p>home</p>" * 200)
+
+    def test_unchanged_outputs_are_skipped(self):
+        self.compress()
+        self.assertEqual(self.compress().files, 0)
+        # rewritten with the same content
+        self.write("index.html", "<p>home</p>" * 200)
+        self.assertEqual(self.compress().files, 0)
+        self.write("index.html", "<p>changed</p>" * 200)
+        self.assertEqual(self.compress().files, 1)
+        with gzip.open(os.path.join(self.public, "index.html.gz"), "rt") as f:
+            self.assertEqual(f.read(), "<p>changed</p>" * 200)
+
+    def test_lost_manifest(self):
+        self.compress()
+        os.remove(self.manifest_path)
+        # unchanged outputs are recognised as compressed by us
+        self.assertEqual(self.compress().files, 0)
+        os.remove(self.manifest_path)
+        self.write("index.html", "<p>changed</p>" * 200)
+        self.assertEqual(self.compress().files, 1)
+        with gzip.open(os.path.join(self.public, "index.html.gz"), "rt") as f:
+            self.assertEqual(f.read(), "<p>changed</p>" * 200)
+        os.remove(os.path.join(self.public, "blog", "index.html"))
+        self.assertEqual(self.compress().removed, 1)
+        self.assertEqual(self.compressed_files(), ["index.html.gz"])
+
+    def test_outdated_and_foreign_compressed_files(self):
+        self.write("app.js", "x" * 2000)
+        with open(os.path.join(self.public, "app.js.gz"), "wb") as f:
+            f.write(b"from static")
+        self.compress()
+        with open(os.path.join(self.public, "app.js.gz"), "rb") as f:
+            self.assertEqual(f.read(), b"from static")
+
+        os.remove(os.path.join(self.public, "blog", "index.html"))
+        self.write("index.html", "<p>tiny</p>")
+        self.assertEqual(self.compress().removed, 2)
+        self.assertEqual(self.compressed_files(), ["app.js.gz"])
+
+    def test_older_static_compressed_files_are_kept(self):
+        static = os.path.join(self.tmp.name, "static")
+        os.makedirs(static)
+        with open(os.path.join(static, "app.js"), "w") as f:
+            f.write("x" * 2000)
+        with open(os.path.join(static, "app.js.gz"), "wb") as f:
+            f.write(b"made by hand")
+        os.utime(os.path.join(static, "app.js.gz"), (1000, 1000))
+        os.utime(os.path.join(static, "app.js"), (2000, 2000))
+        build = BuildManifest(os.path.join(self.tmp.name, ".cache", "build_manifest.json"), self.tmp.name)
+        for _ in range(2):
+            copy_to_public(build, project_directory=self.tmp.name)
+            self.compress(build.outputs())
+            with open(os.path.join(self.public, "app.js.gz"), "rb") as f:
+                self.assertEqual(f.read(), b"made by hand")
+            self.assertEqual(os.stat(os.path.join(self.public, "app.js.gz")).st_mtime, 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import json
+import os
+import tempfile
+import unittest
+from profiler import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_accumulates_per_page_and_in_aggregate(self):
+        profiler = Profiler()
+        profiler.add("static copy", 1.0, 0.5)
+        profiler.add("read", 0.25, 0.25, "a.md")
+        profiler.add("read", 0.25, 0.25, "a.md")
+        profiler.add_page("b.md", {"read": [2.0, 1.0], "disk write": [1.0, 0.0]})
+        self.assertEqual(profiler.phases, {"static copy": [1.0, 0.5], "read": [2.5, 1.5], "disk write": [1.0, 0.0]})
+        self.assertEqual(profiler.pages["a.md"], {"read": [0.5, 0.5]})
+        self.assertEqual(profiler.slowest_pages(1), [("b.md", 3.0, 1.0)])
+
+    def test_phase_context_manager(self):
+        profiler = Profiler()
+        with profiler.phase("inline parsing", "a.md"):
+            sum(range(1000))
+        wall, cpu = profiler.pages["a.md"]["inline parsing"]
+        self.assertGreater(wall, 0)
+        self.assertGreaterEqual(cpu, 0)
+
+    def test_report(self):
+        profiler = Profiler()
+        profiler.add("disk write", 1.0, 0.5, "a.md")
+        profiler.add("file discovery", 0.5, 0.5)
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "out", "profile.json")
+            profiler.write_report(path)
+            with open(path) as f:
+                report = json.load(f)
+        self.assertEqual(report["page_count"], 1)
+        self.assertEqual(list(report["phases"]), ["file discovery", "disk write"])
+        self.assertEqual(report["pages"]["a.md"]["total"], {"wall": 1.0, "cpu": 0.5})
+        self.assertIn("a.md", profiler.format_summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import io
+import os
+import tempfile
+import unittest
+from blocktype import markdown_to_html_node, parse_markdown
+from render_cache import RenderCache
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = RenderCache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def render(self, fragment) -> str:
+        out = io.StringIO()
+        fragment.write_html(out)
+        return out.getvalue()
+
+    def test_miss_then_hit(self):
+        markdown = "# Title\n\nSome **bold** text"
+        self.assertIsNone(self.cache.get(markdown))
+        stored = self.cache.put(markdown, markdown_to_html_node(markdown))
+        self.assertEqual(self.render(stored), markdown_to_html_node(markdown).to_html())
+
+        cached = self.cache.get(markdown)
+        self.assertIsNotNone(cached)
+        self.assertEqual(self.render(cached), "<div><h1>Title</h1><p>Some <b>bold</b> text</p></div>")
+        self.assertIsNone(self.cache.get(markdown + " "))
+        self.assertIsNone(cached.metadata())
+
+    def test_metadata(self):
+        markdown = "# Title\n\n## Part **one**"
+        node, metadata = parse_markdown(markdown)
+        self.cache.put(markdown, node, metadata)
+        cached = self.cache.get(markdown)
+        self.assertEqual(cached.metadata().title, "Title")
+        self.assertEqual(cached.metadata().headings, metadata.headings)
+        self.assertEqual(self.render(cached), node.to_html())
+
+    def test_prune_evicts_least_recently_used(self):
+        sizes = []
+        for i, markdown in enumerate(["first", "second", "third"]):
+            fragment = self.cache.put(markdown, markdown_to_html_node(markdown))
+            os.utime(fragment.path, ns=(i, i))
+            sizes.append(os.path.getsize(fragment.path))
+        self.cache.get("first")
+
+        self.cache.max_bytes = 2 * max(sizes)
+        self.assertEqual(self.cache.prune(), 1)
+        self.assertIsNone(self.cache.get("second"))
+        self.assertIsNotNone(self.cache.get("first"))
+        self.assertIsNotNone(self.cache.get("third"))
+
+    def test_prune_removes_stale_temporary_files(self):
+        fragment = self.cache.put("page", markdown_to_html_node("page"))
+        stale = fragment.path + ".123.tmp"
+        fresh = fragment.path + ".456.tmp"
+        for path in (stale, fresh):
+            with open(path, "w") as f:
+                f.write("x" * 4096)
+        os.utime(stale, ns=(0, 0))
+        os.utime(fresh, ns=(self.cache.created_ns + 1, self.cache.created_ns + 1))
+
+        self.cache.max_bytes = os.path.getsize(fragment.path)
+        self.assertEqual(self.cache.prune(), 0)
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(fresh))
+        self.assertIsNotNone(self.cache.get("page"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from generate_page import render_page
+from site_index import SiteIndex, page_url
+from template import Template
+
+
+class TestSiteIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.path = os.path.join(self.tmp.name, ".cache", "site_index.json")
+        self.write("index.md", "# Home\n\nWelcome")
+        self.write(os.path.join("blog", "tom", "index.md"), "---\ntitle: Tom\ndate: 2024-05-01\ntags: [tolkien]\n---\n# Heading\n")
+        self.write(os.path.join("blog", "draft.md"), "---\ndraft: true\ntemplate: post.html\n---\n```\n# not a title\n```\n\n# Draft\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, relative, text):
+        path = os.path.join(self.content, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_page_url(self):
+        self.assertEqual(page_url("index.md"), "/")
+        self.assertEqual(page_url(os.path.join("blog", "tom", "index.md")), "/blog/tom/")
+        self.assertEqual(page_url(os.path.join("blog", "about.md")), "/blog/about.html")
+
+    def test_update_and_lookup(self):
+        index = SiteIndex(self.path, self.content)
+        self.assertEqual(len(index.update()), 3)
+        self.assertEqual([page.url for page in index.pages()], ["/blog/tom/", "/"])
+        tom = index.get(os.path.join(self.content, "blog", "tom", "index.md"))
+        self.assertEqual((tom.title, tom.date, tom.tags), ("Tom", "2024-05-01", ["tolkien"]))
+        draft = os.path.join(self.content, "blog", "draft.md")
+        self.assertEqual(index.get(draft).title, "Draft")
+        self.assertEqual(index.get(draft).template, "post.html")
+        self.assertFalse(index.is_built(draft))
+        self.assertTrue(SiteIndex(None, self.content, include_drafts=True).is_built(draft))
+
+    def test_incremental(self):
+        index = SiteIndex(self.path, self.content)
+        index.update()
+        index.save()
+
+        index = SiteIndex(self.path, self.content)
+        self.assertEqual(index.update(), [])
+        # a new mtime or body alone does not change the page's metadata
+        self.write("index.md", "# Home\n\nWelcome back")
+        self.assertEqual(index.update(), [])
+        home = self.write("index.md", "---\ntitle: New home\n---\n# Home")
+        os.remove(os.path.join(self.content, "blog", "draft.md"))
+        self.assertEqual(index.update(), [os.path.join("blog", "draft.md"), "index.md"])
+        self.assertEqual(index.get(home).title, "New home")
+
+        self.write("index.md", "# Home again")
+        self.assertTrue(index.update_page(home))
+        self.assertEqual(index.get(home).title, "Home again")
+        self.assertEqual(index.remove(os.path.join(self.content, "blog")), [os.path.join("blog", "tom", "index.md")])
+
+    def test_pages_with_unreadable_front_matter_are_still_indexed(self):
+        rule = self.write("rule.md", "---\nA page that opens with a rule.\n\n---\n\n# Rule")
+        bad = self.write("bad.md", "---\ntitle: Bad\ndate: someday\n---\n# Bad heading")
+        index = SiteIndex(self.path, self.content)
+        with self.assertLogs("site_index", "ERROR") as logs:
+            self.assertEqual(len(index.update()), 5)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("bad.md", logs.output[0])
+        self.assertEqual(index.get(rule).title, "Rule")
+        self.assertEqual((index.get(bad).title, index.get(bad).date), ("Bad heading", None))
+        self.assertTrue(index.is_built(bad))
+
+    def test_titles_match_rendered_pages(self):
+        documents = [
+            "#Title without a space",
+            "#   Padded title   \n\ntext",
+            "# First line\nsecond line of the heading",
+            "```\n# not the title\n```\n\n# Real title",
+            "Intro paragraph\n# Inside a paragraph\n\n## Sub",
+            "Intro\n\n#Fallback\n\n# Heading block wins",
+            "---\ntitle: Front matter title\n---\n# Heading",
+        ]
+        paths = [self.write(os.path.join("edge", f"{i}.md"), markdown) for i, markdown in enumerate(documents)]
+        index = SiteIndex(None, self.content)
+        index.update()
+        for path in paths:
+            title = render_page(path, Template("{{ Title }}"), os.path.join(self.tmp.name, "out.html"))
+            self.assertEqual(index.get(path).title, title)
+
+
+if __name__ == "__main__":
+    unittest.main()
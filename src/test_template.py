@@ -0,0 +1,65 @@
+import io
+import os
+import tempfile
+import unittest
+from leafnode import LeafNode
+from template import Template, TemplateLoader
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile(self):
+        template = Template("<h1>{{ Title }}</h1>{{Content}}<p>{{ author-name }}</p>")
+        self.assertEqual(template.slots, ["Title", "Content", "author-name"])
+        self.assertEqual(template.literals, ["<h1>", "</h1>", "<p>", "</p>"])
+
+    def test_render(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}<i>{{ date }}</i>")
+        self.assertEqual(
+            template.render({"Title": "T", "Content": "{{ Title }}", "date": 2024}),
+            "<h1>T</h1>{{ Title }}<i>2024</i>"
+        )
+
+    def test_missing_slot_is_left_in_place(self):
+        self.assertEqual(Template("a {{ missing }} b").render({}), "a {{ missing }} b")
+
+    def test_write_streams_nodes(self):
+        out = io.StringIO()
+        Template("<main>{{ Content }}</main>").write(out, {"Content": LeafNode("hi", "p")})
+        self.assertEqual(out.getvalue(), "<main><p>hi</p></main>")
+
+
+class TestTemplateLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content = os.path.join(root, "content")
+        self.default = os.path.join(root, "template.html")
+        self.blog_template = os.path.join(self.content, "blog", "template.html")
+        os.makedirs(os.path.join(self.content, "blog", "post"))
+        with open(self.default, "w") as f:
+            f.write("default {{ Content }}")
+        with open(self.blog_template, "w") as f:
+            f.write("blog {{ Content }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_load_is_cached_until_modified(self):
+        loader = TemplateLoader(self.default)
+        first = loader.load(self.default)
+        self.assertIs(loader.load(self.default), first)
+
+        with open(self.default, "w") as f:
+            f.write("changed {{ Content }}")
+        os.utime(self.default, ns=(1, 1))
+        self.assertEqual(loader.load(self.default).literals, ["changed ", ""])
+
+    def test_resolve_per_directory(self):
+        loader = TemplateLoader(self.default, self.content)
+        self.assertEqual(loader.resolve(os.path.join(self.content, "index.md")), self.default)
+        self.assertEqual(loader.resolve(os.path.join(self.content, "blog", "index.md")), self.blog_template)
+        self.assertEqual(loader.resolve(os.path.join(self.content, "blog", "post", "index.md")), self.blog_template)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -30,6 +30,10 @@ class TestTextNode(unittest.TestCase):
         )
         self.assertNotEqual(node1, node2)
 
+    def test_slots(self):
+        self.assertFalse(hasattr(TextNode("a", TextType.TEXT), "__dict__"))
+
+
 class TestSplitDelimiter(unittest.TestCase):
     def test_exceptionRaise(self):
         with self.assertRaises(Exception) as context:
@@ -34,6 +34,7 @@ class TextNode:
         text_type (TextType): The type of the text node, specified as a member of the TextType enum.
         url (Optional[str]): The URL associated with the text (e.g., for a link or image). Defaults to None.
     """
+    __slots__ = ("text", "text_type", "url")
 
     def __init__(self, text: str, text_type: TextType, url: Optional[str] = None):
         """
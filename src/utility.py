@@ -1,7 +1,7 @@
 from typing import List, Tuple, cast
 from htmlnode import HTMLNode
 from textnode import TextNode, TextType, text_node_to_html_node
-from functools import reduce
+from inline_tokenizer import tokenize_inline
 import re
 from leafnode import LeafNode
 
@@ -21,7 +21,16 @@ def split_nodes_delimiter(old_nodes: List[TextNode], delimiter: str, text_type:
         if node.text.find(delimiter) != -1 and node.text[node.text.find(delimiter)+1:].find(delimiter) == -1:
             raise Exception("Invalid Markdown syntax one or more TextNode objects does not close its delimiter")
 
-    return list(filter(lambda t: t.text, list(reduce(lambda x, y: x + ([y] if y.text_type != TextType.TEXT else list(map(lambda i_z: TextNode(i_z[1], text_type if i_z[0] % 2 else TextType.TEXT), enumerate(y.text.split(delimiter))))), old_nodes, []))))
+    new_nodes: List[TextNode] = []
+    for node in old_nodes:
+        if node.text_type != TextType.TEXT:
+            if node.text:
+                new_nodes.append(node)
+            continue
+        for i, part in enumerate(node.text.split(delimiter)):
+            if part:
+                new_nodes.append(TextNode(part, text_type if i % 2 else TextType.TEXT))
+    return new_nodes
 
 def extract_markdown_images(text: str) -> List[Tuple[str,str]]:
     """
@@ -141,14 +150,19 @@ def split_nodes_link(old_nodes: List[TextNode]) -> List[TextNode]:
     return result 
 
 def text_to_textnodes(text: str) -> List[TextNode]:
-    textNode = TextNode(text=text, text_type=TextType.TEXT)
-    result = []
-    result.extend(split_nodes_link(split_nodes_image([textNode])))
-    delimiters = ["`","**","_"]
-    textTypes = [TextType.CODE, TextType.BOLD, TextType.ITALIC]
-    for delimiter, textType in zip(delimiters, textTypes):
-        result = split_nodes_delimiter(result, delimiter, textType)
-    return result
+    """
+    Converts a run of inline markdown (images, links, code, bold, italic) into TextNodes.
+
+    The text is scanned once by `inline_tokenizer.tokenize_inline`; the `split_nodes_*`
+    helpers above are kept for callers that split existing node lists.
+
+    Args:
+        text (str): The inline markdown text.
+
+    Returns:
+        List[TextNode]: The TextNodes in document order.
+    """
+    return tokenize_inline(text)
 
 def markdown_to_blocks(markdown: str) -> List[str]:
     blocks = markdown.split("\n\n")